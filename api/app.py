@@ -2,25 +2,17 @@ from fastapi import FastAPI, Request, HTTPException
 from .v1.routes import router
 from database.db import create_db
 from contextlib import asynccontextmanager
-from pathlib import Path
-import os
 from fastapi import status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 
 
-BASE_DIR = Path(__file__).parent.parent.resolve()
-DB_PATH = BASE_DIR / "movies.db"
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    if not os.path.exists(DB_PATH):
-        print(f"Database not found at {DB_PATH}")
-        create_db()
-    else:
-        print(f"Database already exists at {DB_PATH}")
+    # makes a missing database, or adds what is new since the file was made
+    # and applies pending migrations, see database.migrations
+    create_db()
     yield
     print("Shutting down...")
 
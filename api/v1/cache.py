@@ -0,0 +1,83 @@
+"""
+In-process TTL cache for read API responses with ETag support.
+Ingest routes clear it, so a cached page never outlives a write.
+"""
+import json
+import time
+import hashlib
+from urllib.parse import urlencode
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+
+
+RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_MAX_ENTRIES = 512
+
+
+class CacheEntry:
+    """Encoded response body with its ETag and expiry"""
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Bounded TTL cache keyed by request path and query string"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, CacheEntry] = {}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def set(self, key: str, body: bytes) -> CacheEntry:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # dicts keep insertion order, drop the oldest entry
+            del self._entries[next(iter(self._entries))]
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        entry = CacheEntry(body, etag, time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+
+
+def cache_key(request: Request) -> str:
+    """Path plus the query parameters in a stable order, encoded so no two filter sets share a key"""
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+def cached_json_response(request: Request, build: Callable[[], Any]) -> Response:
+    """
+    Serve build() as JSON from the response cache.
+    Answers 304 Not Modified when If-None-Match matches the ETag.
+    """
+    key = cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        body = json.dumps(build(), ensure_ascii=False, default=str).encode("utf-8")
+        entry = response_cache.set(key, body)
+
+    headers = {"ETag": entry.etag, "Cache-Control": f"max-age={int(response_cache.ttl)}"}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,3 +1,4 @@
+from typing import Optional, Tuple
 from database.db import (
      MovieCRUD,GenreCRUD,
      ActorCRUD,CountryCRUD,
@@ -20,43 +21,36 @@ def add_movie_actors(movie_json,session,movie):
     for actor in movie_json.actors:
         name = actor.get("name")
         image = actor.get("image")
-        actor = ActorCRUD.get_by_name(session,name)
+        actor = ActorCRUD.get_by_name.raw(session,name)
 
-        if actor.data == None:
+        if actor is None:
             actor_c = ActorBase(name=name,image_url=image)
-            actor = ActorCRUD.create(session,actor_c)
-            MovieCRUD.add_actor(session,movie_id=movie.data.id,actor_id=actor.data.id)
-        else:
-            MovieCRUD.add_actor(session,movie_id=movie.data.id,actor_id=actor.data.id)
+            actor = ActorCRUD.create(session,actor_c).data
+        MovieCRUD.add_actor(session,movie_id=movie.data.id,actor_id=actor.id)
 
 
 
 def add_movie_genres(movie_json,session,movie):
     for genre in movie_json.genres:
         title = genre.get("title")
-        genre = GenreCRUD.get_by_title(session,title)
+        genre = GenreCRUD.get_by_title.raw(session,title)
                     
-        if genre.data == None:
+        if genre is None:
             genre_c = GenreBase(title=title)
-            genre = GenreCRUD.create(session,genre_c)
-            MovieCRUD.add_genre(session,movie_id=movie.data.id,genre_id=genre.data.id)
-        else:
-            MovieCRUD.add_genre(session,movie_id=movie.data.id,genre_id=genre.data.id)
+            genre = GenreCRUD.create(session,genre_c).data
+        MovieCRUD.add_genre(session,movie_id=movie.data.id,genre_id=genre.id)
     
 
 def add_movie_country(movie_json,session,movie):
     for country in movie_json.countries:
         title = country.get("title")
         image = country.get("image")
-        country = CountryCRUD.get_by_title(session,title=title)
+        country = CountryCRUD.get_by_title.raw(session,title=title)
 
-        if country.data == None:
+        if country is None:
             country_c = CountryBase(title=title,image_url=image)
-            country = CountryCRUD.create(session,country_c)
-            session.refresh(country.data)
-            MovieCRUD.add_country(session,movie_id=movie.data.id,country_id=country.data.id)
-        else:
-            MovieCRUD.add_country(session,movie_id=movie.data.id,country_id=country.data.id)
+            country = CountryCRUD.create(session,country_c).data
+        MovieCRUD.add_country(session,movie_id=movie.data.id,country_id=country.id)
 
 
 def add_movie_trailer(movie_json,session,movie):
@@ -68,13 +62,11 @@ def add_movie_trailer(movie_json,session,movie):
 def add_serial_genre(serial_json,session,serial):
     for genre in serial_json.genres:
         title = genre.get("title")
-        genre = GenreCRUD.get_by_title(session,title)
-        if genre.data == None:
+        genre = GenreCRUD.get_by_title.raw(session,title)
+        if genre is None:
             genre_c = GenreBase(title=title)
-            genre = GenreCRUD.create(session,genre_c)
-            SerialCRUD.add_genre(session,serial_id=serial.data.id,genre_id=genre.data.id)
-        else:
-            SerialCRUD.add_genre(session,serial_id=serial.data.id,genre_id=genre.data.id)
+            genre = GenreCRUD.create(session,genre_c).data
+        SerialCRUD.add_genre(session,serial_id=serial.data.id,genre_id=genre.id)
 
 
 
@@ -82,27 +74,23 @@ def add_serial_actors(serial_json,session,serial):
     for actor in serial_json.actors:
         name = actor.get("name")
         image = actor.get("image")
-        actor = ActorCRUD.get_by_name(session,name)
+        actor = ActorCRUD.get_by_name.raw(session,name)
 
-        if actor.data == None:
+        if actor is None:
             actor_c = ActorBase(name=name,image_url=image)
-            actor = ActorCRUD.create(session,actor_c)
-            SerialCRUD.add_actor(session,serial_id=serial.data.id,actor_id=actor.data.id)
-        else:
-            SerialCRUD.add_actor(session,serial_id=serial.data.id,actor_id=actor.data.id)   
+            actor = ActorCRUD.create(session,actor_c).data
+        SerialCRUD.add_actor(session,serial_id=serial.data.id,actor_id=actor.id)
 
 
 def add_serial_countries(serial_json,session,serial):
     for country in serial_json.countries:
         title = country.get("title")
         image = country.get("image")
-        country = CountryCRUD.get_by_title(session,title=title)
-        if country.data == None:
+        country = CountryCRUD.get_by_title.raw(session,title=title)
+        if country is None:
             country_c = CountryBase(title=title,image_url=image)
-            country = CountryCRUD.create(session,country_c)
-            SerialCRUD.add_country(session,serial_id=serial.data.id,country_id=country.data.id)
-        else:
-            SerialCRUD.add_country(session,serial_id=serial.data.id,country_id=country.data.id)
+            country = CountryCRUD.create(session,country_c).data
+        SerialCRUD.add_country(session,serial_id=serial.data.id,country_id=country.id)
 
 
 def add_serial_trailer(serial_json,session,serial):
@@ -110,3 +98,40 @@ def add_serial_trailer(serial_json,session,serial):
     url = serial_json.trailer.get("url")
     trailer = TrailerBase(type_=type_,url=url)
     TrailerCRUD.create(session,trailer,serial_id=serial.data.id)
+
+
+def movie_card(movie) -> dict:
+    """Public JSON shape of a movie loaded with the 'card' profile"""
+    return {
+        "id": movie.api_id,
+        "title": movie.title,
+        "type": movie.type_,
+        "year": movie.year,
+        "duration": movie.duration,
+        "imdb": movie.imdb,
+        "persian": movie.is_persian,
+        "image": movie.image_url,
+        "cover": movie.cover_url,
+        "genres": [genre.title for genre in movie.genres],
+        "countries": [country.title for country in movie.countries],
+    }
+
+
+def serial_card(serial) -> dict:
+    """Public JSON shape of a serial loaded with the 'card' profile"""
+    card = movie_card(serial)
+    card["season_count"] = serial.season_count
+    return card
+
+
+def catalog_page(items, card, limit: int) -> dict:
+    """Page of cards with the cursor of the next page (None on the last page)"""
+    next_cursor = items[-1].id if len(items) == limit else None
+    return {"items": [card(item) for item in items], "next_cursor": next_cursor}
+
+
+def year_range(year_from: Optional[int], year_to: Optional[int]) -> Optional[Tuple[int, int]]:
+    """Inclusive year range from the optional query bounds, None when both are missing"""
+    if year_from is None and year_to is None:
+        return None
+    return (year_from if year_from is not None else 0, year_to if year_to is not None else 9999)
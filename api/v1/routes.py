@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Request, Query
 from sqlmodel import Session
 from .data_models import Movie, Serial, Episode
 from database.models import Episode as DataBaseEpisode
@@ -9,7 +10,8 @@ from database.db import (
      ActorCRUD, CountryCRUD,
      TrailerCRUD, SerialCRUD,
      engine, EpisodeCRUD,
-     SeasonCRUD
+     SeasonCRUD, FacetCRUD,
+     safe_session
 )
 
 from database.models import ( 
@@ -21,6 +23,7 @@ from database.models import (
 )
 
 from .route_utilities import *
+from .cache import response_cache, cached_json_response
 
 router = APIRouter(prefix='/v1')
 
@@ -53,7 +56,8 @@ async def create(movie_json: Movie):
         note=movie_json.note
     )
 
-    with Session(engine) as session:
+    # one commit for the movie and its trailer, genres, actors and countries
+    with safe_session(engine, unit_of_work=True) as session:
         movieObj = MovieCRUD.get_by_api_id(session, movie_json.id)
         
         if movieObj.data is not None:
@@ -68,8 +72,9 @@ async def create(movie_json: Movie):
         add_movie_actors(movie_json, session, movie)
         add_movie_country(movie_json, session, movie)
         # await send_to_telegram_in_api(session, movie)
-        
-        return {"Created": movie_json.title}
+
+    response_cache.clear()
+    return {"Created": movie_json.title}
 
 
 @router.patch('/movie/{api_id}')
@@ -86,7 +91,7 @@ async def update(api_id: int, movie_json: Movie):
         api_id=movie_json.id
     )
 
-    with Session(engine) as session:
+    with safe_session(engine, unit_of_work=True) as session:
         movieObj = MovieCRUD.get_by_api_id(session, api_id)
         
         if movieObj.data is None:
@@ -94,6 +99,7 @@ async def update(api_id: int, movie_json: Movie):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No movie with this id: {api_id}"
             )
+        title = movieObj.data.title
         
         movie = MovieCRUD.update(session, movieObj.data.id, movie.model_dump())
         add_movie_trailer(movie_json, session, movie)
@@ -101,8 +107,9 @@ async def update(api_id: int, movie_json: Movie):
         add_movie_actors(movie_json, session, movie)
         add_movie_country(movie_json, session, movie)
         # await send_to_telegram_in_api(session, movie)
-        
-        return {f"'{movieObj.data.title}'": "Updated"}
+
+    response_cache.clear()
+    return {f"'{title}'": "Updated"}
 
 
 @router.delete('/movie/{api_id}')
@@ -117,6 +124,7 @@ async def delete(api_id: int):
             )
         
         MovieCRUD.delete(session, movieObj.data.id)
+        response_cache.clear()
         return True
 
 
@@ -173,6 +181,7 @@ async def create(serial_json: Episode):
         episode_c = EpisodeCRUD.create(session, episodeBase)
         # await send_to_telegram_in_api(session, episode_c)
 
+        response_cache.clear()
         return {"Created": episode.get('title')}
 
 
@@ -215,6 +224,7 @@ async def update(api_id: int, serial_json: Episode):
         serial = EpisodeCRUD.update(session, SerialObj.data.id, episodeBase.model_dump())
         # await send_to_telegram_in_api(session, serial)
 
+        response_cache.clear()
         return {f"This movie '{SerialObj.data.title}'": "Updated"}
 
 
@@ -230,6 +240,7 @@ async def delete(api_id: int):
             )
         
         EpisodeCRUD.delete(session, EpisodeObj.data.id)
+        response_cache.clear()
         return True
 
 
@@ -249,7 +260,8 @@ async def create(serial_json: Serial):
         note=serial_json.note
     )
 
-    with Session(engine) as session:
+    # one commit for the serial and its trailer, genres, countries and actors
+    with safe_session(engine, unit_of_work=True) as session:
         SerialObj = SerialCRUD.get_by_title(session, serial_json.title)
 
         if SerialObj.data is not None:
@@ -265,8 +277,9 @@ async def create(serial_json: Serial):
         add_serial_countries(serial_json, session, serial)
         add_serial_actors(serial_json, session, serial)
         # await send_to_telegram_in_api(session, serial)
-        
-        return {"Created": serial_json.title}
+
+    response_cache.clear()
+    return {"Created": serial_json.title}
 
 
 @router.patch('/serial/{api_id}')
@@ -284,7 +297,7 @@ async def update(api_id: int, serial_json: Serial):
         season_count=serial_json.season_count
     )
     
-    with Session(engine) as session:
+    with safe_session(engine, unit_of_work=True) as session:
         SerialObj = SerialCRUD.get_by_api_id(session, api_id)
         
         if SerialObj.data is None:
@@ -292,6 +305,7 @@ async def update(api_id: int, serial_json: Serial):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No serial with this id: {api_id}"
             )
+        title = SerialObj.data.title
         
         serial = SerialCRUD.update(session, SerialObj.data.id, serial.model_dump())
         add_serial_trailer(serial_json, session, serial)
@@ -299,8 +313,9 @@ async def update(api_id: int, serial_json: Serial):
         add_serial_countries(serial_json, session, serial)
         add_serial_actors(serial_json, session, serial)
         # await send_to_telegram_in_api(session, serial)
-        
-        return {f"{SerialObj.data.title}": "Updated"}
+
+    response_cache.clear()
+    return {f"{title}": "Updated"}
 
 
 @router.delete('/serial/{api_id}')
@@ -315,4 +330,135 @@ async def delete(api_id: int):
             )
         
         SerialCRUD.delete(session, SerialObj.data.id)
+        response_cache.clear()
         return True
+
+
+# ============= READ ROUTES =============
+
+@router.get('/movies')
+async def list_movies(
+    request: Request,
+    genre: Optional[str] = None,
+    country: Optional[str] = None,
+    actor: Optional[str] = None,
+    persian: Optional[bool] = None,
+    min_imdb: Optional[float] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    genres_any: Optional[List[str]] = Query(default=None),
+    genres_all: Optional[List[str]] = Query(default=None),
+    q: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    def build():
+        with Session(engine) as session:
+            result = MovieCRUD.browse(
+                session, genre=genre, country=country, actor=actor,
+                is_persian=persian, min_imdb=min_imdb, title=q,
+                year_between=year_range(year_from, year_to),
+                genres_any=genres_any, genres_all=genres_all,
+                cursor=cursor, limit=limit
+            )
+            if not result.success:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=result.error)
+            return catalog_page(result.data, movie_card, limit)
+
+    return cached_json_response(request, build)
+
+
+@router.get('/movies/{api_id}')
+async def get_movie(request: Request, api_id: int):
+    def build():
+        with Session(engine) as session:
+            movieObj = MovieCRUD.get_by_api_id(session, api_id, load="card")
+            if movieObj.data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No movie found with id: {api_id}"
+                )
+            card = movie_card(movieObj.data)
+            card["description"] = movieObj.data.description
+            return card
+
+    return cached_json_response(request, build)
+
+
+@router.get('/serials')
+async def list_serials(
+    request: Request,
+    genre: Optional[str] = None,
+    country: Optional[str] = None,
+    actor: Optional[str] = None,
+    persian: Optional[bool] = None,
+    min_imdb: Optional[float] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    genres_any: Optional[List[str]] = Query(default=None),
+    genres_all: Optional[List[str]] = Query(default=None),
+    q: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    def build():
+        with Session(engine) as session:
+            result = SerialCRUD.browse(
+                session, genre=genre, country=country, actor=actor,
+                is_persian=persian, min_imdb=min_imdb, title=q,
+                year_between=year_range(year_from, year_to),
+                genres_any=genres_any, genres_all=genres_all,
+                cursor=cursor, limit=limit
+            )
+            if not result.success:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=result.error)
+            return catalog_page(result.data, serial_card, limit)
+
+    return cached_json_response(request, build)
+
+
+@router.get('/serials/{api_id}')
+async def get_serial(request: Request, api_id: int):
+    def build():
+        with Session(engine) as session:
+            SerialObj = SerialCRUD.get_by_api_id(session, api_id, load="card")
+            if SerialObj.data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No serial found with id: {api_id}"
+                )
+            card = serial_card(SerialObj.data)
+            card["description"] = SerialObj.data.description
+            return card
+
+    return cached_json_response(request, build)
+
+
+@router.get('/facets')
+async def catalog_facets(
+    request: Request,
+    kind: str = Query(default="movie", pattern="^(movie|serial)$"),
+    genre: Optional[str] = None,
+    country: Optional[str] = None,
+    persian: Optional[bool] = None,
+    min_imdb: Optional[float] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+):
+    """Counts per genre, country, decade and persian flag, of the whole catalog or a filtered part"""
+    def build():
+        filters = {
+            "genre": genre, "country": country, "is_persian": persian,
+            "min_imdb": min_imdb, "year_between": year_range(year_from, year_to),
+        }
+        filters = {name: value for name, value in filters.items() if value is not None}
+        with Session(engine) as session:
+            if filters:
+                result = FacetCRUD.count(session, kind, **filters)
+            else:
+                result = FacetCRUD.summary(session, kind)
+            if not result.success:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=result.error)
+            return result.data
+
+    return cached_json_response(request, build)
@@ -0,0 +1,131 @@
+"""
+Benchmarks of the scrape -> post pipeline and of the database hot paths
+
+Sources replay their recorded pages, see recording.py.
+
+Each stage (see test_pipeline.py, test_database.py) is timed with
+pytest-benchmark. Before timing, the stage is also profiled for CPU time
+per item (article, row or call) and peak traced memory. Timings and CPU
+time vary from run to run and machine to machine, so they are only
+reported (in the benchmark table and its extra_info); the gate is peak
+traced memory, which is deterministic for a given input: a stage above its
+baseline.json peak by more than SLACK fails. Timing regressions are left
+to pytest-benchmark's --benchmark-compare-fail against a run saved on the
+same machine. After an intended change, rewrite the baseline with
+
+    pytest benchmarks --no-cov --update-baseline
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pytest
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# gated metrics, allowed growth over the baseline: (ratio, absolute floor)
+SLACK = {
+    "peak_kib": (0.1, 8),
+}
+# runs profiled for CPU time, the fastest one counts
+PROFILE_RUNS = 5
+# timed rounds of stages needing a fresh setup per round
+SETUP_ROUNDS = 10
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline", action="store_true", default=False,
+        help="store the measured peak memory of every stage in benchmarks/baseline.json",
+    )
+
+
+def profile(func: Callable, setup: Callable[[], tuple], items: int) -> Dict[str, float]:
+    """CPU milliseconds per item (fastest of PROFILE_RUNS) and peak traced KiB of one run"""
+    cpu = None
+    for _ in range(PROFILE_RUNS):
+        args = setup()
+        started = time.process_time()
+        func(*args)
+        elapsed = time.process_time() - started
+        cpu = elapsed if cpu is None else min(cpu, elapsed)
+
+    # without the cycle collector the peak does not depend on when earlier
+    # tests left it to run, only on what func allocates
+    args = setup()
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return {"cpu_ms_per_item": cpu * 1000 / max(items, 1), "peak_kib": peak / 1024}
+
+
+class Baseline:
+    """Stored stage metrics, checked against or rewritten by a run"""
+
+    def __init__(self, path: Path, update: bool):
+        self.path = path
+        self.update = update
+        self.stored: Dict[str, Dict[str, float]] = json.loads(path.read_text()) if path.exists() else {}
+        self.measured: Dict[str, Dict[str, float]] = {}
+
+    def check(self, name: str, metrics: Dict[str, float]):
+        metrics = {metric: value for metric, value in metrics.items() if metric in SLACK}
+        self.measured[name] = metrics
+        stored = self.stored.get(name)
+        if self.update or stored is None:
+            return
+        regressions = []
+        for metric, value in metrics.items():
+            if metric not in stored:
+                continue
+            ratio, floor = SLACK[metric]
+            limit = stored[metric] * (1 + ratio) + floor
+            if value > limit:
+                regressions.append(f"{metric} {value:.3f} > {limit:.3f} (baseline {stored[metric]:.3f})")
+        if regressions:
+            pytest.fail(f"{name} regressed: " + ", ".join(regressions))
+
+    def save(self):
+        merged = {**self.stored, **self.measured}
+        rounded = {
+            name: {metric: round(value, 4) for metric, value in metrics.items()}
+            for name, metrics in sorted(merged.items())
+        }
+        self.path.write_text(json.dumps(rounded, indent=2) + "\n")
+
+
+@pytest.fixture(name="baseline", scope="session")
+def baseline_fixture(request):
+    baseline = Baseline(BASELINE_PATH, request.config.getoption("--update-baseline"))
+    yield baseline
+    if baseline.update:
+        baseline.save()
+
+
+@pytest.fixture(name="stage")
+def stage_fixture(benchmark, baseline, request):
+    """
+    stage(func, items, setup=None): profile and time func, checking the
+    profile against the baseline. setup, when given, builds func's
+    arguments afresh for every run and is not timed.
+    """
+    def run(func: Callable, items: int, setup: Optional[Callable[[], tuple]] = None):
+        metrics = profile(func, setup or tuple, items)
+        benchmark.extra_info.update(metrics, items=items)
+        if setup:
+            result = benchmark.pedantic(func, setup=lambda: (setup(), {}), rounds=SETUP_ROUNDS)
+        else:
+            result = benchmark(func)
+        baseline.check(request.node.name, metrics)
+        return result
+    return run
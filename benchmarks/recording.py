@@ -0,0 +1,58 @@
+"""
+Recorded pages of the scraped sources
+
+Every source replays the listing and article pages recorded under
+fixtures/<source>/ (recording.yaml maps each url to its file) through an
+httpx MockTransport, so a run never touches the network and always parses
+the same bytes.
+"""
+
+from pathlib import Path
+
+import httpx
+import yaml
+from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.pool import StaticPool
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+}
+
+
+def recorded_client(source: str) -> httpx.Client:
+    """httpx client answering the recorded urls of a source with their files, anything else with 404"""
+    directory = FIXTURES_DIR / source
+    with open(directory / "recording.yaml", encoding="utf-8") as file:
+        recording = yaml.safe_load(file)
+    pages = {
+        str(httpx.URL(url)): ((directory / name).read_bytes(), CONTENT_TYPES[Path(name).suffix])
+        for url, name in recording.items()
+    }
+
+    def handler(request):
+        page = pages.get(str(request.url))
+        if page is None:
+            return httpx.Response(404)
+        body, content_type = page
+        return httpx.Response(200, content=body, headers={"Content-Type": content_type})
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def fresh_engine():
+    """Empty in-memory database"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def fresh_session() -> Session:
+    return Session(fresh_engine())
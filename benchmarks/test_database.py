@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from database.models import Movie
+from database.db import ItemCard, projection_statement, project, handle_db_errors
+
+from benchmarks.recording import fresh_engine
+
+
+MOVIE_ROWS = 10_000
+
+MOVIE_READS = {
+    "hydrate": lambda session: [movie.model_dump() for movie in session.exec(select(Movie)).all()],
+    "tuples": lambda session: session.exec(projection_statement(Movie, ItemCard)).all(),
+    "cards": lambda session: project(session, projection_statement(Movie, ItemCard), ItemCard),
+}
+
+DECORATED_CALLS = 10_000
+
+
+@handle_db_errors("Echo")
+def echo(session, value):
+    """Return value"""
+    return value
+
+
+@pytest.fixture(name="movie_session", scope="module")
+def movie_session_fixture():
+    """Database of MOVIE_ROWS movies"""
+    engine = fresh_engine()
+    with Session(engine) as session:
+        session.exec(insert(Movie), params=[{
+            "title": f"Movie {i}", "type_": "movie", "description": "x" * 2000,
+            "year": 2000 + i % 25, "duration": "120", "imdb": 7.0, "is_persian": False,
+            "image_url": "url", "cover_url": "url", "api_id": i, "sent": False, "note": "",
+        } for i in range(MOVIE_ROWS)])
+        session.commit()
+        yield session
+
+
+# ============= PROJECTION BENCHMARKS =============
+
+class TestProjections:
+    """Benchmarks of reading card fields: hydrated Movie objects vs projections"""
+
+    @pytest.mark.parametrize("read", MOVIE_READS)
+    def test_projection_read(self, stage, benchmark, movie_session, read):
+        benchmark.group = "movie cards"
+
+        def setup():
+            # a cold identity map, as in a fresh request
+            movie_session.expunge_all()
+            return (movie_session,)
+
+        rows = stage(MOVIE_READS[read], items=MOVIE_ROWS, setup=setup)
+        assert len(rows) == MOVIE_ROWS
+
+
+# ============= ERROR HANDLER BENCHMARKS =============
+
+class TestHandleDbErrors:
+    """Benchmarks of the handle_db_errors success path against the undecorated call"""
+
+    @pytest.mark.parametrize("call", ["raw", "decorated"])
+    def test_handle_db_errors_call(self, stage, benchmark, call):
+        """The kept results gate the size of a CRUDResult through peak memory"""
+        benchmark.group = "handle_db_errors"
+        function = echo.raw if call == "raw" else echo
+        results = stage(lambda: [function(None, i) for i in range(DECORATED_CALLS)], items=DECORATED_CALLS)
+        assert len(results) == DECORATED_CALLS
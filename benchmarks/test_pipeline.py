@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from database.db import PostCRUD
+from database.models import PostBase
+from persian_nlp_tools.persian_text_summarizer import TextSummarizationPipeline
+from scraper import scraper as scraper_module
+from scraper import scraper_utilities
+from scraper.scraper import ScraperContianer, scrape_source
+from scraper.scraper_utilities import norm
+
+from benchmarks.recording import recorded_client, fresh_engine, fresh_session
+
+
+SOURCES = ["zoomg", "caffecinema", "moviemag", "gamefa", "fromcinema"]
+
+
+def summarize(text):
+    # same ratio and limit as write_post_list
+    return TextSummarizationPipeline(text, 0.3, 3).process_and_summarize()
+
+
+def store(session, posts):
+    with session:
+        return sum(PostCRUD.create(session, post).success for post in posts)
+
+
+@pytest.fixture(name="source", params=SOURCES, scope="module")
+def source_fixture(request):
+    return request.param
+
+
+@pytest.fixture(name="scraper", scope="module")
+def scraper_fixture(source):
+    return ScraperContianer().resolve(source, session=recorded_client(source))
+
+
+@pytest.fixture(name="raw", scope="module")
+def raw_fixture(scraper):
+    return scraper.scrape()
+
+
+@pytest.fixture(name="items", scope="module")
+def items_fixture(scraper, raw):
+    return scraper.parse(raw)
+
+
+@pytest.fixture(name="details", scope="module")
+def details_fixture(scraper, items):
+    return scraper.detail_parser([dict(item) for item in items])
+
+
+@pytest.fixture(name="texts", scope="module")
+def texts_fixture(details):
+    return [norm.normalize(detail["content"]) for detail in details]
+
+
+@pytest.fixture(name="posts", scope="module")
+def posts_fixture(details, texts):
+    return [
+        PostBase(
+            title=detail["title"], type_="N/A", summary=summarize(text), schedule=datetime.datetime.now(),
+            image=detail.get("image"), link=detail.get("link"),
+        )
+        for detail, text in zip(details, texts)
+    ]
+
+
+# ============= SCRAPE STAGE BENCHMARKS =============
+
+class TestScrapeStages:
+    """Benchmarks of reading a source's recorded pages"""
+
+    def test_fetch(self, stage, scraper, items):
+        """Listing request through the recorded transport"""
+        assert stage(scraper.scrape, items=len(items))
+
+    def test_parse(self, stage, scraper, raw, items):
+        """Listing to post dicts"""
+        assert stage(lambda: scraper.parse(raw), items=len(items)) == items
+
+    def test_detail(self, stage, scraper, items):
+        """Article pages of every listed post"""
+        details = stage(lambda: scraper.detail_parser([dict(item) for item in items]), items=len(items))
+        assert details and all(detail.get("content") for detail in details)
+
+
+# ============= POST STAGE BENCHMARKS =============
+
+class TestPostStages:
+    """Benchmarks of turning scraped articles into stored posts"""
+
+    def test_normalize(self, stage, details):
+        contents = [detail["content"] for detail in details]
+        assert stage(lambda: [norm.normalize(content) for content in contents], items=len(contents))
+
+    def test_summarize(self, stage, texts):
+        summaries = stage(lambda: [summarize(text) for text in texts], items=len(texts))
+        assert all(summaries)
+
+    def test_write(self, stage, posts):
+        """Posts into an empty database, search index included"""
+        assert stage(store, items=len(posts), setup=lambda: (fresh_session(), posts)) == len(posts)
+
+
+# ============= PIPELINE BENCHMARKS =============
+
+class TestPipeline:
+    """Benchmark of scrape_source end to end, as a scheduled scrape runs it"""
+
+    def test_scrape_source(self, stage, monkeypatch, source, details):
+        def setup():
+            engine = fresh_engine()
+            monkeypatch.setattr(scraper_module, "engine", engine)
+            monkeypatch.setattr(scraper_utilities, "engine", engine)
+            return source, recorded_client(source)
+
+        assert stage(scrape_source, items=len(details), setup=setup) == len(details)
@@ -4,19 +4,32 @@ Supports direct messages and channel posts.
 Prettified messages in Persian for users.
 """
 
+import asyncio
 import logging
+from typing import List, Optional, Tuple
 from urllib.parse import unquote
-from datetime import time, timezone, timedelta
+from datetime import datetime, timezone, timedelta
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.ext import Application, CommandHandler, ContextTypes
-from scraper.scraper import ScrapeWeb
-from database.db import MovieCRUD, SerialCRUD, EpisodeCRUD, PostCRUD, safe_session, engine
-from bot.config_loader import ADMINS, TOKEN, CHANNEL_ID
-from bot.templats.admin import AdminLayout
-from bot.templats.base import Layout
-from bot.bot_utilities import TelegramMessageSender
-from database.models import Episode
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from httpx import Client
+from scraper.scraper import ScraperContianer, scrape_source
+from scraper.health import HEALTH
+from database.db import (
+    PostCRUD, OutboxCRUD, MovieCRUD, SerialCRUD, QueueCRUD, SeenCRUD, safe_session, engine, create_db,
+    DataVersionWatcher, incremental_vacuum
+)
+from database.captions import render_caption, item_title
+from bot.config_loader import (
+    ADMINS, TOKEN, CHANNEL_ID, DISPATCH_MODE, MEDIA_GROUP_SIZE, DISPATCH_POLL_SECONDS, DISPATCH_RETRY_SECONDS,
+    POST_RETENTION_DAYS, POST_RETENTION_SENT_ONLY, RETENTION_INTERVAL_SECONDS,
+    PURGE_CHUNK_SIZE, VACUUM_PAGES, SEEN_RETENTION_DAYS, PUBLISH_WINDOWS, POSTS_PER_DAY, PUBLISH_LOOKAHEAD
+)
+from bot.templats.base import layouts
+from bot.templats.admin import ADMIN, queue_page_text, queue_page_markup
+from bot.templats.callbacks import CallbackRouter, callbacks
+from bot.scheduler import PostScheduler, parse_windows, spacing_for
+from bot.bot_utilities import TelegramMessageSender, send_photo_cached, send_media_group_cached
 
 # ------------------ Logging ------------------
 logging.basicConfig(
@@ -26,123 +39,154 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 IRAN_TZ = timezone(timedelta(hours=3, minutes=30))
-skip = 0
+data_watcher = DataVersionWatcher(engine)
+# when outbox entries are due again without a new commit, None while none wait
+outbox_retry_at: Optional[datetime] = None
+PUBLISH_JOB = "publish_posts"
+publish_windows = parse_windows(PUBLISH_WINDOWS)
+post_scheduler = PostScheduler(publish_windows, spacing_for(publish_windows, POSTS_PER_DAY), IRAN_TZ)
 
-# ------------------ Layout Container ------------------
-class LayoutContainer:
-    def __init__(self):
-        self.layout_map: dict = {
-            "admin": AdminLayout,
-        }
-
-    def resolve(self, layout: str) -> Layout:
-        layout_: Layout = self.layout_map.get(layout)
-        if layout_:
-            return layout_().render()
-        raise ValueError("Layout not supported")
+# ------------------ Dynamic Telegram Message ------------------
+def build_telegram_message(data: dict) -> Tuple[str, Optional[str]]:
+    """
+    Build the (caption, image_url) of an item (movie, serial, episode).
+    The caption is the one rendered at ingest, items stored without one
+    are rendered with the same template.
+    """
+    message = data.get("caption") or render_caption(data)
+    image_url = data.get("image_url") or data.get("cover_url")
+    return message, image_url
 
 
-# ------------------ Dynamic Telegram Message ------------------
 async def send_to_telegram(data: dict, bot, chat_id: int):
     """
     Send any item (movie, serial, episode) as a Telegram message.
-    Prettified with Persian labels.
-    Uses parent serial image for episodes if no image.
+    Returns False if Telegram refused it.
     """
 
     if not data:
         logger.warning("No data to send")
-        return
-
-    # Fields to show in Persian
-    FIELD_MAP = {
-        "description": "توضیحات",
-        "duration": "مدت زمان",
-        "year": "سال",
-        "imdb": "امتیاز IMDB",
-        "is_persian": "دوبله فارسی ",
-        "season_count": "تعداد فصل‌ها",
+        return False
 
-    }
-
-    lines = []
-
-    # Title
-    title = data.get("title") or data.get("name") or "بدون عنوان"
-    note = data.get("note")
-    RTL = "\u200F"
-
-    lines.append(f'<b>{RTL}📌 {title}</b>')
-    print(note)
-    # If episode, include serial name
-    if data.get("season_id") and "serial" in data:
-        serial_name = data["serial"].get("title") or data["serial"].get("name")
-        if serial_name:
-            lines.append(f"• سریال: {serial_name}")
-    if  note != "":
-        lines.append(f"<b>{RTL}📝 {note}</b>")
-    # Add fields
-    for key, persian_label in FIELD_MAP.items():
-        if key in data and data[key] is not None:
-            value = data[key]
-            if value != 'null' and value != "":
-                if isinstance(value, bool):
-                    value = "✅" if value else "❌"
-                lines.append(f"• {persian_label}: {value}")
-
-    message = "\n".join(lines)
-
-    # Determine image
-    image_url = data.get("image_url") or data.get("cover_url")
-    # Episode fallback to serial image
-    if not image_url and data.get("season_id") and "serial" in data:
-        parent_serial = data["serial"]
-        image_url = parent_serial.get("image_url") or parent_serial.get("cover_url")
+    message, image_url = build_telegram_message(data)
+    title = item_title(data)
 
     try:
         if image_url:
-            await bot.send_photo(chat_id=chat_id, photo=image_url, caption=message, parse_mode=ParseMode.HTML)
+            await send_photo_cached(bot, chat_id, image_url, caption=message, parse_mode=ParseMode.HTML)
         else:
             await bot.send_message(chat_id=chat_id, text=message, parse_mode=ParseMode.HTML)
         logger.info(f"Message sent: {title}")
+        return True
     except Exception as e:
         logger.error(f"Failed to send telegram message: {e}")
+        return False
+
+
+async def send_post(post) -> bool:
+    """Send a scraped post to the channel, False if Telegram refused it"""
+    return await TelegramMessageSender(TOKEN).send_message_with_image(
+        chat_id=CHANNEL_ID,
+        title=post.title,
+        content=post.summary,
+        image_url=post.image,
+        link=unquote(post.link) if post.link else None
+    )
+
 
+async def send_batch_to_telegram(data_list: List[dict], bot, chat_id: int):
+    """
+    Send items as media groups of MEDIA_GROUP_SIZE, one caption per photo.
+    Items without an image, a lone last item and groups Telegram rejects
+    are sent one by one with send_to_telegram.
+    Returns the items that could not be sent.
+    """
+    photos = []
+    singles = []
+    for data in data_list:
+        message, image_url = build_telegram_message(data)
+        if image_url:
+            photos.append((data, image_url, message))
+        else:
+            singles.append(data)
 
-# ------------------ Fetch Last Items ------------------
-async def send_last_items(bot, crud_class, chat_id: int):
+    for start in range(0, len(photos), MEDIA_GROUP_SIZE):
+        group = photos[start:start + MEDIA_GROUP_SIZE]
+        if len(group) < 2:
+            singles.extend(data for data, _, _ in group)
+            continue
+        try:
+            await send_media_group_cached(
+                bot, chat_id,
+                [(image_url, message) for _, image_url, message in group],
+                parse_mode=ParseMode.HTML
+            )
+            logger.info(f"Media group sent: {len(group)} items")
+        except Exception as e:
+            logger.error(f"Failed to send media group, sending one by one: {e}")
+            singles.extend(data for data, _, _ in group)
+
+    failed = []
+    for data in singles:
+        if not await send_to_telegram(data, bot, chat_id):
+            failed.append(data)
+    return failed
+
+
+# ------------------ Outbox Dispatch ------------------
+async def send_outbox(bot, chat_id: int, limit: int = 10):
     """
-    Fetch last 5 items from a CRUD class and send them.
-    Episodes include serial info if image is missing.
+    Claim a batch from the outbox, send its items and ack them.
+    Items that fail are released for a retry, see OutboxCRUD.
+    No session stays open while Telegram is awaited, the claim and the
+    ack each run in a short session of their own.
     """
     with safe_session(engine) as session:
-        result = crud_class.get_last_five(session)
+        claimed = OutboxCRUD.claim(session, limit=limit)
+        if not claimed.success:
+            logger.error(f"Failed to claim outbox: {claimed.error}")
+            return f"❌ {claimed.error}"
+        if not claimed.data:
+            return "OK"
+
+        loaded = OutboxCRUD.load_dispatch(session, claimed.data)
+        if not loaded.success:
+            OutboxCRUD.release(session, claimed.data)
+            return f"❌ {loaded.error}"
+        # the entries outlive the session, they are acked in the next one
+        session.expunge_all()
+
+    # Entries of deleted items have nothing to send and are acked as is
+    pending = [(entry, item.as_dict()) for entry, item in loaded.data if item is not None]
+    if DISPATCH_MODE == "group":
+        failed_data = await send_batch_to_telegram([data for _, data in pending], bot, chat_id)
+        failed_ids = {id(data) for data in failed_data}
+    else:
+        failed_ids = set()
+        for _, data in pending:
+            if not await send_to_telegram(data, bot, chat_id):
+                failed_ids.add(id(data))
 
-        if not result.success:
-            logger.error(f"Failed to fetch data for {crud_class.__name__}: {result.error}")
-            return f"❌ {result.error}"
-
-        items = result.data
-        for item in items:
-            if not item.sent:
-                data = item.model_dump()
-                if isinstance(item, Episode) and getattr(item, "serial", None):
-                    data["serial"] = item.serial.model_dump()
-                await send_to_telegram(data, bot, chat_id)
-                # item.sent = True
-                # session.add(item)
-                # session.commit()
-                session.delete(item)
-                session.commit()
-                
+    failed = [entry for entry, data in pending if id(data) in failed_ids]
+    delivered = [entry for entry in claimed.data if all(entry is not f for f in failed)]
+    with safe_session(engine) as session:
+        acked = OutboxCRUD.ack(session, delivered)
+        released = OutboxCRUD.release(session, failed)
+
+    if not released.success:
+        logger.error(f"Failed to release outbox entries, they are retried after their lease: {released.error}")
+    if not acked.success:
+        # the lease runs out and these entries are posted a second time
+        logger.error(f"Failed to ack {len(delivered)} sent outbox entries: {acked.error}")
+        return f"❌ {acked.error}"
     return "OK"
 
 
 # ------------------ Commands ------------------
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    reply_markup = LayoutContainer().resolve('admin')
     username = update.effective_user.username
     if username in ADMINS:
+        reply_markup = layouts.get("start", ADMIN)
         await update.message.reply_text(f"سلام {update.effective_user.first_name}", reply_markup=reply_markup)
     else:
         await update.message.reply_text(
@@ -152,110 +196,284 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def send_data_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    Command to send all latest movies, serials, and episodes.
+    Command to send the next MEDIA_GROUP_SIZE queued movies, serials and
+    episodes, one media group per call; the rest wait for the next call.
+    """
+    result = await send_outbox(context.bot, CHANNEL_ID, limit=MEDIA_GROUP_SIZE)
+    if result != "OK":
+        await update.message.reply_text(result)
+
+
+async def cmd_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /search <words> : ranked title/description matches across movies, serials and posts
+    """
+    if update.effective_user.username not in ADMINS:
+        return
+    query = " ".join(context.args or [])
+    if not query:
+        await update.message.reply_text("استفاده: /search <عبارت>")
+        return
+
+    lines = []
+    with safe_session(engine) as session:
+        for label, crud in (("🎬", MovieCRUD), ("📺", SerialCRUD), ("📰", PostCRUD)):
+            result = crud.search(session, query, limit=5)
+            if result.success:
+                lines.extend(f"{label} {item.title}" for item in result.data)
+
+    await update.message.reply_text("\n".join(lines) if lines else "نتیجه‌ای پیدا نشد.")
+
+
+async def cmd_health(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /health : breaker state, success rate, latency and parse yield of every scraped source
     """
-    for crud_class in [MovieCRUD, SerialCRUD, EpisodeCRUD]:
-        result = await send_last_items(context.bot, crud_class, CHANNEL_ID)
-        if result != "OK":
-            await update.message.reply_text(result)
+    if update.effective_user.username not in ADMINS:
+        return
+    lines = []
+    for name, health in sorted(HEALTH.items()):
+        stats = health.snapshot()
+        rate = f"{stats['success_rate']:.0%}" if stats["success_rate"] is not None else "-"
+        latency = f"{stats['average_latency']:.1f}s" if stats["average_latency"] is not None else "-"
+        parse_yield = f"{stats['parse_yield']:.1f}" if stats["parse_yield"] is not None else "-"
+        lines.append(
+            f"{name}: {stats['state']} | {rate} of {stats['requests']} requests | {latency} | "
+            f"{parse_yield} items/page | {stats['posts']} posts"
+        )
+    await update.message.reply_text("\n".join(lines) if lines else "هنوز منبعی بررسی نشده.")
+
+
+# ------------------ Admin Callbacks ------------------
+QUEUE_PAGE_SIZE = 5
+admin_router = CallbackRouter(callbacks, guard=lambda update: update.effective_user.username in ADMINS)
+
+
+async def show_queue_page(query, kind: str, cursor: Optional[int] = None):
+    """Edit the callback's message into a page of the review queue"""
+    with safe_session(engine) as session:
+        result = QueueCRUD.page(session, kind, cursor=cursor, limit=QUEUE_PAGE_SIZE)
+    if not result.success:
+        await query.answer(f"❌ {result.error}", show_alert=True)
+        return
+    items, next_cursor = result.data
+    await query.edit_message_text(
+        queue_page_text(kind, items),
+        reply_markup=queue_page_markup(kind, items, cursor, next_cursor)
+    )
+
+
+@admin_router.route("menu")
+async def on_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    await query.edit_message_text(
+        f"سلام {update.effective_user.first_name}", reply_markup=layouts.get("start", ADMIN)
+    )
 
 
-async def send_single_catagory(crud_class, context: ContextTypes.DEFAULT_TYPE):
-        await send_last_items(context.bot, crud_class, CHANNEL_ID)
+@admin_router.route("browse")
+async def on_browse(update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str, cursor: Optional[int]):
+    await update.callback_query.answer()
+    await show_queue_page(update.callback_query, kind, cursor)
+
+
+@admin_router.route("approve")
+async def on_approve(update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str, item_id: int, cursor: Optional[int]):
+    with safe_session(engine) as session:
+        result = QueueCRUD.approve(session, kind, item_id)
+    if kind == "post":
+        wake_publisher(context.job_queue)
+    await update.callback_query.answer("✅" if result.success and result.data else "❌")
+    await show_queue_page(update.callback_query, kind, cursor)
+
+
+@admin_router.route("skip")
+async def on_skip(update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str, item_id: int, cursor: Optional[int]):
+    with safe_session(engine) as session:
+        result = QueueCRUD.mark_sent(session, kind, item_id)
+    await update.callback_query.answer("⏭" if result.success and result.data else "❌")
+    await show_queue_page(update.callback_query, kind, cursor)
+
+
+@admin_router.route("send")
+async def on_send(update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str, item_id: int, cursor: Optional[int]):
+    """Send the item to the channel now, it leaves the queue if Telegram took it"""
+    with safe_session(engine) as session:
+        if kind == "post":
+            item = PostCRUD.get_by_id(session, item_id).data
+            if item is not None:
+                session.expunge(item)
+        else:
+            item = QueueCRUD.load_dispatch(session, kind, item_id).data
+    # no session is open while Telegram is awaited, marking sent gets a fresh one
+    if kind == "post":
+        sent = item is not None and await send_post(item)
+    else:
+        sent = item is not None and await send_to_telegram(item.as_dict(), context.bot, CHANNEL_ID)
+    if sent:
+        with safe_session(engine) as session:
+            result = QueueCRUD.mark_sent(session, kind, item_id)
+        if not result.success:
+            logger.error(f"{kind} {item_id} was sent but not marked sent: {result.error}")
+    await update.callback_query.answer("🚀" if sent else "❌")
+    await show_queue_page(update.callback_query, kind, cursor)
 
 
 # ------------------ Scheduled Jobs ------------------
 async def send_data_job(context: ContextTypes.DEFAULT_TYPE):
     """
-    Scheduled job to send latest movies, serials, and episodes.
+    Scheduled job to send queued movies, serials, and episodes.
+    Reads the outbox after another connection committed, or when entries
+    released after a failed send or left claimed by a crash are due again.
     """
-    for crud_class in [MovieCRUD, SerialCRUD, EpisodeCRUD]:
-        await send_last_items(context.bot, crud_class, CHANNEL_ID)
+    global outbox_retry_at
+    retry_due = outbox_retry_at is not None and datetime.now() >= outbox_retry_at
+    if not data_watcher.changed() and not retry_due:
+        return
+
+    await send_outbox(context.bot, CHANNEL_ID, limit=MEDIA_GROUP_SIZE)
+    with safe_session(engine) as session:
+        result = OutboxCRUD.next_due(session)
+    if not result.success:
+        logger.error(f"Failed to read the next due outbox entry: {result.error}")
+    earliest = datetime.now() + timedelta(seconds=DISPATCH_RETRY_SECONDS)
+    if result.success and result.data is None:
+        outbox_retry_at = None
+    else:
+        outbox_retry_at = max(result.data or earliest, earliest)
 
 
-async def send_with_limit(context: ContextTypes.DEFAULT_TYPE):
+def wake_publisher(job_queue):
     """
-    Send posts with limit, mark them as sent.
+    Reload the next due posts and (re)schedule the publish job for the
+    first of them. Without due posts no job is left waiting.
     """
-    global skip
-    message_sender = TelegramMessageSender(TOKEN)
-    limit = context.job.data.get("limit", 5)
-
     with safe_session(engine) as session:
-        result = PostCRUD.get_all(session, limit=limit, skip=skip)
-        posts = result.data
-
-        for post in posts:
-            if not post.sent:
-                await message_sender.send_message_with_image(
-                    chat_id=CHANNEL_ID,
-                    title=post.title,
-                    content=post.summary,
-                    image_url=post.image,
-                    link=unquote(post.link) if post.link else None
-                )
-                post.sent = True
-                session.add(post)
-                session.commit()
-    skip += limit
-
-async def delete_all_posts(context: ContextTypes.DEFAULT_TYPE):
+        result = PostCRUD.due(session, limit=PUBLISH_LOOKAHEAD)
+    if not result.success:
+        logger.error(f"Failed to load due posts: {result.error}")
+        return
+    post_scheduler.load(result.data)
+    schedule_publish(job_queue)
+
+
+def schedule_publish(job_queue):
+    for job in job_queue.get_jobs_by_name(PUBLISH_JOB):
+        job.schedule_removal()
+    when = post_scheduler.next_run(datetime.now(IRAN_TZ))
+    if when is not None:
+        job_queue.run_once(publish_post_job, when=when, name=PUBLISH_JOB)
+
+
+async def publish_post_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Publish the post that is due now, then sleep until the next one.
+    Posts skipped or sent by hand since they were loaded are passed over.
+    """
+    now = datetime.now(IRAN_TZ)
+    post_id = post_scheduler.pop_due(now)
+    if post_id is not None:
+        with safe_session(engine) as session:
+            post = PostCRUD.get_by_id(session, post_id).data
+            if post is not None:
+                session.expunge(post)
+        # no session is open while Telegram is awaited, marking sent gets a fresh one
+        if post is not None and not post.sent:
+            if await send_post(post):
+                with safe_session(engine) as session:
+                    result = QueueCRUD.mark_sent(session, "post", post_id)
+                if not result.success:
+                    logger.error(f"Post {post_id} was sent but not marked sent: {result.error}")
+            # a refused post stays unsent and is due again on the next reload
+            post_scheduler.sent(now)
+
+    if post_scheduler.heap:
+        schedule_publish(context.job_queue)
+    else:
+        wake_publisher(context.job_queue)
+
+async def purge_posts_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Retention: delete posts past POST_RETENTION_DAYS in chunks and crawled
+    article keys past SEEN_RETENTION_DAYS, then give the freed pages back
+    to the filesystem.
+    """
     with safe_session(engine) as session:
-        try:
-            posts = PostCRUD.get_all(session,limit=1000)
-            for post in posts.data:
-                session.delete(post)
-                session.commit()
-        except:
-            return None
-
-async def run_scraper(context: ContextTypes.DEFAULT_TYPE):
-    await ScrapeWeb(context)
+        result = PostCRUD.purge(
+            session,
+            older_than=timedelta(days=POST_RETENTION_DAYS),
+            sent=True if POST_RETENTION_SENT_ONLY else None,
+            chunk_size=PURGE_CHUNK_SIZE,
+        )
+        SeenCRUD.purge(session, older_than=timedelta(days=SEEN_RETENTION_DAYS))
+    if not result.success:
+        logger.error(f"Post purge failed: {result.error}")
+        return
+    logger.info(f"Purged {result.data} posts")
+    if result.data:
+        incremental_vacuum(engine, VACUUM_PAGES)
+
+async def scrape_source_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Scrape one source, adapt its interval to the new posts it had
+    and schedule its next run, see scraper.schedule.
+    The scrape blocks on http and the database, it runs in a worker
+    thread so handlers and other jobs go on meanwhile.
+    """
+    schedule = context.job.data
+    try:
+        with Client() as session:
+            new_posts = await asyncio.to_thread(scrape_source, schedule.name, session)
+    except Exception as e:
+        logger.error(f"Scraping {schedule.name} failed: {e}")
+        new_posts = 0
+    schedule.observe(new_posts)
+    logger.info(f"Scraped {schedule.name}: {new_posts} new, next in {schedule.interval:.0f}s")
+    if new_posts:
+        # new posts may be due before the one the publisher waits for
+        wake_publisher(context.job_queue)
+    context.job_queue.run_once(
+        scrape_source_job, when=schedule.next_delay(), data=schedule, name=f"scrape_{schedule.name}"
+    )
 app = None
 # ------------------ Run Bot ------------------
 def run():
     global app
+    # Creates tables added since the database file was made (e.g. media cache)
+    create_db()
+    # Items stored before the outbox existed are queued once
+    with safe_session(engine) as session:
+        OutboxCRUD.enqueue_unsent(session)
+    # Keyboards are rendered once, handlers reuse them
+    layouts.build()
     app = Application.builder().token(TOKEN).build()
     app.add_handler(CommandHandler("start", cmd_start))
     app.add_handler(CommandHandler("send_data", send_data_command))
+    app.add_handler(CommandHandler("search", cmd_search))
+    app.add_handler(CommandHandler("health", cmd_health))
+    app.add_handler(CallbackQueryHandler(admin_router.dispatch))
 
-    # # Daily job at 5 PM Iran time
-    # app.job_queue.run_daily(
-    #     callback=ScrapeWeb,
-    #     time=time(hour=16, minute=0, tzinfo=IRAN_TZ),
-    #     name='daily_4pm_job'
-    # )
-    app.job_queue.run_daily(
-        callback=send_with_limit,
-        time=time(hour=17, minute=0, tzinfo=IRAN_TZ),
-        data={'limit': 5},
-        name='daily_5pm_job'
-    )
-
-    app.job_queue.run_repeating(
-        callback=send_with_limit,
-        interval=3800,
-        data={'limit': 5},
-        first=120
-    )
+    # Posts go out one by one in the publishing windows, see bot.scheduler
+    wake_publisher(app.job_queue)
 
     app.job_queue.run_repeating(
-        callback=delete_all_posts,
-        interval=604800,
-        first=604800
+        callback=purge_posts_job,
+        interval=RETENTION_INTERVAL_SECONDS,
+        first=600
     )
 
-    # # Repeat every 6 hours
+    # Cheap data_version check, content is only read after an ingest
     app.job_queue.run_repeating(
         callback=send_data_job,
-        interval=5,
+        interval=DISPATCH_POLL_SECONDS,
         first=2
     )
-    app.job_queue.run_repeating(
-        callback=run_scraper,
-        interval=3600,
-        first=10
-    )
+    # Each source is scraped on its own adaptive interval
+    for schedule in ScraperContianer().schedules().values():
+        app.job_queue.run_once(
+            scrape_source_job, when=schedule.first_delay(), data=schedule, name=f"scrape_{schedule.name}"
+        )
     
     logger.info("✅ Bot scheduled successfully")
     print("🚀 Bot started")
@@ -1,10 +1,12 @@
 import logging
-from telegram import Bot
-from telegram.error import TelegramError
+from telegram import Bot, InputMediaPhoto
+from telegram.error import TelegramError, BadRequest
 from typing import Optional,List
 from html import escape
 import httpx
 from bot.config_loader import CHANNEL_ID
+from database.db import MediaCacheCRUD, safe_session, engine
+from database.captions import CaptionTemplate, CaptionLine
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -13,6 +15,63 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def get_cached_file_id(url: str) -> Optional[str]:
+    """Return the Telegram file_id stored for url, None on cache miss"""
+    with safe_session(engine) as session:
+        result = MediaCacheCRUD.get_by_url(session, url)
+        if result.success and result.data:
+            return result.data.file_id
+    return None
+
+
+def cache_file_id(url: str, message) -> None:
+    """Store the file_id of the largest photo size Telegram returned for url"""
+    if not message or not getattr(message, "photo", None):
+        return None
+    with safe_session(engine) as session:
+        MediaCacheCRUD.save(session, url, message.photo[-1].file_id)
+
+
+async def send_photo_cached(bot, chat_id, photo_url: str, caption: str, parse_mode=None):
+    """
+    Send a photo, reusing Telegram's file_id when the url was uploaded before.
+
+    A repeated image goes out as a file_id so Telegram does not fetch the
+    url again; a stale file_id is dropped and the url is sent instead.
+    """
+    file_id = get_cached_file_id(photo_url)
+    if file_id:
+        try:
+            return await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption, parse_mode=parse_mode)
+        except BadRequest as e:
+            logger.warning(f"Cached file_id rejected for {photo_url}: {e}")
+            with safe_session(engine) as session:
+                MediaCacheCRUD.delete_by_url(session, photo_url)
+
+    message = await bot.send_photo(chat_id=chat_id, photo=photo_url, caption=caption, parse_mode=parse_mode)
+    cache_file_id(photo_url, message)
+    return message
+
+
+async def send_media_group_cached(bot, chat_id, photos: List[tuple], parse_mode=None):
+    """
+    Send 2-10 (photo_url, caption) pairs as one media group.
+
+    Cached file_ids are used where known and the file_ids of the sent
+    messages are stored for the urls that were uploaded.
+    """
+    media = []
+    for photo_url, caption in photos:
+        file_id = get_cached_file_id(photo_url)
+        media.append(InputMediaPhoto(media=file_id or photo_url, caption=caption, parse_mode=parse_mode))
+
+    messages = await bot.send_media_group(chat_id=chat_id, media=media)
+    for (photo_url, _), item, message in zip(photos, media, messages):
+        if item.media == photo_url:
+            cache_file_id(photo_url, message)
+    return messages
+
+
 class TelegramMessageSender:
     """
     Send formatted messages with images to Telegram
@@ -60,9 +119,10 @@ class TelegramMessageSender:
             
             # Send with image if provided
             if image_url:
-                await self.bot.send_photo(
+                await send_photo_cached(
+                    self.bot,
                     chat_id=chat_id,
-                    photo=image_url,
+                    photo_url=image_url,
                     caption=message_text,
                     parse_mode=parse_mode if parse_mode != "plain" else None
                 )
@@ -109,84 +169,69 @@ def fetch_data_from_api(endpoint):
         logger.error(f"Error fetching data: {e}")
         return None
 
+def first_country(data):
+    countries = data.get("countries") or []
+    return countries[0]["title"] if countries else None
+
+
+def actor_names(data):
+    return ", ".join(actor["name"] for actor in data.get("actors") or [])
+
+
+def trailer_url(data):
+    return (data.get("trailer") or {}).get("url")
+
+
+def episode_field(*path):
+    def get(data):
+        value = data.get("episode")
+        for key in path:
+            value = (value or {}).get(key)
+        return value
+    return get
+
+
+# Captions of API payloads (countries, actors and trailer nested), compiled once
+API_HEAD = [
+    CaptionLine("title", "<b>{}</b>\n"),
+    CaptionLine("year", "📅 <i>سال:</i> {}"),
+    CaptionLine("duration", "🕒 <i>مدت زمان:</i> {}"),
+    CaptionLine("imdb", "⭐ <i>امتیاز IMDB:</i> {}"),
+    CaptionLine(first_country, "📍 <i>کشور:</i> {}"),
+    CaptionLine(actor_names, "🎭 <i>بازیگران:</i> {}", shrinkable=True),
+    CaptionLine("description", "📝 <i>توضیحات:</i> {}", shrinkable=True),
+]
+API_TAIL = [
+    # the escaped url is counted as visible text, which only errs on the short side
+    CaptionLine(trailer_url, "🎬 <a href='{}'>تماشای تریلر</a>"),
+    CaptionLine(lambda data: CHANNEL_ID, "\n\n🔗 {}"),
+]
+MOVIE_MESSAGE = CaptionTemplate(API_HEAD + API_TAIL)
+SERIES_MESSAGE = CaptionTemplate(API_HEAD + [
+    CaptionLine(lambda data: data.get("season_count", "N/A"), "📺 <i>فصل ها:</i> {}"),
+] + API_TAIL)
+EPISODE_MESSAGE = CaptionTemplate(API_HEAD + [
+    CaptionLine(episode_field("title"), "🎬 <i>قسمت:</i> {}"),
+    CaptionLine(episode_field("description"), "📝 <i>توضیحات قسمت:</i> {}", shrinkable=True),
+    CaptionLine(episode_field("season", "title"), "📺 <i>فصل:</i> {}"),
+] + API_TAIL)
+NO_DATA_MESSAGE = "داده ای برای ارسال وجود ندارد."
+
+
 # Format movie data to send as Telegram message
 def format_movie_message(data):
     if data["type"] == "movie":
-        message = f"<b>{data['title']}</b>\n\n"  # Title in bold
-        message += f"📅 <i>سال:</i> {data['year']}\n"
-        message += f"🕒 <i>مدت زمان:</i> {data['duration']}\n"
-        message += f"⭐ <i>امتیاز IMDB:</i> {data['imdb']}\n"
-        message += f"📍 <i>کشور:</i> {data['countries'][0]['title']}\n"
-        message += f"🎭 <i>بازیگران:</i> {', '.join([actor['name'] for actor in data['actors']])}\n"
-        message += f"📝 <i>توضیحات:</i> {data['description']}\n"
-        
-        # Add trailer if available
-        trailer_url = data.get("trailer", {}).get("url", None)
-        if trailer_url:
-            message += f"🎬 <a href='{trailer_url}'>تماشای تریلر</a>\n"
-        
-        # Add channel username at the end
-        message += f"\n\n🔗 {CHANNEL_ID}"
-        
-        return message
-    return "داده ای برای ارسال وجود ندارد."
+        return MOVIE_MESSAGE.render(data)
+    return NO_DATA_MESSAGE
 
 # Format series data to send as Telegram message
 def format_series_message(data):
     if data["type"] == "serie":
-        message = f"<b>{data['title']}</b>\n\n"  # Title in bold
-        message += f"📅 <i>سال:</i> {data['year']}\n"
-        message += f"🕒 <i>مدت زمان:</i> {data['duration']}\n"
-        message += f"⭐ <i>امتیاز IMDB:</i> {data['imdb']}\n"
-        message += f"📍 <i>کشور:</i> {data['countries'][0]['title']}\n"
-        message += f"🎭 <i>بازیگران:</i> {', '.join([actor['name'] for actor in data['actors']])}\n"
-        message += f"📝 <i>توضیحات:</i> {data['description']}\n"
-        
-        # Add season count for series
-        message += f"📺 <i>فصل ها:</i> {data.get('season_count', 'N/A')}\n"
-        
-        # Add trailer if available
-        trailer_url = data.get("trailer", {}).get("url", None)
-        if trailer_url:
-            message += f"🎬 <a href='{trailer_url}'>تماشای تریلر</a>\n"
-        
-        # Add channel username at the end
-        message += f"\n\n🔗 {CHANNEL_ID}"
-        
-        return message
-    return "داده ای برای ارسال وجود ندارد."
+        return SERIES_MESSAGE.render(data)
+    return NO_DATA_MESSAGE
 
 # Format episode data to send as Telegram message
 def format_episode_message(data):
-    # Check if 'episode' exists in the data
     if "episode" in data:
-        # Begin constructing the message
-        message = f"<b>{data['title']}</b>\n\n"
-        message += f"📅 <i>سال:</i> {data['year']}\n"
-        message += f"🕒 <i>مدت زمان:</i> {data['duration']}\n"
-        message += f"⭐ <i>امتیاز IMDB:</i> {data['imdb']}\n"
-        message += f"📍 <i>کشور:</i> {data['countries'][0]['title']}\n"
-        
-        # Add actors
-        message += f"🎭 <i>بازیگران:</i> {', '.join([actor['name'] for actor in data['actors']])}\n"
-        
-        # Add description
-        message += f"📝 <i>توضیحات:</i> {data['description']}\n"
-        
-        # Add episode specific info
-        episode = data["episode"]
-        message += f"🎬 <i>قسمت:</i> {episode['title']}\n"
-        message += f"📝 <i>توضیحات قسمت:</i> {episode['description']}\n"
-        message += f"📺 <i>فصل:</i> {episode['season']['title']}\n"
-        
-        # Add trailer link
-        trailer_url = data.get("trailer", {}).get("url", None)
-        if trailer_url:
-            message += f"🎬 <a href='{trailer_url}'>تماشای تریلر</a>\n"
-        
-        # Add channel link
-        message += f"\n\n🔗 {CHANNEL_ID}"
-
-        return message
-    return "داده ای برای ارسال وجود ندارد."
-
+        return EPISODE_MESSAGE.render(data)
+    return NO_DATA_MESSAGE
@@ -27,3 +27,37 @@ if not ADMINS:
 DB_PATH = os.getenv("DB_PATH", BASE_DIR / "movie.db")
 DB_PATH = str(DB_PATH)
 
+
+
+# Channel dispatch policy: "single" sends one photo per item,
+# "group" packs queued items into media groups of MEDIA_GROUP_SIZE (max 10)
+DISPATCH_MODE = os.getenv("DISPATCH_MODE", "single")
+if DISPATCH_MODE not in ("single", "group"):
+    raise RuntimeError("DISPATCH_MODE must be 'single' or 'group'")
+MEDIA_GROUP_SIZE = max(2, min(int(os.getenv("MEDIA_GROUP_SIZE", 10)), 10))
+
+# Seconds between PRAGMA data_version checks for newly ingested items
+DISPATCH_POLL_SECONDS = float(os.getenv("DISPATCH_POLL_SECONDS", 1))
+# Seconds at least between retries of outbox entries released after a failed
+# send or left claimed past their lease, without a new ingest to wake the bot
+DISPATCH_RETRY_SECONDS = float(os.getenv("DISPATCH_RETRY_SECONDS", 60))
+
+# Post retention: posts older than POST_RETENTION_DAYS are deleted every
+# RETENTION_INTERVAL_SECONDS, only the sent ones unless POST_RETENTION_SENT_ONLY
+# is false, PURGE_CHUNK_SIZE rows per transaction
+POST_RETENTION_DAYS = float(os.getenv("POST_RETENTION_DAYS", 7))
+POST_RETENTION_SENT_ONLY = os.getenv("POST_RETENTION_SENT_ONLY", "true").lower() in ("1", "true", "yes")
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", 86400))
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", 500))
+# Crawled article keys are remembered longer than the posts, so purged
+# articles are not scraped again while they are still on a listing page
+SEEN_RETENTION_DAYS = float(os.getenv("SEEN_RETENTION_DAYS", 90))
+# Free pages given back to the filesystem after each purge
+VACUUM_PAGES = int(os.getenv("VACUUM_PAGES", 1000))
+
+# Scheduled publishing: posts go out inside PUBLISH_WINDOWS (Iran time,
+# "HH:MM-HH:MM" comma separated), spread evenly for POSTS_PER_DAY posts;
+# the next PUBLISH_LOOKAHEAD due posts are kept in memory
+PUBLISH_WINDOWS = os.getenv("PUBLISH_WINDOWS", "09:00-23:00")
+POSTS_PER_DAY = int(os.getenv("POSTS_PER_DAY", 48))
+PUBLISH_LOOKAHEAD = int(os.getenv("PUBLISH_LOOKAHEAD", 20))
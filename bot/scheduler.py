@@ -0,0 +1,109 @@
+"""
+Scheduled publishing of posts
+
+Posts are published in the order of Post.schedule, one at a time, inside
+the publishing windows of the day and at least `spacing` apart, so the
+channel gets a steady cadence instead of bursts. The scheduler keeps the
+next few due posts in a min-heap and tells the bot when to wake up next;
+nothing polls while there is nothing to send.
+"""
+
+import heapq
+from datetime import datetime, time, timedelta, tzinfo
+from typing import Iterable, List, Optional, Tuple
+
+
+# job queue wake-ups can be a little early
+EARLY_WAKE_TOLERANCE = timedelta(seconds=1)
+
+
+class PublishingWindow:
+    """Daily [start, end) time range in which posts may go out"""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: time, end: time):
+        if start >= end:
+            raise ValueError(f"Publishing window {start}-{end} must end after it starts")
+        self.start = start
+        self.end = end
+
+    @property
+    def seconds(self) -> float:
+        return (datetime.combine(datetime.min, self.end) - datetime.combine(datetime.min, self.start)).total_seconds()
+
+    def __repr__(self):
+        return f"PublishingWindow({self.start:%H:%M}-{self.end:%H:%M})"
+
+
+def parse_windows(value: str) -> List[PublishingWindow]:
+    """'09:00-13:00,17:00-23:30' as windows in start order"""
+    windows = []
+    for part in value.split(","):
+        start, end = (time.fromisoformat(bound.strip()) for bound in part.split("-"))
+        windows.append(PublishingWindow(start, end))
+    return sorted(windows, key=lambda window: window.start)
+
+
+def spacing_for(windows: List[PublishingWindow], posts_per_day: int) -> timedelta:
+    """Gap that spreads posts_per_day posts evenly over the windows of a day"""
+    return timedelta(seconds=sum(window.seconds for window in windows) / max(posts_per_day, 1))
+
+
+class PostScheduler:
+    """
+    Min-heap of the next due (schedule, post id) pairs.
+    load() replaces it from the database, next_run() says when to wake,
+    pop_due() hands out the post to publish now, if any.
+    """
+
+    def __init__(self, windows: List[PublishingWindow], spacing: timedelta, tz: tzinfo):
+        self.windows = windows
+        self.spacing = spacing
+        self.tz = tz
+        self.heap: List[Tuple[datetime, int]] = []
+        self.last_sent: Optional[datetime] = None
+
+    def local(self, moment: Optional[datetime]) -> datetime:
+        """Stored schedules are naive server-local times, NULL means as soon as possible"""
+        if moment is None:
+            return datetime.min.replace(tzinfo=self.tz)
+        return moment.astimezone(self.tz)
+
+    def load(self, rows: Iterable[Tuple[int, Optional[datetime]]]):
+        """(post id, schedule) rows of the next due posts"""
+        self.heap = [(self.local(schedule), post_id) for post_id, schedule in rows]
+        heapq.heapify(self.heap)
+
+    def next_slot(self, after: datetime) -> datetime:
+        """First moment at or after `after` inside a window and `spacing` after the last post"""
+        candidate = after.astimezone(self.tz)
+        if self.last_sent is not None:
+            candidate = max(candidate, self.last_sent + self.spacing)
+        day = candidate.date()
+        for offset in range(2):
+            for window in self.windows:
+                start = datetime.combine(day + timedelta(days=offset), window.start, self.tz)
+                end = datetime.combine(day + timedelta(days=offset), window.end, self.tz)
+                if candidate < start:
+                    return start
+                if candidate < end:
+                    return candidate
+        raise AssertionError("No publishing window in the next two days")
+
+    def next_run(self, now: datetime) -> Optional[datetime]:
+        """When the next post may go out, None when the heap is empty"""
+        if not self.heap:
+            return None
+        return self.next_slot(max(self.heap[0][0], now.astimezone(self.tz)))
+
+    def pop_due(self, now: datetime) -> Optional[int]:
+        """Id of the post to publish now, None if it is not time yet"""
+        now = now.astimezone(self.tz)
+        next_run = self.next_run(now)
+        if next_run is None or next_run > now + EARLY_WAKE_TOLERANCE:
+            return None
+        return heapq.heappop(self.heap)[1]
+
+    def sent(self, now: datetime):
+        """Record a publication, the next one waits `spacing`"""
+        self.last_sent = now.astimezone(self.tz)
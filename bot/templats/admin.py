@@ -1,32 +1,49 @@
-import json
-from typing import List
-from .base import Button,Layout
-from telegram import (
-    Update,
-    CallbackQuery,
-    InlineKeyboardMarkup,
-
-)
-
-class AdminLayout(Layout):  
-
-    def add_one_line_button(self,text:str,callback_data:dict):
-        button = Button(text,callback_data).render()
-        self.layout.append([button])
-
-
-    def __add_buttons(self,buttons:List[Button]):
-        row = []
-        for button in buttons:
-            button = Button(button.text,callback_data=button.callback_data).render()
-            row.append(button)
-        self.layout.append(row)
-    
-    def __render_defaults(self):
-        self.__add_buttons([Button("A",{'class':"A"}),Button("B",{'class':"B"})])
-        return None
-    
-    def render(self):
-        self.__render_defaults()
-        return InlineKeyboardMarkup(self.layout)
+from typing import List, Optional
 
+from telegram import InlineKeyboardMarkup
+
+from .base import Button, Layout, layouts
+from .callbacks import callbacks
+
+
+ADMIN = "admin"
+QUEUE_LABELS = {"post": "📰 پست‌ها", "movie": "🎬 فیلم‌ها", "serial": "📺 سریال‌ها"}
+
+callbacks.register("menu")
+callbacks.register("browse", kind=str, cursor=int)
+# cursor is the page the action was pressed on, it is shown again afterwards
+callbacks.register("approve", kind=str, item_id=int, cursor=int)
+callbacks.register("skip", kind=str, item_id=int, cursor=int)
+callbacks.register("send", kind=str, item_id=int, cursor=int)
+
+
+@layouts.register("start", ADMIN)
+def admin_start():
+    return [[Button(label, "browse", kind=kind)] for kind, label in QUEUE_LABELS.items()]
+
+
+def queue_page_text(kind: str, items) -> str:
+    if not items:
+        return f"{QUEUE_LABELS[kind]}: صف خالی است."
+    lines = [f"{QUEUE_LABELS[kind]} در صف:"]
+    lines.extend(f"{number}. {item.title}" for number, item in enumerate(items, start=1))
+    return "\n".join(lines)
+
+
+def queue_page_markup(kind: str, items, cursor: Optional[int], next_cursor: Optional[int]) -> InlineKeyboardMarkup:
+    """One row of actions per item, then the page navigation"""
+    rows: List[List[Button]] = []
+    for number, item in enumerate(items, start=1):
+        args = dict(kind=kind, item_id=item.id, cursor=cursor)
+        rows.append([
+            Button(f"{number} ✅", "approve", **args),
+            Button(f"{number} ⏭", "skip", **args),
+            Button(f"{number} 🚀", "send", **args),
+        ])
+    navigation = [Button("🏠", "menu")]
+    if cursor is not None:
+        navigation.append(Button("⏮ اول", "browse", kind=kind))
+    if next_cursor is not None:
+        navigation.append(Button("بعدی ⬅️", "browse", kind=kind, cursor=next_cursor))
+    rows.append(navigation)
+    return Layout(rows).render()
@@ -1,49 +1,76 @@
-import json
-from typing import List
+"""
+Inline keyboard layouts
+
+A layout is a function returning rows of Buttons, registered under a name
+and a role. LayoutRegistry.build() renders every layout once at startup
+into an immutable InlineKeyboardMarkup, handlers only look it up.
+"""
+
+from typing import Callable, Dict, List, Sequence, Tuple
 from telegram import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
 
 )
 
+from .callbacks import callbacks
+
 
 class Button:
-    def __init__(self,text:str,callback_data):
+    """Inline button of a registered callback action"""
+    __slots__ = ("text", "callback_data")
+
+    def __init__(self, text: str, action: str, **args):
         self.text = text
-        self.callback_data = json.dumps(callback_data)
+        self.callback_data = callbacks.encode(action, **args)
+
+    def render(self) -> InlineKeyboardButton:
+        return InlineKeyboardButton(text=self.text, callback_data=self.callback_data)
 
-    def render(self):
-        return InlineKeyboardButton(text=self.text,callback_data=self.callback_data)
-    
     def __repr__(self):
         return f"Button({self.text}-{self.callback_data})"
 
 
-
 class Layout:
+    """Rows of buttons, frozen once made"""
+    __slots__ = ("rows",)
 
-    def __init__(self):
-        self.layout:List[Button] = []
-        self.keyboard:List[List[Button]] = []
+    def __init__(self, rows: Sequence[Sequence[Button]]):
+        self.rows: Tuple[Tuple[Button, ...], ...] = tuple(tuple(row) for row in rows)
 
-    def add_one_line_button(self,text:str,callback_data:dict):
-        button = Button(text,callback_data).render()
-        self.layout.append([button])
+    def render(self) -> InlineKeyboardMarkup:
+        return InlineKeyboardMarkup([[button.render() for button in row] for row in self.rows])
+
+
+LayoutBuilder = Callable[[], List[List[Button]]]
+
+
+class LayoutRegistry:
+    """Keyboards keyed by (layout name, role), rendered once by build()"""
+
+    def __init__(self):
+        self._builders: Dict[Tuple[str, str], LayoutBuilder] = {}
+        self._markups: Dict[Tuple[str, str], InlineKeyboardMarkup] = {}
 
+    def register(self, name: str, role: str):
+        """Decorator registering a function returning the rows of a layout"""
+        def decorator(builder: LayoutBuilder) -> LayoutBuilder:
+            self._builders[(name, role)] = builder
+            return builder
+        return decorator
 
-    def __add_buttons(self,buttons:List[Button]):
-        row = []
-        for button in buttons:
-            button = Button(button.text,callback_data=button.callback_data).render()
-            row.append(button)
-        self.layout.append(row)
+    def build(self):
+        """Render every registered layout, call once at startup"""
+        self._markups = {key: Layout(builder()).render() for key, builder in self._builders.items()}
 
-    def __render_defaults(self):
-        return None
-    
-    def render(self):
-        self.__render_defaults()
-        return InlineKeyboardMarkup(self.layout)
-    
+    def get(self, name: str, role: str) -> InlineKeyboardMarkup:
+        markup = self._markups.get((name, role))
+        if markup is None:
+            if (name, role) not in self._builders:
+                raise ValueError("Layout not supported")
+            self.build()
+            markup = self._markups[(name, role)]
+        return markup
 
 
+layouts = LayoutRegistry()
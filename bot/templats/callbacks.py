@@ -0,0 +1,149 @@
+"""
+Compact callback_data for inline keyboards
+
+Telegram limits callback_data to 64 bytes. Instead of JSON, a payload is
+the short code of a registered action followed by its arguments, ints in
+base 36, joined with ":" - e.g. "b:m:2s" for browse(kind="m", cursor=100).
+Decoding is a split and one dict lookup, CallbackRouter hands the
+arguments to the handler of the action.
+"""
+
+import string
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+CALLBACK_DATA_LIMIT = 64
+SEPARATOR = ":"
+DIGITS = string.digits + string.ascii_lowercase
+
+logger = logging.getLogger(__name__)
+
+
+def to_base36(value: int) -> str:
+    if value < 0:
+        return "-" + to_base36(-value)
+    digits = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        digits = DIGITS[remainder] + digits
+        if not value:
+            return digits
+
+
+class CallbackAction:
+    """A registered action: its short code and typed arguments, in order"""
+    __slots__ = ("name", "code", "fields")
+
+    def __init__(self, name: str, code: str, fields: Tuple[Tuple[str, type], ...]):
+        self.name = name
+        self.code = code
+        self.fields = fields
+
+
+class Callback:
+    """A decoded callback_data"""
+    __slots__ = ("action", "args")
+
+    def __init__(self, action: str, args: Dict[str, object]):
+        self.action = action
+        self.args = args
+
+    def __repr__(self):
+        return f"Callback({self.action}, {self.args})"
+
+
+class CallbackCodec:
+    """Registry of callback actions, encodes and decodes their payloads"""
+
+    def __init__(self):
+        self._by_name: Dict[str, CallbackAction] = {}
+        self._by_code: Dict[str, CallbackAction] = {}
+
+    def register(self, name: str, code: Optional[str] = None, **fields: type) -> CallbackAction:
+        """
+        Register an action with int or str arguments, e.g. register("browse", kind=str, cursor=int).
+        The code defaults to the next free base 36 number.
+        """
+        if name in self._by_name:
+            raise ValueError(f"Callback action {name} is already registered")
+        code = code or to_base36(len(self._by_code))
+        if code in self._by_code or SEPARATOR in code:
+            raise ValueError(f"Callback code {code!r} of {name} is taken or invalid")
+        for field, kind in fields.items():
+            if kind not in (int, str):
+                raise TypeError(f"Callback argument {name}.{field} must be int or str")
+        action = CallbackAction(name, code, tuple(fields.items()))
+        self._by_name[name] = action
+        self._by_code[code] = action
+        return action
+
+    def encode(self, name: str, **values) -> str:
+        """callback_data of an action, a missing or None argument is sent empty"""
+        action = self._by_name[name]
+        parts = [action.code]
+        for field, kind in action.fields:
+            value = values.get(field)
+            if value is None:
+                parts.append("")
+            elif kind is int:
+                parts.append(to_base36(int(value)))
+            elif SEPARATOR in str(value):
+                raise ValueError(f"Callback argument {name}.{field} contains {SEPARATOR!r}")
+            else:
+                parts.append(str(value))
+        data = SEPARATOR.join(parts)
+        if len(data.encode("utf-8")) > CALLBACK_DATA_LIMIT:
+            raise ValueError(f"Callback data of {name} is over {CALLBACK_DATA_LIMIT} bytes")
+        return data
+
+    def decode(self, data: str) -> Callback:
+        """Raises ValueError for data this codec did not make"""
+        code, *parts = data.split(SEPARATOR)
+        action = self._by_code.get(code)
+        if action is None or len(parts) != len(action.fields):
+            raise ValueError(f"Unknown callback data {data!r}")
+        args = {}
+        for (field, kind), part in zip(action.fields, parts):
+            args[field] = None if part == "" else (int(part, 36) if kind is int else part)
+        return Callback(action.name, args)
+
+
+class CallbackRouter:
+    """
+    Calls the handler registered for the action of a callback query,
+    with the decoded arguments as keyword arguments.
+    guard(update) is checked first, queries it refuses are only answered.
+    """
+
+    def __init__(self, codec: CallbackCodec, guard: Optional[Callable[[object], bool]] = None):
+        self.codec = codec
+        self.guard = guard
+        self._handlers: Dict[str, Callable[..., Awaitable]] = {}
+
+    def route(self, name: str):
+        """Decorator registering the handler of an action"""
+        def decorator(handler):
+            self._handlers[name] = handler
+            return handler
+        return decorator
+
+    async def dispatch(self, update, context):
+        query = update.callback_query
+        if self.guard is not None and not self.guard(update):
+            await query.answer("⛔")
+            return
+        try:
+            callback = self.codec.decode(query.data or "")
+        except ValueError:
+            logger.warning(f"Unknown callback data: {query.data!r}")
+            await query.answer()
+            return
+        handler = self._handlers.get(callback.action)
+        if handler is None:
+            await query.answer()
+            return
+        await handler(update, context, **callback.args)
+
+
+callbacks = CallbackCodec()
@@ -0,0 +1,135 @@
+"""
+This Module Contains the channel caption templates
+
+A CaptionTemplate is compiled once from its lines: the markup around each
+field is split and measured up front, so rendering only escapes every field
+value once and joins the pieces. Captions of movies, serials and episodes are
+rendered when the item is stored and kept in its caption column; the bot
+sends them as they are.
+
+Telegram refuses captions longer than CAPTION_LIMIT characters (counted
+without the HTML tags), render() shortens the long text fields to fit.
+"""
+
+import re
+from html import escape, unescape
+from typing import Any, Callable, Iterable, List, Union
+
+
+CAPTION_LIMIT = 1024
+ELLIPSIS = "…"
+RTL = "\u200F"
+TAG = re.compile(r"<[^>]*>")
+# Values that mean "no data" and drop their line
+EMPTY_VALUES = (None, "", "null")
+
+
+def visible_length(markup: str) -> int:
+    """Characters Telegram counts for an HTML snippet, tags excluded"""
+    return len(unescape(TAG.sub("", markup)))
+
+
+def field_getter(name: str) -> Callable[[Any], Any]:
+    """Read name from a dict or an object (model, projection)"""
+    def get(item):
+        if isinstance(item, dict):
+            return item.get(name)
+        return getattr(item, name, None)
+    return get
+
+
+def format_value(value) -> str:
+    if isinstance(value, bool):
+        return "✅" if value else "❌"
+    return str(value)
+
+
+def shorten(text: str, length: int) -> str:
+    """text cut to length characters including the ellipsis, on a word boundary when one is near"""
+    cut = text[:max(length - len(ELLIPSIS), 0)]
+    space = cut.rfind(" ")
+    if space > len(cut) // 2:
+        cut = cut[:space]
+    return cut.rstrip() + ELLIPSIS
+
+
+class CaptionLine:
+    """
+    One line of a caption: markup with a single {} where the escaped field value goes.
+    shrinkable lines are shortened (then dropped) when the caption is too long.
+    """
+    __slots__ = ("get", "prefix", "suffix", "fixed_length", "format", "shrinkable")
+
+    def __init__(
+        self,
+        source: Union[str, Callable[[Any], Any]],
+        markup: str,
+        format: Callable[[Any], str] = format_value,
+        shrinkable: bool = False,
+    ):
+        self.get = field_getter(source) if isinstance(source, str) else source
+        self.prefix, self.suffix = markup.split("{}", 1)
+        self.fixed_length = visible_length(self.prefix + self.suffix)
+        self.format = format
+        self.shrinkable = shrinkable
+
+
+class CaptionTemplate:
+    """Compiled caption, render() fills it from a dict or an object"""
+
+    def __init__(self, lines: Iterable[CaptionLine], limit: int = CAPTION_LIMIT):
+        self.lines = tuple(lines)
+        self.limit = limit
+
+    def render(self, item) -> str:
+        texts: List[list] = []
+        for line in self.lines:
+            value = line.get(item)
+            if value in EMPTY_VALUES:
+                continue
+            texts.append([line, line.format(value)])
+
+        # one newline between lines
+        overflow = sum(line.fixed_length + len(text) + 1 for line, text in texts) - 1 - self.limit
+        if overflow > 0:
+            texts = self.fit(texts, overflow)
+        return "\n".join(line.prefix + escape(text) + line.suffix for line, text in texts)
+
+    @staticmethod
+    def fit(texts: List[list], overflow: int) -> List[list]:
+        """Shorten the longest shrinkable lines first, drop trailing lines if that is not enough"""
+        for entry in sorted((e for e in texts if e[0].shrinkable), key=lambda e: -len(e[1])):
+            line, text = entry
+            if len(text) - overflow >= len(ELLIPSIS) + 1:
+                entry[1] = shorten(text, len(text) - overflow)
+                return texts
+            overflow -= line.fixed_length + len(text) + 1
+            texts = [e for e in texts if e is not entry]
+            if overflow <= 0:
+                return texts
+        while overflow > 0 and len(texts) > 1:
+            line, text = texts.pop()
+            overflow -= line.fixed_length + len(text) + 1
+        return texts
+
+
+def item_title(item) -> str:
+    return field_getter("title")(item) or field_getter("name")(item) or "بدون عنوان"
+
+
+# Movies, serials and episodes, fields an item does not have are skipped
+ITEM_CAPTION = CaptionTemplate([
+    CaptionLine(item_title, f"<b>{RTL}📌 {{}}</b>"),
+    CaptionLine("note", f"<b>{RTL}📝 {{}}</b>", shrinkable=True),
+    CaptionLine("description", "• توضیحات: {}", shrinkable=True),
+    CaptionLine("duration", "• مدت زمان: {}"),
+    CaptionLine("year", "• سال: {}"),
+    CaptionLine("imdb", "• امتیاز IMDB: {}"),
+    CaptionLine("is_persian", "• دوبله فارسی : {}"),
+    CaptionLine("season_count", "• تعداد فصل‌ها: {}"),
+])
+
+
+def render_caption(item) -> str:
+    """Channel caption of a movie, serial or episode (model, projection or dict)"""
+    return ITEM_CAPTION.render(item)
@@ -0,0 +1,307 @@
+"""
+This Module Contains a small built-in schema migration runner
+
+Applied migrations are recorded in the schema_version table, so each one
+runs once per database. migrate() also creates tables and indexes the
+models gained since the database file was made (new columns of existing
+tables need a migration calling add_column); indexes are built one per
+short transaction with the database in WAL mode, so the API and the bot keep
+reading while they are built.
+
+migrate() runs on every bot and API start, so it only does what can run
+next to them. Switching an existing database to incremental auto_vacuum
+rewrites the whole file with a full VACUUM; that is a separate, offline
+command (new databases get the mode from migrate() at no cost).
+
+    python -m database.migrations           apply pending migrations
+    python -m database.migrations --check   report what is missing, exit 1 if anything is
+    python -m database.migrations --vacuum  offline: switch to incremental auto_vacuum with a full VACUUM
+"""
+
+import sys
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from sqlmodel import SQLModel, Session, select
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine as SAEngine
+from sqlalchemy.schema import CreateIndex, CreateColumn
+
+from .db import SearchIndex, FacetCRUD, facet_rename_ddl, engine as db_engine
+from .models import Post, Movie, Serial, Episode
+from .captions import render_caption
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = "schema_version"
+# Tables made by DDL events instead of models
+DERIVED_TABLES = ["search_index"]
+BUSY_TIMEOUT_MS = 30000
+# PRAGMA auto_vacuum value of INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[SAEngine], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Register a migration, versions must be added in increasing order"""
+    def register(apply: Callable[[SAEngine], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} is not after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, name, apply))
+        return apply
+    return register
+
+
+# ============= MIGRATIONS =============
+
+@migration(1, "fill search index")
+def fill_search_index(engine: SAEngine):
+    with Session(engine) as session:
+        SearchIndex.rebuild(session)
+
+
+@migration(2, "fill catalog facets")
+def fill_catalog_facets(engine: SAEngine):
+    with Session(engine) as session:
+        result = FacetCRUD.rebuild(session)
+        if not result.success:
+            raise RuntimeError(result.error)
+
+
+@migration(3, "post created_at")
+def post_created_at(engine: SAEngine):
+    # rows older than the column start their retention period now
+    add_column(engine, Post.__table__.c.created_at)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "UPDATE post SET created_at = ? WHERE created_at IS NULL",
+            (datetime.now().isoformat(sep=" "),),
+        )
+
+
+@migration(4, "incremental auto vacuum")
+def incremental_auto_vacuum(engine: SAEngine):
+    # the full VACUUM an existing database needs to switch blocks every
+    # reader and writer, it is left to the offline --vacuum command
+    if auto_vacuum_mode(engine) != AUTO_VACUUM_INCREMENTAL:
+        logger.warning("auto_vacuum is not incremental, run python -m database.migrations --vacuum while the bot and API are stopped")
+
+
+@migration(5, "item captions")
+def item_captions(engine: SAEngine):
+    for model in (Movie, Serial, Episode):
+        add_column(engine, model.__table__.c.caption)
+        with Session(engine) as session:
+            for item in session.exec(select(model).where(model.caption == None)):
+                item.caption = render_caption(item)
+            session.commit()
+
+
+@migration(6, "merging facet rename triggers")
+def merging_facet_rename_triggers(engine: SAEngine):
+    # the first rename triggers renamed the row in place and failed on a title that had one
+    with engine.begin() as connection:
+        for table in ("genre", "country"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS facet_{table}_rename")
+        for statement in facet_rename_ddl():
+            connection.exec_driver_sql(statement)
+
+
+# ============= RUNNER =============
+
+def ensure_version_table(engine: SAEngine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} "
+            "(version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+        )
+
+
+def applied_versions(engine: SAEngine) -> List[int]:
+    if not inspect(engine).has_table(SCHEMA_VERSION_TABLE):
+        return []
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"SELECT version FROM {SCHEMA_VERSION_TABLE}").all()
+    return [version for version, in rows]
+
+
+def pending_migrations(engine: SAEngine) -> List[Migration]:
+    applied = set(applied_versions(engine))
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def missing_indexes(engine: SAEngine) -> list:
+    """Model indexes the database does not have"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.extend(table.indexes)
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def missing_columns(engine: SAEngine) -> List[str]:
+    """table.column of model columns missing from existing tables"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+    return missing
+
+
+def create_index_online(engine: SAEngine, index):
+    """Build one index in its own transaction, waiting for writers instead of failing"""
+    statement = CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        connection.exec_driver_sql(str(statement))
+        connection.commit()
+    logger.info(f"Created index {index.name}")
+
+
+def add_column(engine: SAEngine, column) -> bool:
+    """
+    ALTER TABLE ADD COLUMN of a model column, it must be nullable or have a server default.
+    Skipped (False) when the table already has it, e.g. made by create_all on a fresh database.
+    """
+    existing = {c["name"] for c in inspect(engine).get_columns(column.table.name)}
+    if column.name in existing:
+        return False
+    statement = CreateColumn(column).compile(dialect=engine.dialect)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"ALTER TABLE {column.table.name} ADD COLUMN {statement}")
+    logger.info(f"Added column {column.table.name}.{column.name}")
+    return True
+
+
+def enable_wal(engine: SAEngine):
+    """WAL lets readers go on while an index is built (a no-op for in-memory databases)"""
+    # outside of any transaction, SQLite refuses to switch journal mode inside one
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def auto_vacuum_mode(engine: SAEngine) -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+
+
+def request_incremental_auto_vacuum(engine: SAEngine, vacuum: bool = False):
+    """
+    auto_vacuum only changes on a database without tables, or with a full
+    VACUUM afterwards; then freed pages are given back with PRAGMA incremental_vacuum.
+    vacuum rewrites the whole file and locks it until done, only run it offline.
+    """
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if vacuum:
+            cursor.execute("VACUUM")
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def migrate(engine: SAEngine) -> List[int]:
+    """Create missing tables and indexes and apply pending migrations, returns the applied versions"""
+    enable_wal(engine)
+    # before the first table, so a new database starts incremental without a VACUUM
+    request_incremental_auto_vacuum(engine)
+    ensure_version_table(engine)
+    # create_all only adds missing tables, it skips indexes of tables that already exist
+    SQLModel.metadata.create_all(engine)
+
+    applied = []
+    for pending in pending_migrations(engine):
+        logger.info(f"Applying migration {pending.version}: {pending.name}")
+        pending.apply(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?)",
+                (pending.version, pending.name, datetime.now().isoformat(sep=" ")),
+            )
+        applied.append(pending.version)
+
+    # after the migrations, an index may be on a column they added
+    for index in missing_indexes(engine):
+        create_index_online(engine, index)
+    return applied
+
+
+def check(engine: SAEngine) -> Dict[str, List[str]]:
+    """What migrate() would do, without changing the database"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    return {
+        "tables": [
+            name for name in [table.name for table in SQLModel.metadata.sorted_tables] + DERIVED_TABLES
+            if name not in existing_tables
+        ],
+        "columns": missing_columns(engine),
+        "indexes": [index.name for index in missing_indexes(engine)],
+        "migrations": [f"{m.version}: {m.name}" for m in pending_migrations(engine)],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply or check database schema migrations")
+    parser.add_argument("--check", action="store_true", help="report missing tables, columns and indexes")
+    parser.add_argument(
+        "--vacuum", action="store_true",
+        help="switch to incremental auto_vacuum with a full VACUUM, stop the bot and the API first",
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        report = check(db_engine)
+        for kind, names in report.items():
+            for name in names:
+                print(f"missing {kind[:-1]}: {name}")
+        if auto_vacuum_mode(db_engine) != AUTO_VACUUM_INCREMENTAL:
+            # not needed by the schema, only to give freed pages back
+            print("auto_vacuum is not incremental, run --vacuum offline")
+        if any(report.values()):
+            return 1
+        print("schema up to date")
+        return 0
+
+    if args.vacuum:
+        request_incremental_auto_vacuum(db_engine, vacuum=True)
+        print(f"auto_vacuum: {'incremental' if auto_vacuum_mode(db_engine) == AUTO_VACUUM_INCREMENTAL else 'unchanged'}")
+        return 0
+
+    applied = migrate(db_engine)
+    print(f"applied migrations: {applied}" if applied else "no pending migrations")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
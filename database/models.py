@@ -4,7 +4,7 @@ Updated with CASCADE delete for link tables
 """
 from typing import List, Optional
 from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import Text, String
+from sqlalchemy import Text, String, Index
 from datetime import datetime
 from pydantic import field_validator
 
@@ -137,7 +137,15 @@ class MovieBase(SQLModel):
 
 class Movie(MovieBase, table=True):
     """Movie Table with trailers, genres, countries and actors list"""
+    __table_args__ = (
+        Index("ix_movie_year_imdb", "year", "imdb"),
+        Index("ix_movie_is_persian_imdb", "is_persian", "imdb"),
+        # review queue pages, newest unsent first
+        Index("ix_movie_sent_id", "sent", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
+    # channel caption, rendered on every write (see database.captions)
+    caption: Optional[str] = Field(default=None, sa_column=Column(Text))
     
     trailers: List[Trailer] = Relationship(
         back_populates="movie",
@@ -195,7 +203,15 @@ class SerialBase(SQLModel):
 
 class Serial(SerialBase, table=True):
     """Serial Table with trailers, genres, countries, actors and seasons"""
+    __table_args__ = (
+        Index("ix_serial_year_imdb", "year", "imdb"),
+        Index("ix_serial_is_persian_imdb", "is_persian", "imdb"),
+        # review queue pages, newest unsent first
+        Index("ix_serial_sent_id", "sent", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
+    # channel caption, rendered on every write (see database.captions)
+    caption: Optional[str] = Field(default=None, sa_column=Column(Text))
     
     trailers: List[Trailer] = Relationship(
         back_populates="serial",
@@ -240,6 +256,8 @@ class EpisodeBase(SQLModel):
 class Episode(EpisodeBase, table=True):
     """Serial Episode Table"""
     id: Optional[int] = Field(default=None, primary_key=True)
+    # channel caption, rendered on every write (see database.captions)
+    caption: Optional[str] = Field(default=None, sa_column=Column(Text))
     
     # season_obj: Optional[Season] = Relationship(back_populates="episodes")
     # serial: Optional[Serial] = Relationship(back_populates="episodes")
@@ -256,7 +274,75 @@ class PostBase(SQLModel):
     image: str = Field(max_length=500)
     link: Optional[str] = Field(default=None, max_length=500) 
     sent: bool = Field(default=False)
+    created_at: Optional[datetime] = Field(default_factory=datetime.now, index=True)
 
 
 class Post(PostBase, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
\ No newline at end of file
+    __table_args__ = (
+        Index("ix_post_sent_id", "sent", "id"),
+        # scheduled publishing, next due unsent posts
+        Index("ix_post_sent_schedule", "sent", "schedule"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+# ============= SEEN ARTICLE MODEL =============
+
+class SeenArticleBase(SQLModel):
+    """Listing entry a scraper already crawled, kept after its post is purged"""
+    source: str = Field(max_length=50)
+    key: str = Field(max_length=500)
+    seen_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+class SeenArticle(SeenArticleBase, table=True):
+    __table_args__ = (Index("ix_seenarticle_source_key", "source", "key", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+# ============= MEDIA CACHE MODEL =============
+
+class MediaCacheBase(SQLModel):
+    """Telegram file_id of an image url that was already uploaded once"""
+    url: str = Field(unique=True, max_length=500)
+    file_id: str = Field(max_length=300)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class MediaCache(MediaCacheBase, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+# ============= OUTBOX MODEL =============
+
+class OutboxBase(SQLModel):
+    """Movie, serial or episode written by ingest and waiting to be posted by the bot"""
+    kind: str = Field(max_length=50)
+    item_id: int
+    created_at: datetime = Field(default_factory=datetime.now)
+    claimed_at: Optional[datetime] = Field(default=None)
+    claim_token: Optional[str] = Field(default=None, index=True, max_length=32)
+    attempts: int = Field(default=0)
+
+
+class Outbox(OutboxBase, table=True):
+    __table_args__ = (Index("ix_outbox_claimed_at_id", "claimed_at", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+# ============= CATALOG FACET MODEL =============
+
+class CatalogFacetBase(SQLModel):
+    """Number of movies or serials per genre, country, decade or persian flag"""
+    kind: str = Field(max_length=50)
+    facet: str = Field(max_length=50)
+    value: str = Field(max_length=100)
+    total: int = Field(default=0)
+
+
+class CatalogFacet(CatalogFacetBase, table=True):
+    """Summary table kept current by SQLite triggers on the catalog tables"""
+    __table_args__ = (Index("ix_catalogfacet_kind_facet_value", "kind", "facet", "value", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
@@ -1,6 +1,5 @@
 
 from bot.bot import run
-from scraper.scraper import ScrapeWeb
 import asyncio
 if __name__ == "__main__":
         # bot_thread = threading.Thread(target=run, daemon=True)
@@ -0,0 +1,199 @@
+"""
+Declarative HTML sources
+
+A source is a YAML file in scraper/sources/ instead of a Python class:
+
+    name: gamefa
+    interval: 3600                      # starting scrape interval, seconds
+    url: https://gamefa.com/category/cinema/
+    page_url: https://gamefa.com/category/cinema/page/{page}/
+    method: GET
+    listing:
+      container: ".posts-list > div:nth-child(1)"   # optional, items are read in its first match only
+      item: div.col-12
+      fields:
+        title: h4.title                 # text of the first match
+        link: {selector: [a.more, a], attr: href}   # the first selector that matches
+        content: {selector: p, all: true, join: " ", separator: " "}  # separator between a tag's own texts
+      filter: {category: "اخبار سینما"}  # keep items whose field equals the value
+      constants: {type: N/A}
+    detail:                             # fields read from each item's link
+      fields:
+        content: {selector: ".post-content p", all: true, join: "", normalize: true}
+
+Every selector is compiled once with soupsieve when the definition is
+loaded; DeclarativeScraper only runs the compiled matchers.
+"""
+
+import functools
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+import soupsieve
+from bs4 import BeautifulSoup
+from httpx import Client
+
+from persian_nlp_tools.persian_text_normalizer import PersianTextNormalizer
+from scraper.health import SourceUnavailable
+
+
+SOURCES_DIR = Path(__file__).parent / "sources"
+DEFAULT_VALUE = "N/A"
+
+text_normalizer = PersianTextNormalizer()
+logger = logging.getLogger(__name__)
+
+
+class FieldSelector:
+    """
+    A compiled field: the text or an attribute of the first (or all) matches.
+    A list of selectors is tried in order, the first one matching is used.
+    """
+    __slots__ = ("name", "matchers", "attr", "all", "join", "separator", "normalize", "default")
+
+    def __init__(self, name: str, spec):
+        if isinstance(spec, str):
+            spec = {"selector": spec}
+        selectors = spec.get("selector") or []
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        self.name = name
+        self.matchers = [soupsieve.compile(selector) for selector in selectors]
+        self.attr: Optional[str] = spec.get("attr")
+        self.all: bool = spec.get("all", False)
+        self.join: str = spec.get("join", " ")
+        self.separator: str = spec.get("separator", "")
+        self.normalize: bool = spec.get("normalize", False)
+        self.default = spec.get("default", DEFAULT_VALUE)
+
+    def value_of(self, tag) -> Optional[str]:
+        if self.attr:
+            return tag.get(self.attr)
+        return tag.get_text(separator=self.separator, strip=True)
+
+    def matches(self, root) -> list:
+        for matcher in self.matchers:
+            tags = matcher.select(root) if self.all else [matcher.select_one(root)]
+            tags = [tag for tag in tags if tag is not None]
+            if tags:
+                return tags
+        return []
+
+    def extract(self, root) -> Any:
+        if not self.matchers:
+            value = self.value_of(root)
+        elif self.all:
+            values = [self.value_of(tag) for tag in self.matches(root)]
+            value = self.join.join(v for v in values if v)
+        else:
+            tags = self.matches(root)
+            value = self.value_of(tags[0]) if tags else None
+        if not value:
+            return self.default
+        return text_normalizer.normalize(value) if self.normalize else value
+
+
+class SourceDefinition:
+    """A source definition with its selectors compiled"""
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.name: str = raw["name"]
+        self.interval: float = raw.get("interval", 3600)
+        self.url: str = raw["url"]
+        self.page_url: Optional[str] = raw.get("page_url")
+        self.method: str = raw.get("method", "GET").upper()
+        self.headers: Dict[str, str] = raw.get("headers", {})
+
+        listing = raw["listing"]
+        self.container = soupsieve.compile(listing["container"]) if listing.get("container") else None
+        self.item = soupsieve.compile(listing["item"])
+        self.fields = [FieldSelector(name, spec) for name, spec in listing["fields"].items()]
+        self.filter: Dict[str, str] = listing.get("filter", {})
+        self.constants: Dict[str, Any] = listing.get("constants", {})
+
+        detail = raw.get("detail") or {}
+        self.detail_fields = [FieldSelector(name, spec) for name, spec in detail.get("fields", {}).items()]
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SourceDefinition":
+        with open(path, encoding="utf-8") as file:
+            return cls(yaml.safe_load(file))
+
+    def listing_url(self, page: int) -> str:
+        if page > 1 and self.page_url:
+            return self.page_url.format(page=page)
+        return self.url
+
+
+@functools.lru_cache(maxsize=None)
+def load_source_definitions(directory: Path = SOURCES_DIR) -> Dict[str, SourceDefinition]:
+    """Every *.yaml definition of a directory, compiled once per process"""
+    definitions = {}
+    for path in sorted(directory.glob("*.yaml")):
+        definition = SourceDefinition.from_file(path)
+        definitions[definition.name] = definition
+    return definitions
+
+
+class DeclarativeScraper:
+    """Scraper protocol over a SourceDefinition"""
+
+    def __init__(self, definition: SourceDefinition, session):
+        self.definition = definition
+        self.__session: Client = session
+
+    def fetch(self, url: str) -> Optional[str]:
+        try:
+            response = self.__session.request(self.definition.method, url, headers=self.definition.headers)
+            response.raise_for_status()
+            return response.text
+        except SourceUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"[{self.definition.name}] Http error {e}")
+            return None
+
+    def scrape(self, page: int = 1) -> Optional[str]:
+        return self.fetch(self.definition.listing_url(page))
+
+    def parse(self, html) -> List[Dict[str, Any]] | None:
+        if not html:
+            return None
+        definition = self.definition
+        soup = BeautifulSoup(html, "html.parser")
+        root = definition.container.select_one(soup) if definition.container else soup
+        if root is None:
+            return None
+        data = []
+        for item in definition.item.select(root):
+            post = dict(definition.constants)
+            for field in definition.fields:
+                post[field.name] = field.extract(item)
+            if all(post.get(name) == value for name, value in definition.filter.items()):
+                data.append(post)
+        return data or None
+
+    def detail_parser(self, data) -> List[Dict[str, Any]] | None:
+        if not data:
+            return None
+        if not self.definition.detail_fields:
+            return data
+        data_list = []
+        for post in data:
+            link = post.get("link")
+            if not link or link == DEFAULT_VALUE:
+                logger.info(f"[{self.definition.name}] {post.get('title')} : No link available")
+                continue
+            try:
+                html = self.fetch(link)
+            except SourceUnavailable:
+                break
+            if html is None:
+                continue
+            soup = BeautifulSoup(html, "html.parser")
+            for field in self.definition.detail_fields:
+                post[field.name] = field.extract(soup)
+            data_list.append(post)
+        return data_list
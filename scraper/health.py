@@ -0,0 +1,182 @@
+"""
+Per-source circuit breakers and health metrics
+
+Scrapers get their http client wrapped in a GuardedClient. Every request
+is timed and counted for the source; FAILURE_THRESHOLD consecutive failures
+open the source's breaker and further requests fail at once, without
+touching the network, for COOLDOWN seconds. After the cooldown one probe
+request is let through: it closes the breaker when it succeeds and opens
+it again when it fails. A listing that parses to nothing FAILURE_THRESHOLD
+runs in a row (a changed layout) opens the breaker the same way.
+"""
+
+import time
+import logging
+from typing import Callable, Dict, Optional
+
+
+FAILURE_THRESHOLD = 3
+COOLDOWN = 1800
+# seconds an http request of a scraper may take
+REQUEST_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class SourceUnavailable(Exception):
+    """Raised instead of sending a request while the source's breaker is open"""
+
+
+class CircuitBreaker:
+    """closed -> open after failure_threshold failures in a row -> half open after cooldown"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    def available(self) -> bool:
+        """False while open and cooling down, checking does not use up the probe"""
+        return self.state != self.OPEN or self.clock() - self.opened_at >= self.cooldown
+
+    def allow(self) -> bool:
+        """May a request go out now; after the cooldown only one probe does"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+
+
+class SourceHealth:
+    """Breaker and counters of one source"""
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.requests = 0
+        self.failures = 0
+        self.latency_total = 0.0
+        self.runs = 0
+        self.pages = 0
+        self.items = 0
+        self.empty_listings = 0
+        self.posts = 0
+
+    def record_request(self, ok: bool, latency: float):
+        self.requests += 1
+        self.latency_total += latency
+        if ok:
+            self.breaker.record_success()
+            return
+        self.failures += 1
+        if self.breaker.state != CircuitBreaker.OPEN:
+            self.breaker.record_failure()
+            self.log_opened("its requests fail")
+
+    def record_listing(self, page: int, items: int):
+        """A listing page read, with the number of entries it parsed to"""
+        self.pages += 1
+        self.items += items
+        if page != 1:
+            return
+        self.empty_listings = 0 if items else self.empty_listings + 1
+        if self.empty_listings >= self.breaker.failure_threshold and self.breaker.state != CircuitBreaker.OPEN:
+            self.breaker.trip()
+            self.log_opened("its listing parses to nothing")
+
+    def record_run(self, posts: int):
+        self.runs += 1
+        self.posts += posts
+
+    def log_opened(self, reason: str):
+        if self.breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Source {self.name} skipped for {self.breaker.cooldown:.0f}s, {reason}")
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        return (self.requests - self.failures) / self.requests if self.requests else None
+
+    @property
+    def average_latency(self) -> Optional[float]:
+        return self.latency_total / self.requests if self.requests else None
+
+    @property
+    def parse_yield(self) -> Optional[float]:
+        """Listing entries per page read"""
+        return self.items / self.pages if self.pages else None
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "requests": self.requests,
+            "success_rate": self.success_rate,
+            "average_latency": self.average_latency,
+            "runs": self.runs,
+            "parse_yield": self.parse_yield,
+            "posts": self.posts,
+        }
+
+
+HEALTH: Dict[str, SourceHealth] = {}
+
+
+def health_of(source: str) -> SourceHealth:
+    health = HEALTH.get(source)
+    if health is None:
+        health = HEALTH[source] = SourceHealth(source)
+    return health
+
+
+class GuardedClient:
+    """httpx client of one source, every request goes through its breaker and metrics"""
+
+    def __init__(self, client, health: SourceHealth):
+        self.client = client
+        self.health = health
+
+    def request(self, method: str, url, **kwargs):
+        if not self.health.breaker.allow():
+            raise SourceUnavailable(f"{self.health.name} is skipped until its cooldown ends")
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        started = time.monotonic()
+        try:
+            response = self.client.request(method, url, **kwargs)
+        except Exception:
+            self.health.record_request(False, time.monotonic() - started)
+            raise
+        # 4xx is a missing page, not a broken source
+        self.health.record_request(response.status_code < 500, time.monotonic() - started)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
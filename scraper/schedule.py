@@ -0,0 +1,60 @@
+"""
+Adaptive per-source scrape intervals
+
+Every source starts at its own interval. After each run the interval grows
+by BACKOFF when nothing new came in and shrinks by SPEEDUP after a burst of
+BURST_SIZE or more new articles, within [min_interval, max_interval].
+next_delay() adds up to +-JITTER of it, so sources drift apart instead of
+firing together.
+"""
+
+import random
+from typing import Optional
+
+
+DEFAULT_INTERVAL = 3600
+MIN_INTERVAL = 600
+MAX_INTERVAL = 6 * 3600
+BACKOFF = 1.5
+SPEEDUP = 2.0
+BURST_SIZE = 3
+JITTER = 0.1
+# first runs are spread over this many seconds after startup
+FIRST_RUN_SPREAD = 120
+
+
+class SourceSchedule:
+    """Scrape interval of one source, adapted to how often it publishes"""
+    __slots__ = ("name", "interval", "min_interval", "max_interval", "last_new")
+
+    def __init__(
+        self,
+        name: str,
+        interval: float = DEFAULT_INTERVAL,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+    ):
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.last_new: Optional[int] = None
+
+    def observe(self, new_count: int) -> float:
+        """Adapt the interval to the number of new articles of the last run, returns it"""
+        self.last_new = new_count
+        if new_count == 0:
+            self.interval = min(self.interval * BACKOFF, self.max_interval)
+        elif new_count >= BURST_SIZE:
+            self.interval = max(self.interval / SPEEDUP, self.min_interval)
+        return self.interval
+
+    def next_delay(self, rng: random.Random = random) -> float:
+        """Seconds until the next run, the interval with jitter"""
+        return self.interval * rng.uniform(1 - JITTER, 1 + JITTER)
+
+    def first_delay(self, rng: random.Random = random) -> float:
+        return rng.uniform(0, FIRST_RUN_SPREAD)
+
+    def __repr__(self):
+        return f"SourceSchedule({self.name}, {self.interval:.0f}s)"
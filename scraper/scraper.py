@@ -1,10 +1,17 @@
+import functools
+import logging
 import feedparser
 
-from typing import Any, Protocol,Dict,List
+from typing import Any, Callable, Protocol,Dict,List,Optional,Tuple
 from httpx import Client
 from bs4 import BeautifulSoup
-from scraper.scraper_utilities import format_timestamp,write_post_list,PersianTextNormalizer
-from telegram.ext import  ContextTypes
+from scraper.scraper_utilities import format_timestamp,write_post_list,article_key,PersianTextNormalizer
+from scraper.schedule import SourceSchedule
+from scraper.declarative import DeclarativeScraper, load_source_definitions
+from scraper.health import GuardedClient, SourceHealth, SourceUnavailable, health_of
+from database.db import SeenCRUD, safe_session, engine
+
+logger = logging.getLogger(__name__)
 
 text_normalizer = PersianTextNormalizer()
 
@@ -16,7 +23,7 @@ class Scraper(Protocol):
     """
 
 
-    def scrape(self) -> dict | List[Dict[str,Any]]:
+    def scrape(self,page:int = 1) -> dict | List[Dict[str,Any]]:
         pass
 
     def parse(self,data) -> List[Dict[str,Any]]:
@@ -26,30 +33,100 @@ class Scraper(Protocol):
         pass
 
 
-class ZoomgScraper:
+def first_of(*keys:str) -> Callable[[dict],Any]:
+    """Getter of the first key of a record with a value, API fields are renamed over time"""
+    def get(record:dict):
+        for key in keys:
+            value = record.get(key)
+            if value not in (None,""):
+                return value
+        return None
+    return get
+
+
+def constant(value) -> Callable[[dict],Any]:
+    return lambda record: value
+
+
+class JsonApiScraper:
+    """
+    Base for sources with a JSON API: listing records are mapped straight
+    into post dicts, no HTML is fetched or parsed.
+
+    Subclasses set url (with %d for the page number), items_paths (key paths
+    tried in order to find the list of records) and field_map (post field ->
+    record key or getter, see first_of and constant).
+    """
+    url:str = ""
+    method:str = "GET"
+    headers:Dict[str,str] = {}
+    items_paths:Tuple[Tuple[str,...],...] = ((),)
+    field_map:Dict[str,Any] = {}
 
     def __init__(self,session):
-        self.__baseUrl = "https://api2.zoomg.ir/editorial/api/articles/browse?sort=Newest&publishDate=All&readingTime=All&pageNumber=1&PageSize=20"
-        self.__session:Client = session
-        self.__headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:145.0) Gecko/20100101 Firefox/145.0',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                "Accept-Language":"en-US,en;q=0.5",
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                # "Cookie":"_pk_ref.2.01fe=%5B%22%22%2C%22%22%2C1764827723%2C%22https%3A%2F%2Fwww.karlancer.com%2F%22%5D; _pk_id.2.01fe=4b60e94eaab94e4f.1762239023.; bob_anonymous_id=4c1d7b43-b5cf-4216-afd6-e0e074c0f0b1; _ga_BX3DD5ZERM=GS2.1.s1764827726$o2$g1$t1764828266$j51$l0$h286395348; _ga=GA1.1.1560322300.1762239025; analytics_campaign={%22source%22:%22karlancer.com%22%2C%22medium%22:%22referral%22}; analytics_token=1fa1eb7d-c2e8-7e3d-ee8e-2a69ad3cd68a; _yngt=01K96T34A7YSZHFJ9M6B0VKZGH; _yngt_iframe=1; _z_sess=176c3ae3-39d3-4574-83f3-14c67a696b02; _pk_ses.2.01fe=1; analytics_session_token=d7fa997a-778b-daaa-4724-39d312fd4a7a; yektanet_session_last_activity=12/4/2025"
-            }
+        self._session:Client = session
 
-    def scrape(self,max_movie:int = 20) -> dict:
-        response = self.__session.get(self.__baseUrl)
-        # print(response.json())
-        return response.json()
+    def scrape(self,page:int = 1) -> Any:
+        try:
+            response = self._session.request(self.method,self.url % page,headers=self.headers)
+            response.raise_for_status()
+            return response.json()
+        except SourceUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"[{type(self).__name__}] Http error {e}")
+            return None
 
+    def records(self,data) -> List[dict]:
+        for path in self.items_paths:
+            value = data
+            for key in path:
+                value = value.get(key) if isinstance(value,dict) else None
+            if isinstance(value,list):
+                return [record for record in value if isinstance(record,dict)]
+        return []
+
+    def to_post(self,record:dict) -> Dict[str,Any]:
+        post = {}
+        for field,source in self.field_map.items():
+            post[field] = source(record) if callable(source) else record.get(source)
+        return post
+
+    def parse(self,data) -> List[Dict[str,Any]] | None:
+        if not data:
+            return None
+        posts = [self.to_post(record) for record in self.records(data)]
+        # a post without title or text cannot be stored or summarized
+        return [post for post in posts if post.get("title") and post.get("content")] or None
+
+    def detail_parser(self,data):
+        return data if data else None
 
-    def parse(self,data) -> dict:
-        soup = BeautifulSoup(data,"html.parser")
-        news_list = soup.select_one("div.px-4").find_all("div",attrs={"class":"scroll-m-16"})
-        print(news_list)
+
+def zoomg_link(record:dict) -> Optional[str]:
+    url = first_of("url","link")(record)
+    if url:
+        return url if url.startswith("http") else "https://www.zoomg.ir" + url
+    slug = record.get("slug")
+    return f"https://www.zoomg.ir/{slug}" if slug else None
+
+
+class ZoomgScraper(JsonApiScraper):
+    url = "https://api2.zoomg.ir/editorial/api/articles/browse?sort=Newest&publishDate=All&readingTime=All&pageNumber=%d&PageSize=20"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:145.0) Gecko/20100101 Firefox/145.0',
+        'Accept': 'application/json',
+        "Accept-Language":"en-US,en;q=0.5",
+    }
+    items_paths = (("data","items"),("data",),("items",),("articles",),())
+    field_map = {
+        "title":first_of("title"),
+        "type":constant("N/A"),
+        "content":first_of("summary","lead","description","excerpt"),
+        "year":first_of("publishDate","publishedAt","createdAt"),
+        "image":first_of("imageUrl","image","coverImage","thumbnail"),
+        "link":zoomg_link,
+    }
 
 
 class MoviemagScraper:
@@ -60,11 +137,16 @@ class MoviemagScraper:
         self.__session:Client = session
 
 
-    def scrape(self) -> dict:
+    def scrape(self,page:int = 1) -> dict:
         try:
-            feed = feedparser.parse(self.__RSS_URL)
-            return feed
+            # fetched with the session so it goes through the source's breaker
+            response = self.__session.get(self.__RSS_URL + (f"?paged={page}" if page > 1 else ""))
+            response.raise_for_status()
+            return feedparser.parse(response.text)
+        except SourceUnavailable:
+            raise
         except Exception as e:
+            logger.warning(f"[MoviemagScraper] Http error {e}")
             return None
 
     def parse(self,feed:dict ) ->  List[Dict[str,Any]]:
@@ -117,209 +199,16 @@ class MoviemagScraper:
                     data_list.append(post)
                     content = ''
 
+                except SourceUnavailable:
+                    break
                 except Exception as e:
-                    print(f"logger  [class name] [time] [news title] : {e}")
+                    logger.warning(f"[MoviemagScraper] {post.get('title')} : {e}")
             else:
-                print("logger [class name] [time] [news title] : No link available")
+                logger.info(f"[MoviemagScraper] {post.get('title')} : No link available")
 
         return data_list
 
 
-class GameFaScraper:
-
-    def __init__(self,session):
-        self.__baseUrl = "https://gamefa.com/category/cinema/"
-        self.__session:Client = session
-
-    def scrape(self) -> str:
-        try:
-            response = self.__session.get(self.__baseUrl)
-            return response.text
-        except Exception as e:
-            return None
-
-    def parse(self,html) ->  List[Dict[str,Any]] | None:
-        if html:
-            data = []
-            soup = BeautifulSoup(html, "html.parser")
-
-            card_list = soup.select_one(".posts-list > div:nth-child(1)").find_all("div",attrs={'class':"col-12"})
-
-            if card_list:
-                for master_card in card_list:
-                    # Category
-                    card = master_card.find("div", class_="row align-items-center")
-
-                    category = card.find("span", class_="category")
-                    category_text = category.text.strip() if category else "N/A"
-                    
-                    # Title
-                    title = card.find("h4", class_="title")
-                    title_text = title.text.strip() if title else "N/A"
-
-                    # Time
-                    time = card.find("div", class_="time")
-                    time_text = time.find("span").text.strip() if time else "N/A"
-
-                    # Comments
-                    comments = card.find("div", class_="comment-count")
-                    comments_text = comments.find("span").text.strip() if comments else "0"
-
-                    # Likes
-                    likes = card.find("div", class_="like-count")
-                    likes_text = likes.find("span").text.strip() if likes else "0"
-
-                    # Thumbnail
-                    img_tag = card.find("img")
-                    img_src = img_tag['src'] if img_tag else "N/A"
-                    
-
-                    link_tag = master_card.find("a")
-                    link = link_tag.attrs.get("href") if link_tag else "N/A"
-                    
-                    if category_text == "اخبار سینما":
-                        formated:dict = {
-                            "title":title_text, 
-                            "type":"N/A", 
-                            "content":"N/A", 
-                            "year":time_text, 
-                            "image":img_src, 
-                            "link":link, 
-
-                        }
-                    else:
-                        continue
-                    data.append(formated)
-
-                return data
-            else:
-                print("logger  [class name] [time] [news title] : No News Found")
-        else:
-            return None
-        
-
-    def detail_parser(self,data) -> List[Dict[str,Any]] | None:
-        if data:
-            content = ''
-            data_list = []
-            for post in data:
-                link = post.get("link",None)
-                if link:
-                    try:
-                        response = self.__session.get(link)
-
-                        soup = BeautifulSoup(response.text,'html.parser')
-                        text_list = soup.select_one(".post-content").find_all("p")
-                        if text_list:
-                            for p in text_list:
-                                content += p.text
-                        else:
-                            content = 'N/A'
-                        post["content"] = content
-                        data_list.append(post)
-                        content = ''
-
-                    except Exception as e:
-                        print(f"logger  [class name] [time] [news title] : HTTP error {e}")
-                else:
-                    print("logger  [class name] [time] [news title] : No link available")
-            return data_list
-        
-        return None
-        
-
-class FromCinemaScraper:
-
-    def __init__(self,session):
-        self.__baseUrl = "https://www.fromcinema.com/cinema-news/"
-        self.__session:Client = session
-        self.__section = (".elementor-element-ce54b4c > div:nth-child(1) > div:nth-child(1)",".elementor-element-e6930cd > div:nth-child(1) > div:nth-child(1)")
-    
-    
-    def scrape(self) ->  List[Dict[str,Any]]:
-        try:
-            data = self.__session.get(self.__baseUrl)
-            soup = BeautifulSoup(data.text,"html.parser")
-            articel_soup = soup.select_one(self.__section[0])
-            articel_list = articel_soup.find_all("article")
-            return articel_list
-        except Exception as e:
-            print(f"logger  [class name] [time] [news title] : Http error {e}")
-
-
-    def parse(self, article_list:list):
-            if article_list:
-                data = []
-                for article in article_list:
-                    # Title and URL
-                    title_tag = article.find("h3", class_="elementor-post__title")
-                    title = title_tag.get_text(strip=True) if title_tag else "Null"
-                    url = title_tag.find("a")["href"] if title_tag and title_tag.find("a") else "Null"
-
-                    # Excerpt / Description
-                    description_tag = article.find("div", class_="elementor-post__excerpt")
-                    description = description_tag.get_text(strip=True) if description_tag else "Null"
-
-                    # Meta info
-                    author_tag = article.find("span", class_="elementor-post-author")
-                    author = author_tag.get_text(strip=True) if author_tag else "Null"
-
-                    date_tag = article.find("span", class_="elementor-post-date")
-                    date = date_tag.get_text(strip=True) if date_tag else "Null"
-
-                    time_tag = article.find("span", class_="elementor-post-time")
-                    time = time_tag.get_text(strip=True) if time_tag else "Null"
-
-                    # Image (optional)
-                    img_tag = article.find("img")
-                    image_url = img_tag.get("src", "Null") if img_tag else "Null"
-
-                    # Read more link (optional)
-                    read_more_tag = article.find("a", class_="elementor-post__read-more")
-                    read_more_url = read_more_tag["href"] if read_more_tag else url
-
-                    formated:dict = {
-                            "title":title, 
-                            "type":"N/A", 
-                            "content":description, 
-                            "year":date, 
-                            "image":image_url, 
-                            "link":read_more_url, 
-                        }
-                    
-                    data.append(formated)
-
-                return data
-            return None
-    
-
-    def detail_parser(self, data):
-        if data:
-            data_list = []
-            for post in data:
-                link = post.get("link", None)
-
-                if link:
-                    try:
-                        response = self.__session.get(link)
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        text_list = soup.find_all("p")
-                        
-                        # FIX: Use get_text with separator
-                        content = ' '.join([p.get_text(separator=' ', strip=True) for p in text_list]) if text_list else 'N/A'
-                        
-                        # Normalize content
-                        post["content"] = text_normalizer.normalize(content)
-                        data_list.append(post)
-                        
-                    except Exception as e:
-                        print(f'logger [FromCinemaScraper] : Http error {e}')
-                else:
-                    print("logger [FromCinemaScraper] : No link available")
-            return data_list
-        else:
-            return None
-
 class CaffeCinemaScraper:
 
     def __init__(self,session):
@@ -337,18 +226,21 @@ class CaffeCinemaScraper:
 
 
 
-    def scrape(self) -> dict:
+    def scrape(self,page:int = 1) -> dict:
         try:
             # Make the POST request
-            response = self.__session.post(self.__baseUrl, headers=self.headers, data=self.request_data)
+            response = self.__session.post(self.__baseUrl, headers=self.headers, data={**self.request_data, "page": page})
 
 
             # Parse the JSON
             data = response.json()
             news_list = data.get("list", [])
             return news_list
-        
+
+        except SourceUnavailable:
+            raise
         except Exception as e :
+            logger.warning(f"[CaffeCinemaScraper] Http error {e}")
             return None
 
 
@@ -372,7 +264,7 @@ class CaffeCinemaScraper:
 
             return all_news
         else:
-            print("logger :No data availble ")
+            logger.info("[CaffeCinemaScraper] No data available")
             return None
 
     def detail_parser(self,data):
@@ -382,12 +274,20 @@ class CaffeCinemaScraper:
 class ScraperContianer:
     def __init__(self):
         self.scraper_map : dict= {
-            # "zoomg":ZoomgScraper,
-            "gamefa":GameFaScraper,
+            "zoomg":ZoomgScraper,
             "caffecinema":CaffeCinemaScraper,
-            "fromcinema":FromCinemaScraper,
             "moviemag":MoviemagScraper
         }
+        # starting scrape interval (seconds) per source, adapted at runtime
+        self.interval_map : dict = {
+            "caffecinema":3600,
+            "moviemag":3600,
+            "zoomg":3600,
+        }
+        # HTML sources defined in scraper/sources/*.yaml, compiled once per process
+        for name, definition in load_source_definitions().items():
+            self.scraper_map[name] = functools.partial(DeclarativeScraper, definition)
+            self.interval_map[name] = definition.interval
 
     def resolve(self,website:str,session) -> Scraper:
         scraper = self.scraper_map.get(website)
@@ -395,6 +295,9 @@ class ScraperContianer:
             return scraper(session) 
         raise ValueError("site not supported ")
 
+    def schedules(self) -> Dict[str,SourceSchedule]:
+        return {name: SourceSchedule(name, interval) for name, interval in self.interval_map.items()}
+
 
 
 # Use Scraper protocol for interface and run scrape method 
@@ -406,23 +309,63 @@ def parser_data(scraper:Scraper,data):
     return scraper.parse(data)
 
 
-async def ScrapeWeb(context: ContextTypes.DEFAULT_TYPE):
-    session = Client()
-    contianer = ScraperContianer()
-
-    sc_list = ['moviemag','caffecinema','fromcinema','gamefa']
-    for sc in sc_list:
-        scraper = contianer.resolve(sc,session=session)
-        data = extract_data(scraper)
-        parsed_data_list = parser_data(scraper,data)
-        detials = scraper.detail_parser(parsed_data_list)
-        write_post_list(detials)    
-
+# Listing pages read at most per run; a source never crawled before only reads the first
+CRAWL_MAX_PAGES = 5
 
 
-
-
-
-
-
-        
\ No newline at end of file
+def crawl_new(
+        scraper:Scraper,website:str,max_pages:int = CRAWL_MAX_PAGES,health:Optional[SourceHealth] = None
+) -> List[Dict[str,Any]]:
+    """
+    Listing entries not crawled before, newest first. Pages are read until
+    one holds an entry of the seen index, so a normal run costs one page
+    and a run after downtime catches up on up to max_pages.
+    """
+    fresh = []
+    keys_this_run = set()
+    with safe_session(engine) as session:
+        if not SeenCRUD.count(session,website).data:
+            max_pages = 1
+        for page in range(1,max_pages + 1):
+            items = parser_data(scraper,scraper.scrape(page=page)) or []
+            if health:
+                health.record_listing(page,len(items))
+            keys = [article_key(item) for item in items]
+            known = SeenCRUD.known(session,website,[key for key in keys if key]).data or set()
+            new = []
+            for item,key in zip(items,keys):
+                if key and key not in known and key not in keys_this_run:
+                    keys_this_run.add(key)
+                    new.append(item)
+            fresh.extend(new)
+            if len(new) < len(items) or not items:
+                break
+    return fresh
+
+
+def scrape_source(website:str,session:Client) -> int:
+    """
+    Crawl one source incrementally and store its new articles, returns the
+    number of new posts. A source whose breaker is open is skipped without
+    a request, see scraper.health.
+    """
+    health = health_of(website)
+    if not health.breaker.available():
+        logger.info(f"Skipping {website}, circuit open")
+        return 0
+    scraper = ScraperContianer().resolve(website,session=GuardedClient(session,health))
+    try:
+        fresh = crawl_new(scraper,website,health=health)
+        detials = scraper.detail_parser(fresh) if fresh else None
+    except SourceUnavailable:
+        fresh, detials = [], None
+    created, held = write_post_list(detials)
+    health.record_run(created)
+    if not held:
+        return created
+    # only what the database holds, an entry dropped by detail_parser or not
+    # stored is crawled again next run; after storing, so a crash in between
+    # re-crawls the entries
+    with safe_session(engine) as db_session:
+        SeenCRUD.add_many(db_session,website,held)
+    return created
@@ -4,71 +4,9 @@ from database.models import PostBase
 
 from sqlmodel import Session
 import datetime
+from typing import List, Optional, Tuple
 from persian_nlp_tools.persian_text_summarizer import TextSummarizationPipeline 
-
-import re
-
-class PersianTextNormalizer:
-    def __init__(self):
-        # Common Persian word patterns that get joined
-        self.word_patterns = {
-            'جهاننام': 'جهان نام',
-            'سینمایجهان': 'سینمای جهان',
-            'فیلمنامه': 'فیلم نامه',
-            'کارگردان': 'کارگردان',  # This is actually one word
-            # Add more patterns as you discover them
-        }
-    
-    def normalize(self, text: str) -> str:
-        """Normalize Persian text without external libraries"""
-        if not text or text in ["N/A", "Null"]:
-            return text
-        
-        # Step 1: Replace known problematic patterns
-        for wrong, correct in self.word_patterns.items():
-            text = text.replace(wrong, correct)
-        
-        # Step 2: Add space between Persian and English/numbers
-        # Persian/Arabic Unicode range: \u0600-\u06FF
-        text = re.sub(r'([\u0600-\u06FF]+)([a-zA-Z0-9])', r'\1 \2', text)
-        text = re.sub(r'([a-zA-Z0-9])([\u0600-\u06FF]+)', r'\1 \2', text)
-        
-        # Step 3: Normalize common Persian characters
-        text = self._normalize_persian_chars(text)
-        
-        # Step 4: Clean up whitespace
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single
-        text = text.strip()
-        
-        # Step 5: Remove zero-width characters that cause issues
-        text = text.replace('\u200c', ' ')  # Zero-width non-joiner
-        text = text.replace('\u200d', '')   # Zero-width joiner
-        text = text.replace('\u200b', '')   # Zero-width space
-        
-        return text
-    
-    def _normalize_persian_chars(self, text: str) -> str:
-        """Normalize Persian character variations"""
-        # Arabic ك to Persian ک
-        text = text.replace('\u0643', '\u06a9')
-        # Arabic ي to Persian ی
-        text = text.replace('\u0649', '\u06cc')
-        text = text.replace('\u064a', '\u06cc')
-        # Normalize Yeh with hamza
-        text = text.replace('\u0626', '\u06cc')
-        
-        return text
-    
-    def normalize_dict(self, data: dict) -> dict:
-        """Normalize all string fields in a dictionary"""
-        normalized = {}
-        for key, value in data.items():
-            if isinstance(value, str):
-                normalized[key] = self.normalize(value)
-            else:
-                normalized[key] = value
-        return normalized
-    
+from persian_nlp_tools.persian_text_normalizer import PersianTextNormalizer
 
 # Function to convert Unix timestamp to readable format
 def format_timestamp(ts):
@@ -77,8 +15,24 @@ def format_timestamp(ts):
     except:
         return ts
 norm = PersianTextNormalizer()
-def write_post_list(detials):
-    
+def article_key(item:dict) -> Optional[str]:
+    """Seen index key of a listing entry, its link or else its title"""
+    link = item.get("link")
+    if link and link not in ("N/A","Null"):
+        return link
+    return item.get("title")
+
+
+def write_post_list(detials) -> Tuple[int,List[str]]:
+    """
+    Summarize and store scraped articles. Returns how many were new and the
+    article keys the database now holds, stored now or under a known title;
+    an entry skipped or failing to store is left out, to be crawled again.
+    """
+    created = 0
+    held = []
+    if not detials:
+        return created, held
     with Session(engine) as session:
         for d in detials:
                     if isinstance(d,str):
@@ -93,11 +47,22 @@ def write_post_list(detials):
                          continue
 
 
-                    post = PostBase(
+                    try:
+                        post = PostBase(
 
-                        title=d.get("title"),type_='N/A',summary=summary,
-                        schedule=datetime.datetime.now(),image=d.get("image"),trailer='N/A',use_trailer=False,
-                        link=d.get("link")
-                                    
-                        )
-                    PostCRUD.create(session,post)
+                            title=d.get("title"),type_='N/A',summary=summary,
+                            schedule=datetime.datetime.now(),image=d.get("image"),trailer='N/A',use_trailer=False,
+                            link=d.get("link")
+
+                            )
+                    except ValueError:
+                        # pydantic's ValidationError, e.g. an article without a title
+                        continue
+                    if PostCRUD.create(session,post).success:
+                        created += 1
+                    elif PostCRUD.get_by_title(session,post.title).data is None:
+                        continue
+                    key = article_key(d)
+                    if key:
+                        held.append(key)
+    return created, held
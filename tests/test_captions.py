@@ -0,0 +1,92 @@
+from sqlmodel import select
+
+from database.models import MovieBase, EpisodeBase, Movie
+from database.db import MovieCRUD, EpisodeCRUD, OutboxCRUD
+from database.captions import (
+    CaptionTemplate, CaptionLine, CAPTION_LIMIT, ELLIPSIS, render_caption, visible_length
+)
+from database import migrations
+
+
+def make_movie(session, api_id=1, title="Matrix", description="Test", note=""):
+    return MovieCRUD.create(session, MovieBase(
+        title=title, type_="movie", description=description, year=1999, duration="120",
+        imdb=8.7, is_persian=False, image_url="url", cover_url="url", api_id=api_id, note=note
+    )).data
+
+
+# ============= CAPTION TESTS =============
+
+class TestCaptionTemplate:
+    """Test suite for compiled caption templates"""
+
+    def test_fields_are_escaped_once(self):
+        """Test field values are HTML-escaped and markup is left alone"""
+        caption = render_caption({"title": "Tom & Jerry <3", "year": 1940})
+        assert "<b>" in caption
+        assert "Tom &amp; Jerry &lt;3" in caption
+        assert "&amp;amp;" not in caption
+
+    def test_empty_fields_are_skipped(self):
+        """Test None, empty and "null" values drop their line"""
+        caption = render_caption({"title": "Matrix", "note": "", "description": "null", "year": None})
+        assert caption.count("\n") == 0
+
+    def test_booleans(self):
+        """Test booleans are printed as check marks"""
+        assert "✅" in render_caption({"title": "Matrix", "is_persian": True})
+        assert "❌" in render_caption({"title": "Matrix", "is_persian": False})
+
+    def test_long_description_is_truncated(self):
+        """Test an oversized caption is cut to the limit on a word boundary"""
+        caption = render_caption({"title": "Matrix", "year": 1999, "description": "word " * 500})
+        assert visible_length(caption) <= CAPTION_LIMIT
+        assert "word" + ELLIPSIS in caption
+        assert caption.endswith("1999")
+
+    def test_unfit_lines_are_dropped(self):
+        """Test lines that cannot be shortened enough are dropped from the end"""
+        template = CaptionTemplate([
+            CaptionLine("a", "{}"),
+            CaptionLine("b", "{}"),
+        ], limit=10)
+        assert template.render({"a": "12345", "b": "1234567890"}) == "12345"
+
+
+class TestStoredCaptions:
+    """Test suite for captions rendered at ingest"""
+
+    def test_caption_rendered_on_create_and_update(self, session):
+        """Test the stored caption follows the row"""
+        movie = make_movie(session)
+        assert movie.caption == render_caption(movie)
+
+        movie = MovieCRUD.update(session, movie.id, {"note": "Dubbed"}).data
+        assert "Dubbed" in movie.caption
+
+    def test_episode_caption(self, session):
+        """Test episodes get a caption too"""
+        episode = EpisodeCRUD.create(session, EpisodeBase(
+            title="Pilot", description="Test", duration="50", api_id=1, image_url="url"
+        )).data
+        assert "Pilot" in episode.caption
+
+    def test_dispatch_reads_stored_caption(self, session):
+        """Test the dispatch projection carries the stored caption"""
+        movie = make_movie(session)
+        entries = OutboxCRUD.claim(session, limit=10).data
+        [(_, item)] = OutboxCRUD.load_dispatch(session, entries).data
+        assert item.caption == movie.caption
+
+    def test_migration_backfills_captions(self, engine, session):
+        """Test migration 5 adds the column to an old table and renders existing rows"""
+        migrations.migrate(engine)
+        make_movie(session)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE movie DROP COLUMN caption")
+            connection.exec_driver_sql("DELETE FROM schema_version WHERE version = 5")
+        assert "movie.caption" in migrations.check(engine)["columns"]
+
+        migrations.migrate(engine)
+        session.expire_all()
+        assert "Matrix" in session.exec(select(Movie.caption)).one()
@@ -0,0 +1,136 @@
+import httpx
+import pytest
+
+from scraper import scraper as scraper_module
+from scraper.health import CircuitBreaker, SourceHealth, GuardedClient, SourceUnavailable
+from scraper.scraper import scrape_source, crawl_new, ZoomgScraper, MoviemagScraper, CaffeCinemaScraper
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing_client(calls):
+    """httpx client whose every request fails with a 503"""
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(503)
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(name="clock")
+def clock_fixture():
+    return Clock()
+
+
+@pytest.fixture(name="health")
+def health_fixture(clock):
+    return SourceHealth("site", CircuitBreaker(failure_threshold=3, cooldown=60, clock=clock))
+
+
+# ============= CIRCUIT BREAKER TESTS =============
+
+class TestCircuitBreaker:
+    """Test suite for the per-source circuit breaker"""
+
+    def test_opens_after_consecutive_failures(self, health):
+        """Test the breaker opens on the threshold and a success resets the count"""
+        breaker = health.breaker
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.available()
+        assert not breaker.allow()
+
+    def test_one_probe_after_cooldown(self, health, clock):
+        """Test after the cooldown one probe goes out, its result closes or reopens"""
+        breaker = health.breaker
+        breaker.trip()
+        clock.now = 60
+        assert breaker.available()
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened_at == 60
+
+        clock.now = 120
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_client_sends_nothing(self, health):
+        """Test an open breaker fails requests without touching the network"""
+        calls = []
+        client = GuardedClient(failing_client(calls), health)
+        for _ in range(3):
+            assert client.get("https://site/").status_code == 503
+        with pytest.raises(SourceUnavailable):
+            client.get("https://site/")
+        assert len(calls) == 3
+        assert health.success_rate == 0
+        assert health.average_latency is not None
+
+    def test_empty_listing_opens(self, health):
+        """Test a listing parsing to nothing run after run opens the breaker"""
+        health.record_listing(1, 0)
+        health.record_listing(1, 0)
+        health.record_listing(2, 0)
+        assert health.breaker.state == CircuitBreaker.CLOSED
+        health.record_listing(1, 0)
+        assert health.breaker.state == CircuitBreaker.OPEN
+        assert health.parse_yield == 0
+
+    @pytest.mark.parametrize("scraper_class", [ZoomgScraper, MoviemagScraper, CaffeCinemaScraper])
+    def test_open_breaker_is_not_an_empty_listing(self, health, scraper_class, engine, monkeypatch):
+        """Test scrapers let SourceUnavailable through instead of reporting an empty listing"""
+        monkeypatch.setattr(scraper_module, "engine", engine)
+        health.breaker.trip()
+        scraper = scraper_class(GuardedClient(failing_client([]), health))
+        with pytest.raises(SourceUnavailable):
+            crawl_new(scraper, "site", health=health)
+        assert health.empty_listings == 0
+
+
+class TestScrapeSourceHealth:
+    """Test suite for scraping through the breaker"""
+
+    @pytest.fixture(autouse=True)
+    def isolated(self, engine, monkeypatch, clock):
+        monkeypatch.setattr(scraper_module, "engine", engine)
+        monkeypatch.setattr(scraper_module, "health_of", self.health_of)
+        self.sources = {}
+        self.clock = clock
+
+    def health_of(self, name):
+        if name not in self.sources:
+            self.sources[name] = SourceHealth(name, CircuitBreaker(failure_threshold=3, cooldown=60, clock=self.clock))
+        return self.sources[name]
+
+    def test_broken_source_costs_nothing(self):
+        """Test a down source is skipped without requests once its breaker opens"""
+        calls = []
+        session = failing_client(calls)
+        for _ in range(3):
+            assert scrape_source("zoomg", session) == 0
+        assert len(calls) == 3
+        assert self.sources["zoomg"].breaker.state == CircuitBreaker.OPEN
+
+        assert scrape_source("zoomg", session) == 0
+        assert len(calls) == 3
+        assert self.sources["zoomg"].runs == 3
+
+        self.clock.now = 60
+        scrape_source("zoomg", session)
+        assert len(calls) == 4
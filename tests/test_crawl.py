@@ -0,0 +1,133 @@
+import pytest
+from datetime import timedelta
+
+from database.db import SeenCRUD
+from scraper import scraper as scraper_module
+from scraper import scraper_utilities
+from scraper.scraper import crawl_new, article_key, scrape_source
+from scraper.scraper_utilities import write_post_list
+
+
+class FakeListingScraper:
+    """Listing of `total` articles, newest first, `per_page` per page"""
+
+    def __init__(self, total, per_page=3):
+        self.articles = [{"title": f"News {i}", "link": f"https://site/{i}"} for i in range(total, 0, -1)]
+        self.per_page = per_page
+        self.pages_read = []
+
+    def scrape(self, page=1):
+        self.pages_read.append(page)
+        start = (page - 1) * self.per_page
+        return self.articles[start:start + self.per_page]
+
+    def parse(self, data):
+        return data or None
+
+
+class FlakyDetailScraper(FakeListingScraper):
+    """Listing whose article pages in `failing` cannot be fetched"""
+
+    def __init__(self, total, failing):
+        super().__init__(total)
+        self.failing = failing
+
+    def detail_parser(self, data):
+        return [item for item in data if item["link"] not in self.failing]
+
+
+@pytest.fixture(autouse=True)
+def crawl_engine(engine, monkeypatch):
+    """Seen index in the test database"""
+    monkeypatch.setattr(scraper_module, "engine", engine)
+    monkeypatch.setattr(scraper_utilities, "engine", engine)
+
+
+def mark_seen(session, listing, count):
+    SeenCRUD.add_many(session, "site", [article_key(a) for a in listing.articles[-count:]])
+
+
+# ============= INCREMENTAL CRAWL TESTS =============
+
+class TestIncrementalCrawl:
+    """Test suite for crawling listing pages down to the seen index"""
+
+    def test_first_crawl_reads_one_page(self):
+        """Test a source without a seen index does not backfill its history"""
+        listing = FakeListingScraper(10)
+        fresh = crawl_new(listing, "site")
+        assert listing.pages_read == [1]
+        assert len(fresh) == 3
+
+    def test_normal_run_costs_one_page(self, session):
+        """Test one page is read when it already holds a seen article"""
+        listing = FakeListingScraper(10)
+        mark_seen(session, listing, 9)
+        fresh = crawl_new(listing, "site")
+        assert listing.pages_read == [1]
+        assert [item["title"] for item in fresh] == ["News 10"]
+
+    def test_catch_up_after_downtime(self, session):
+        """Test pages are walked until the seen index, only missing articles returned"""
+        listing = FakeListingScraper(10)
+        mark_seen(session, listing, 3)
+        fresh = crawl_new(listing, "site")
+        assert listing.pages_read == [1, 2, 3]
+        assert len(fresh) == 7
+
+    def test_depth_is_bounded(self, session):
+        """Test the walk stops at max_pages"""
+        listing = FakeListingScraper(30)
+        mark_seen(session, listing, 1)
+        crawl_new(listing, "site", max_pages=2)
+        assert listing.pages_read == [1, 2]
+
+    def test_dropped_article_is_crawled_again(self, monkeypatch):
+        """Test an article whose detail fetch failed is not marked seen and is stored next run"""
+        listing = FlakyDetailScraper(3, failing={"https://site/2"})
+        stored = []
+        monkeypatch.setattr(scraper_module.ScraperContianer, "resolve", lambda self, website, session: listing)
+        def write_post_list(details):
+            stored.extend(details or [])
+            return len(details or []), [article_key(item) for item in details or []]
+        monkeypatch.setattr(scraper_module, "write_post_list", write_post_list)
+
+        assert scrape_source("site", session=None) == 2
+        listing.failing = set()
+        assert scrape_source("site", session=None) == 1
+        assert [item["title"] for item in stored] == ["News 3", "News 1", "News 2"]
+        assert scrape_source("site", session=None) == 0
+
+
+    def test_only_held_articles_are_seen(self, monkeypatch):
+        """Test write_post_list returns the keys of stored and known articles, not of skipped ones"""
+        # the whole text as its summary
+        monkeypatch.setattr(scraper_utilities, "TextSummarizationPipeline", lambda text, ratio, limit: type(
+            "Summary", (), {"process_and_summarize": lambda self: text})())
+        article = lambda i, **changes: {"title": f"News {i}", "link": f"https://site/{i}", "image": "url", "content": "Text", **changes}
+
+        created, held = write_post_list([article(1), article(2, content=None), article(3, link=None, title=None)])
+        assert created == 1
+        assert held == ["https://site/1"]
+
+        # a known title is held already, a post that cannot be stored is not
+        created, held = write_post_list([article(1, link="https://site/1b"), article(4, image=None)])
+        assert created == 0
+        assert held == ["https://site/1b"]
+
+
+class TestSeenIndex:
+    """Test suite for the crawl seen index"""
+
+    def test_add_many_ignores_known(self, session):
+        """Test re-adding keys keeps one row per (source, key)"""
+        assert SeenCRUD.add_many(session, "site", ["a", "b", "b"]).data == 2
+        assert SeenCRUD.add_many(session, "site", ["a", "c"]).data == 1
+        assert SeenCRUD.known(session, "site", ["a", "c", "x"]).data == {"a", "c"}
+        assert SeenCRUD.known(session, "other", ["a"]).data == set()
+
+    def test_purge(self, session):
+        """Test old keys are forgotten"""
+        SeenCRUD.add_many(session, "site", ["a"])
+        assert SeenCRUD.purge(session, older_than=timedelta(days=-1)).data == 1
+        assert SeenCRUD.count(session, "site").data == 0
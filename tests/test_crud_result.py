@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from database.models import GenreBase
+from database.db import CRUDResult, GenreCRUD, handle_db_errors, classify_db_error
+
+
+@handle_db_errors("Echo")
+def echo(session, value):
+    """Return value"""
+    return value
+
+
+@handle_db_errors("Locked")
+def locked(session):
+    raise OperationalError("SELECT 1", {}, Exception("database is locked"))
+
+
+# ============= CRUD RESULT TESTS =============
+
+class TestHandleDbErrors:
+    """Test suite for CRUDResult and the error handling decorator"""
+
+    def test_success_result(self):
+        """Test a successful call wraps its value"""
+        result = echo(None, 5)
+        assert result.success and result.data == 5 and result.error is None
+
+    def test_result_has_slots(self):
+        """Test CRUDResult carries no per-instance dict"""
+        assert not hasattr(CRUDResult(True, 1), "__dict__")
+
+    def test_wraps_metadata(self):
+        """Test the wrapper keeps the name and docstring of the function"""
+        assert echo.__name__ == "echo"
+        assert echo.__doc__ == "Return value"
+
+    def test_integrity_error_message(self, session):
+        """Test a unique violation is reported as such and the session rolled back"""
+        GenreCRUD.create(session, GenreBase(title="Drama"))
+        result = GenreCRUD.create(session, GenreBase(title="Drama"))
+        assert not result.success
+        assert result.error_type == "IntegrityError"
+        assert result.error == "Record with this value already exists"
+        assert GenreCRUD.get_by_title(session, "Drama").success
+
+    def test_operational_error_message(self, session):
+        """Test operational errors are classified from their message"""
+        result = locked(session)
+        assert result.error_type == "OperationalError"
+        assert result.error == "Database is temporarily locked. Please try again."
+
+    def test_unexpected_error(self):
+        """Test non database exceptions are reported as unexpected"""
+        error, error_type, _, _ = classify_db_error(KeyError("x"))
+        assert error_type == "UnexpectedError"
+        assert error.startswith("Unexpected error")
+
+    def test_raw_returns_value_and_raises(self, session):
+        """Test .raw skips the result wrapper and lets exceptions through"""
+        GenreCRUD.create(session, GenreBase(title="Drama"))
+        assert GenreCRUD.get_by_title.raw(session, "Drama").title == "Drama"
+        assert GenreCRUD.get_by_title.raw(session, "Comedy") is None
+        with pytest.raises(OperationalError):
+            locked.raw(session)
+
@@ -0,0 +1,28 @@
+from sqlmodel import Session, SQLModel, create_engine
+
+from database.models import GenreBase
+from database.db import DataVersionWatcher, GenreCRUD
+
+
+# ============= DATA VERSION TESTS =============
+
+class TestDataVersionWatcher:
+    """Test suite for change detection with PRAGMA data_version"""
+
+    def test_detects_commits_from_other_connections(self, tmp_path):
+        """Test the watcher only reports a change after another connection commits"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'watch.db'}")
+        SQLModel.metadata.create_all(engine)
+        watcher = DataVersionWatcher(engine)
+
+        assert watcher.changed() is True
+        assert watcher.changed() is False
+
+        with Session(engine) as session:
+            GenreCRUD.create(session, GenreBase(title="Drama"))
+
+        assert watcher.changed() is True
+        assert watcher.changed() is False
+
+        watcher.close()
+        engine.dispose()
@@ -0,0 +1,112 @@
+import httpx
+import pytest
+
+from scraper.declarative import SourceDefinition, DeclarativeScraper, load_source_definitions
+from scraper.scraper import ScraperContianer
+
+
+LISTING = """
+<div class="news">
+  <div class="card"><a href="https://site/1"><h4> First </h4></a><span class="cat">cinema</span>
+    <img src="https://img/1.jpg"></div>
+  <div class="card"><a href="https://site/2"><h4>Second</h4></a><span class="cat">games</span></div>
+  <div class="card"><h4>No link</h4><span class="cat">cinema</span></div>
+</div>
+"""
+ARTICLE = "<div class='body'><p>One.</p><p>Two.</p></div>"
+
+DEFINITION = {
+    "name": "site",
+    "interval": 900,
+    "url": "https://site/news/",
+    "page_url": "https://site/news/page/{page}/",
+    "listing": {
+        "item": "div.news div.card",
+        "fields": {
+            "title": "h4",
+            "category": "span.cat",
+            "link": {"selector": "a", "attr": "href"},
+            "image": {"selector": "img", "attr": "src"},
+        },
+        "filter": {"category": "cinema"},
+        "constants": {"type": "N/A"},
+    },
+    "detail": {"fields": {"content": {"selector": "div.body p", "all": True, "join": " ", "default": None}}},
+}
+
+
+def client_for(pages):
+    """httpx client serving url -> html"""
+    def handler(request):
+        html = pages.get(str(request.url))
+        return httpx.Response(200, text=html) if html is not None else httpx.Response(404)
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(name="scraper")
+def scraper_fixture():
+    pages = {
+        "https://site/news/": LISTING,
+        "https://site/news/page/2/": "<div class='news'></div>",
+        "https://site/1": ARTICLE,
+    }
+    return DeclarativeScraper(SourceDefinition(DEFINITION), client_for(pages))
+
+
+# ============= DECLARATIVE SOURCE TESTS =============
+
+class TestDeclarativeScraper:
+    """Test suite for YAML defined HTML sources"""
+
+    def test_listing_fields_and_filter(self, scraper):
+        """Test items are read with the field selectors and filtered"""
+        posts = scraper.parse(scraper.scrape())
+        assert [post["title"] for post in posts] == ["First", "No link"]
+        assert posts[0] == {
+            "type": "N/A", "title": "First", "category": "cinema",
+            "link": "https://site/1", "image": "https://img/1.jpg",
+        }
+        assert posts[1]["image"] == "N/A"
+
+    def test_detail_fields(self, scraper):
+        """Test detail fields are read from each linked page, unlinked items dropped"""
+        posts = scraper.detail_parser(scraper.parse(scraper.scrape()))
+        assert [post["content"] for post in posts] == ["One. Two."]
+
+    def test_pages(self, scraper):
+        """Test later pages use page_url and an empty page parses to None"""
+        assert scraper.parse(scraper.scrape(page=2)) is None
+
+    def test_container_fallback_and_separator(self):
+        """Test items come from the first container only, links prefer the first selector, texts keep a separator"""
+        listing = """
+        <div class="list"><article><h3><a href="https://site/a">A</a></h3><a class="more" href="https://site/a/more">more</a></article>
+          <article><h3><a href="https://site/b">B</a></h3></article></div>
+        <div class="list"><article><h3><a href="https://site/c">C</a></h3></article></div>
+        """
+        definition = SourceDefinition({
+            "name": "site", "url": "https://site/news/",
+            "listing": {
+                "container": "div.list", "item": "article",
+                "fields": {"title": "h3", "link": {"selector": ["a.more", "h3 a"], "attr": "href"}},
+            },
+            "detail": {"fields": {"content": {"selector": "p", "all": True, "separator": " "}}},
+        })
+        pages = {"https://site/news/": listing, "https://site/a/more": "<p><b>One</b>word</p>", "https://site/b": "<p>Two</p>"}
+        scraper = DeclarativeScraper(definition, client_for(pages))
+
+        posts = scraper.detail_parser(scraper.parse(scraper.scrape()))
+        assert [(post["title"], post["link"]) for post in posts] == [("A", "https://site/a/more"), ("B", "https://site/b")]
+        assert [post["content"] for post in posts] == ["One word", "Two"]
+
+    def test_shipped_definitions(self):
+        """Test every shipped definition compiles and is registered in the container"""
+        definitions = load_source_definitions()
+        assert {"gamefa", "fromcinema"} <= set(definitions)
+        assert load_source_definitions() is definitions
+
+        contianer = ScraperContianer()
+        for name, definition in definitions.items():
+            assert contianer.interval_map[name] == definition.interval
+            assert isinstance(contianer.resolve(name, session=None), DeclarativeScraper)
+
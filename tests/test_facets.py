@@ -0,0 +1,95 @@
+from sqlalchemy import text
+
+from database.models import MovieBase, GenreBase, CountryBase
+from database.db import MovieCRUD, GenreCRUD, CountryCRUD, FacetCRUD
+
+
+def make_movie(session, api_id, year, is_persian=False, genres=(), countries=()):
+    movie = MovieCRUD.create(session, MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=year, duration="120", imdb=7.0, is_persian=is_persian,
+        image_url="url", cover_url="url", api_id=api_id
+    ), enqueue=False).data
+    movie.genres.extend(genres)
+    movie.countries.extend(countries)
+    session.commit()
+    return movie
+
+
+# ============= FACET TESTS =============
+
+class TestFacetCRUD:
+    """Test suite for catalog facet counts"""
+
+    def test_summary_follows_ingest(self, session):
+        """Test the summary table counts genres, countries, decades and the persian flag"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        france = CountryCRUD.create(session, CountryBase(title="France", image_url="url")).data
+        make_movie(session, 1, 2021, genres=[drama], countries=[france])
+        make_movie(session, 2, 2015, is_persian=True, genres=[drama])
+
+        summary = FacetCRUD.summary(session, "movie").data
+        assert summary["genre"] == {"Drama": 2}
+        assert summary["country"] == {"France": 1}
+        assert summary["decade"] == {2020: 1, 2010: 1}
+        assert summary["persian"] == {True: 1, False: 1}
+        assert FacetCRUD.get(session, "movie", "genre", "Drama").data == 2
+
+    def test_summary_follows_update_and_delete(self, session):
+        """Test updates move counts between buckets and deletes remove them"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        movie = make_movie(session, 1, 2021, genres=[drama])
+
+        MovieCRUD.update(session, movie.id, {"year": 1999, "is_persian": True})
+        summary = FacetCRUD.summary(session, "movie").data
+        assert summary["decade"] == {1990: 1}
+        assert summary["persian"] == {True: 1}
+
+        MovieCRUD.delete(session, movie.id)
+        summary = FacetCRUD.summary(session, "movie").data
+        assert summary == {"genre": {}, "country": {}, "decade": {}, "persian": {}}
+
+    def test_genre_rename(self, session):
+        """Test renaming a genre carries its count"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        make_movie(session, 1, 2021, genres=[drama])
+        GenreCRUD.update(session, drama.id, {"title": "درام"})
+        assert FacetCRUD.summary(session, "movie").data["genre"] == {"درام": 1}
+
+    def test_genre_rename_onto_existing_row(self, session):
+        """Test renaming to a title that has a facet row adds the counts instead of failing"""
+        # a genre of that title was deleted, its zeroed row stays
+        session.exec(text("INSERT INTO catalogfacet (kind, facet, value, total) VALUES ('movie', 'genre', 'Drama', 0)"))
+        session.commit()
+        drama = GenreCRUD.create(session, GenreBase(title="درام")).data
+        make_movie(session, 1, 2021, genres=[drama])
+
+        assert GenreCRUD.update(session, drama.id, {"title": "Drama"}).success
+        assert FacetCRUD.summary(session, "movie").data["genre"] == {"Drama": 1}
+        assert session.exec(text("SELECT count(*) FROM catalogfacet WHERE facet = 'genre'")).one() == (1,)
+
+    def test_filtered_count(self, session):
+        """Test filtered counts: dramas from France after 2020"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        comedy = GenreCRUD.create(session, GenreBase(title="Comedy")).data
+        france = CountryCRUD.create(session, CountryBase(title="France", image_url="url")).data
+        make_movie(session, 1, 2021, genres=[drama, comedy], countries=[france])
+        make_movie(session, 2, 2022, genres=[drama], countries=[france])
+        make_movie(session, 3, 2010, genres=[drama], countries=[france])
+        make_movie(session, 4, 2022, genres=[drama])
+
+        result = FacetCRUD.count(session, "movie", genre="Drama", country="France", year_between=(2020, 2100))
+        assert result.success
+        assert result.data["genre"] == {"Drama": 2, "Comedy": 1}
+        assert result.data["decade"] == {2020: 2}
+
+    def test_rebuild_matches_triggers(self, session):
+        """Test a rebuild from scratch gives the trigger-maintained counts"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        make_movie(session, 1, 2021, genres=[drama])
+        make_movie(session, 2, 2005, is_persian=True)
+        before = FacetCRUD.summary(session, "movie").data
+
+        session.exec(text("DELETE FROM catalogfacet"))
+        assert FacetCRUD.rebuild(session).success
+        assert FacetCRUD.summary(session, "movie").data == before
@@ -0,0 +1,70 @@
+import httpx
+
+from scraper.scraper import ZoomgScraper, JsonApiScraper, ScraperContianer, first_of, constant
+
+
+ZOOMG_PAGE = {
+    "data": {
+        "items": [
+            {
+                "title": "Dune 3 trailer", "summary": "First look", "imageUrl": "https://img/1.jpg",
+                "url": "/cinema/1-dune", "publishDate": "2026-01-01T10:00:00",
+            },
+            {"title": "No text", "summary": "", "slug": "x"},
+            "not a record",
+        ]
+    }
+}
+
+
+def client_for(payload, pages=None, status=200):
+    """httpx client answering every request with payload, recording the urls"""
+    def handler(request):
+        if pages is not None:
+            pages.append(str(request.url))
+        return httpx.Response(status, json=payload)
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+# ============= JSON SOURCE TESTS =============
+
+class TestJsonApiScraper:
+    """Test suite for JSON API sources"""
+
+    def test_zoomg_maps_records_to_posts(self):
+        """Test API records become standard post dicts without HTML parsing"""
+        scraper = ZoomgScraper(client_for(ZOOMG_PAGE))
+        posts = scraper.parse(scraper.scrape())
+        assert posts == [{
+            "title": "Dune 3 trailer", "type": "N/A", "content": "First look",
+            "year": "2026-01-01T10:00:00", "image": "https://img/1.jpg",
+            "link": "https://www.zoomg.ir/cinema/1-dune",
+        }]
+        assert scraper.detail_parser(posts) is posts
+
+    def test_page_number_in_url(self):
+        """Test scrape asks the API for the requested page"""
+        pages = []
+        ZoomgScraper(client_for(ZOOMG_PAGE, pages)).scrape(page=3)
+        assert "pageNumber=3" in pages[0]
+
+    def test_http_error(self):
+        """Test a failing API yields no posts instead of raising"""
+        scraper = ZoomgScraper(client_for({}, status=503))
+        assert scraper.parse(scraper.scrape()) is None
+
+    def test_generic_source(self):
+        """Test a new source only declares its url, records path and fields"""
+        class ExampleSource(JsonApiScraper):
+            url = "https://example.com/news?page=%d"
+            items_paths = (("results",),)
+            field_map = {"title": "headline", "content": first_of("body", "teaser"), "type": constant("news")}
+
+        scraper = ExampleSource(client_for({"results": [{"headline": "H", "teaser": "T"}]}))
+        assert scraper.parse(scraper.scrape()) == [{"title": "H", "content": "T", "type": "news"}]
+
+    def test_zoomg_is_registered(self):
+        """Test the container resolves and schedules zoomg"""
+        contianer = ScraperContianer()
+        assert isinstance(contianer.resolve("zoomg", session=None), ZoomgScraper)
+        assert "zoomg" in contianer.schedules()
@@ -0,0 +1,81 @@
+import pytest
+
+from bot.templats.callbacks import CallbackCodec, CALLBACK_DATA_LIMIT
+from bot.templats.base import Button, LayoutRegistry, layouts
+from bot.templats.admin import ADMIN
+
+
+@pytest.fixture(name="codec")
+def codec_fixture():
+    codec = CallbackCodec()
+    codec.register("browse", kind=str, cursor=int)
+    codec.register("approve", item_id=int)
+    return codec
+
+
+# ============= CALLBACK CODEC TESTS =============
+
+class TestCallbackCodec:
+    """Test suite for compact callback_data"""
+
+    def test_round_trip(self, codec):
+        """Test encoded arguments decode to the same values"""
+        data = codec.encode("browse", kind="movie", cursor=123456789)
+        callback = codec.decode(data)
+        assert callback.action == "browse"
+        assert callback.args == {"kind": "movie", "cursor": 123456789}
+
+    def test_compact_and_none(self, codec):
+        """Test ints are base 36 and None arguments are sent empty"""
+        assert codec.encode("approve", item_id=100) == "1:2s"
+        assert codec.decode(codec.encode("browse", kind="movie")).args["cursor"] is None
+
+    def test_limit_is_enforced(self, codec):
+        """Test payloads over 64 bytes are refused when encoding"""
+        with pytest.raises(ValueError):
+            codec.encode("browse", kind="x" * CALLBACK_DATA_LIMIT, cursor=1)
+
+    def test_unknown_data(self, codec):
+        """Test data of other codecs (or old JSON buttons) is rejected"""
+        with pytest.raises(ValueError):
+            codec.decode('{"class": "A"}')
+        with pytest.raises(ValueError):
+            codec.decode("1:2:3")
+
+    def test_duplicate_action(self, codec):
+        """Test an action name can only be registered once"""
+        with pytest.raises(ValueError):
+            codec.register("approve", item_id=int)
+
+
+# ============= LAYOUT REGISTRY TESTS =============
+
+class TestLayoutRegistry:
+    """Test suite for keyboards built once at startup"""
+
+    def test_markup_is_built_once(self):
+        """Test get returns the same prebuilt markup on every call"""
+        calls = []
+        registry = LayoutRegistry()
+
+        @registry.register("start", "admin")
+        def start():
+            calls.append(1)
+            return [[Button("A", "menu")]]
+
+        registry.build()
+        assert registry.get("start", "admin") is registry.get("start", "admin")
+        assert len(calls) == 1
+
+    def test_unknown_layout(self):
+        """Test an unregistered name or role is refused"""
+        with pytest.raises(ValueError):
+            LayoutRegistry().get("start", "guest")
+
+    def test_admin_start_layout(self):
+        """Test the admin keyboard carries compact callback data"""
+        markup = layouts.get("start", ADMIN)
+        for row in markup.inline_keyboard:
+            for button in row:
+                assert len(button.callback_data.encode()) <= CALLBACK_DATA_LIMIT
+                assert not button.callback_data.startswith("{")
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import event
+
+from database.models import MovieBase, GenreBase, CountryBase, ActorBase
+from database.db import MovieCRUD, GenreCRUD, CountryCRUD, ActorCRUD
+
+
+@pytest.fixture(name="movies")
+def movies_fixture(session):
+    """Create 10 movies sharing a genre, a country and an actor"""
+    genre = GenreCRUD.create(session, GenreBase(title="Drama")).data
+    country = CountryCRUD.create(session, CountryBase(title="France", image_url="url")).data
+    actor = ActorCRUD.create(session, ActorBase(name="Actor", image_url="url")).data
+    for i in range(10):
+        movie = MovieCRUD.create(session, MovieBase(
+            title=f"Movie {i}", type_="movie", description="Test",
+            year=2020, duration="120", imdb=7.0, is_persian=False,
+            image_url="url", cover_url="url", api_id=i
+        )).data
+        MovieCRUD.add_genre(session, movie_id=movie.id, genre_id=genre.id)
+        MovieCRUD.add_country(session, movie_id=movie.id, country_id=country.id)
+        MovieCRUD.add_actor(session, movie_id=movie.id, actor_id=actor.id)
+    session.expunge_all()
+
+
+def count_queries(engine, callback):
+    """Run callback and return the number of SQL statements it issued"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        callback()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+# ============= LOADING PROFILE TESTS =============
+
+class TestLoadProfiles:
+    """Test suite for named eager-loading profiles"""
+
+    def test_full_profile_costs_constant_queries(self, engine, session, movies):
+        """Test touching every relationship of N movies does not issue N queries"""
+        def read_all():
+            for movie in MovieCRUD.get_all(session, load="full").data:
+                movie.genres, movie.countries, movie.actors, movie.trailers
+
+        # one SELECT for the movies plus one per relationship
+        assert count_queries(engine, read_all) == 5
+
+    def test_default_is_lazy(self, engine, session, movies):
+        """Test no profile keeps lazy loading (one query per row and relationship)"""
+        def read_genres():
+            for movie in MovieCRUD.get_all(session).data:
+                movie.genres
+
+        assert count_queries(engine, read_genres) == 11
+
+    def test_card_profile_loads_genres_and_countries(self, session, movies):
+        """Test the card profile returns populated relationships"""
+        movie = MovieCRUD.get_by_api_id(session, 3, load="card").data
+        assert [genre.title for genre in movie.genres] == ["Drama"]
+        assert [country.title for country in movie.countries] == ["France"]
+
+    def test_unknown_profile_fails(self, session, movies):
+        """Test an unknown profile name returns a failed result"""
+        result = MovieCRUD.get_all(session, load="everything")
+        assert not result.success
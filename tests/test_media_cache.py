@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from bot import bot as bot_module
+from bot import bot_utilities
+from bot.bot_utilities import send_media_group_cached
+from database.db import MediaCacheCRUD
+
+
+class FakeBot:
+    """Records what would go to Telegram, each upload gets the file_id of its url"""
+
+    def __init__(self, reject_groups=False):
+        self.reject_groups = reject_groups
+        self.groups = []
+        self.photos = []
+        self.messages = []
+
+    @staticmethod
+    def sent(media):
+        return SimpleNamespace(photo=[SimpleNamespace(file_id=f"id:{media}")])
+
+    async def send_media_group(self, chat_id, media):
+        if self.reject_groups:
+            raise BadRequest("group rejected")
+        self.groups.append([item.media for item in media])
+        return [self.sent(item.media) for item in media]
+
+    async def send_photo(self, chat_id, photo, caption=None, parse_mode=None):
+        self.photos.append(photo)
+        return self.sent(photo)
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.messages.append(text)
+
+
+def item(i, image=True):
+    return {"title": f"Item {i}", "caption": f"caption {i}", "image_url": f"https://example.com/{i}.jpg" if image else None}
+
+
+@pytest.fixture(name="bot")
+def bot_fixture(engine, monkeypatch):
+    """Fake bot, with the media cache in the test database"""
+    monkeypatch.setattr(bot_utilities, "engine", engine)
+    return FakeBot()
+
+
+# ============= MEDIA CACHE TESTS =============
+
+class TestMediaCacheCRUD:
+    """Test suite for Telegram media cache CRUD operations"""
+
+    def test_cache_miss(self, session):
+        """Test unknown url returns None"""
+        result = MediaCacheCRUD.get_by_url(session, "https://example.com/none.jpg")
+        assert result.success
+        assert result.data is None
+
+    def test_save_and_get(self, session):
+        """Test saving a file_id and reading it back by url"""
+        MediaCacheCRUD.save(session, "https://example.com/poster.jpg", "AgAC-1")
+        result = MediaCacheCRUD.get_by_url(session, "https://example.com/poster.jpg")
+        assert result.data.file_id == "AgAC-1"
+
+    def test_save_replaces_file_id(self, session):
+        """Test saving the same url twice keeps a single row"""
+        MediaCacheCRUD.save(session, "https://example.com/poster.jpg", "AgAC-1")
+        result = MediaCacheCRUD.save(session, "https://example.com/poster.jpg", "AgAC-2")
+        assert result.success
+        assert result.data.file_id == "AgAC-2"
+
+    def test_delete_by_url(self, session):
+        """Test forgetting a cached url"""
+        MediaCacheCRUD.save(session, "https://example.com/poster.jpg", "AgAC-1")
+        assert MediaCacheCRUD.delete_by_url(session, "https://example.com/poster.jpg").data is True
+        assert MediaCacheCRUD.get_by_url(session, "https://example.com/poster.jpg").data is None
+
+
+class TestSendMediaGroupCached:
+    """Test suite for sending media groups through the file_id cache"""
+
+    def test_cached_file_id_is_reused(self, bot, session):
+        """Test a cached url goes out as its file_id and only uploaded urls are cached"""
+        MediaCacheCRUD.save(session, "https://example.com/1.jpg", "AgAC-1")
+        photos = [("https://example.com/1.jpg", "one"), ("https://example.com/2.jpg", "two")]
+
+        asyncio.run(send_media_group_cached(bot, 1, photos))
+        assert bot.groups == [["AgAC-1", "https://example.com/2.jpg"]]
+        assert MediaCacheCRUD.get_by_url(session, "https://example.com/1.jpg").data.file_id == "AgAC-1"
+        assert MediaCacheCRUD.get_by_url(session, "https://example.com/2.jpg").data.file_id == "id:https://example.com/2.jpg"
+
+        asyncio.run(send_media_group_cached(bot, 1, photos))
+        assert bot.groups[1] == ["AgAC-1", "id:https://example.com/2.jpg"]
+
+
+class TestSendBatch:
+    """Test suite for sending queued items as media groups"""
+
+    def test_groups_of_media_group_size(self, bot, monkeypatch):
+        """Test photos go in groups of MEDIA_GROUP_SIZE, a lone last one and imageless items singly"""
+        monkeypatch.setattr(bot_module, "MEDIA_GROUP_SIZE", 3)
+        items = [item(i) for i in range(7)] + [item(7, image=False)]
+
+        failed = asyncio.run(bot_module.send_batch_to_telegram(items, bot, 1))
+        assert failed == []
+        assert [len(group) for group in bot.groups] == [3, 3]
+        assert bot.photos == ["https://example.com/6.jpg"]
+        assert bot.messages == ["caption 7"]
+
+    def test_rejected_group_falls_back_to_singles(self, bot):
+        """Test the items of a group Telegram rejects are sent one by one"""
+        bot.reject_groups = True
+        items = [item(i) for i in range(3)]
+
+        failed = asyncio.run(bot_module.send_batch_to_telegram(items, bot, 1))
+        assert failed == []
+        assert bot.groups == []
+        assert bot.photos == [data["image_url"] for data in items]
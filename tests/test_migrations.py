@@ -0,0 +1,107 @@
+import pytest
+from sqlmodel import create_engine
+from sqlalchemy import inspect, text
+from sqlalchemy.pool import StaticPool
+
+from database.models import MovieBase, Post
+from database.db import MovieCRUD, SearchIndex, FacetCRUD
+from database import migrations
+
+
+@pytest.fixture(name="blank_engine")
+def blank_engine_fixture():
+    """Empty in-memory database, no tables"""
+    return create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+# ============= MIGRATION TESTS =============
+
+class TestMigrations:
+    """Test suite for the schema migration runner"""
+
+    def test_migrate_fresh_database(self, blank_engine):
+        """Test a fresh database gets every table and migration, and --check is clean"""
+        applied = migrations.migrate(blank_engine)
+        assert applied == [m.version for m in migrations.MIGRATIONS]
+        assert migrations.check(blank_engine) == {"tables": [], "columns": [], "indexes": [], "migrations": []}
+
+    def test_migrate_is_idempotent(self, blank_engine):
+        """Test a second run applies nothing"""
+        migrations.migrate(blank_engine)
+        assert migrations.migrate(blank_engine) == []
+
+    def test_missing_index_is_reported_and_created(self, engine):
+        """Test an index added to the models after the database was made"""
+        migrations.migrate(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_movie_year_imdb")
+
+        assert migrations.check(engine)["indexes"] == ["ix_movie_year_imdb"]
+        migrations.migrate(engine)
+        assert "ix_movie_year_imdb" in index_names(engine, "movie")
+
+    def test_missing_column_is_reported_and_added(self, engine):
+        """Test check reports a column the table lacks and add_column adds it"""
+        migrations.migrate(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE post DROP COLUMN link")
+        assert migrations.check(engine)["columns"] == ["post.link"]
+
+        migrations.add_column(engine, Post.__table__.c.link)
+        assert migrations.check(engine)["columns"] == []
+
+    def test_backfills_existing_rows(self, engine, session):
+        """Test a database made before the runner gets its derived tables filled"""
+        MovieCRUD.create(session, MovieBase(
+            title="Matrix", type_="movie", description="Test", year=1999, duration="120",
+            imdb=8.7, is_persian=False, image_url="url", cover_url="url", api_id=1
+        ), enqueue=False)
+        session.exec(text("DELETE FROM search_index"))
+        session.exec(text("DELETE FROM catalogfacet"))
+        session.commit()
+
+        migrations.migrate(engine)
+        assert [hit[:2] for hit in SearchIndex.search(session, "matrix")] == [("movie", 1)]
+        assert FacetCRUD.summary(session, "movie").data["decade"] == {1990: 1}
+
+    def test_versions_must_increase(self):
+        """Test registering an out of order migration fails"""
+        with pytest.raises(ValueError):
+            migrations.migration(1, "duplicate")(lambda engine: None)
+
+    def test_check_cli_exit_code(self, blank_engine, monkeypatch, capsys):
+        """Test --check exits 1 on a database that needs migrating and 0 after"""
+        monkeypatch.setattr(migrations, "db_engine", blank_engine)
+        assert migrations.main(["--check"]) == 1
+        assert "missing table: movie" in capsys.readouterr().out
+
+        assert migrations.main([]) == 0
+        assert migrations.main(["--check"]) == 0
+
+    def test_new_database_starts_incremental(self, blank_engine):
+        """Test migrate() gives a new database incremental auto_vacuum"""
+        migrations.migrate(blank_engine)
+        assert migrations.auto_vacuum_mode(blank_engine) == migrations.AUTO_VACUUM_INCREMENTAL
+
+    def test_vacuum_is_offline_only(self, tmp_path, monkeypatch, capsys):
+        """Test migrate() never runs the full VACUUM an existing database needs, --vacuum does"""
+        file_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        MovieBase.metadata.create_all(file_engine)
+
+        # without a VACUUM the mode of a database with tables stays as it was
+        migrations.migrate(file_engine)
+        assert migrations.auto_vacuum_mode(file_engine) == 0
+
+        monkeypatch.setattr(migrations, "db_engine", file_engine)
+        assert migrations.main(["--check"]) == 0
+        assert "auto_vacuum is not incremental" in capsys.readouterr().out
+        assert migrations.main(["--vacuum"]) == 0
+        assert migrations.auto_vacuum_mode(file_engine) == migrations.AUTO_VACUUM_INCREMENTAL
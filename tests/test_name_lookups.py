@@ -0,0 +1,89 @@
+from sqlalchemy import event
+
+from database.models import MovieBase, SerialBase, GenreBase, CountryBase, ActorBase
+from database.db import MovieCRUD, SerialCRUD, GenreCRUD, CountryCRUD, ActorCRUD
+
+
+def make_movie(session, api_id, genres=(), country=None, actor=None):
+    movie = MovieCRUD.create(session, MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=2020, duration="120", imdb=7.0, is_persian=False,
+        image_url="url", cover_url="url", api_id=api_id
+    ), enqueue=False).data
+    movie.genres.extend(genres)
+    if country:
+        movie.countries.append(country)
+    if actor:
+        movie.actors.append(actor)
+    session.commit()
+    return movie
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+# ============= NAME LOOKUP TESTS =============
+
+class TestNameLookups:
+    """Test suite for genre/country/actor lookups by name"""
+
+    def test_lookups_by_name(self, session):
+        """Test genre, country and actor names find the linked movie"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        iran = CountryCRUD.create(session, CountryBase(title="Iran", image_url="url")).data
+        actor = ActorCRUD.create(session, ActorBase(name="Navid Mohammadzadeh", image_url="url")).data
+        movie = make_movie(session, 1, genres=[drama], country=iran, actor=actor)
+        make_movie(session, 2)
+
+        assert [m.id for m in MovieCRUD.get_by_genre_title(session, "Drama").data] == [movie.id]
+        assert [m.id for m in MovieCRUD.get_by_country_name(session, "Iran").data] == [movie.id]
+        assert [m.id for m in MovieCRUD.get_by_actor_name(session, "Navid Mohammadzadeh").data] == [movie.id]
+
+    def test_missing_entity_returns_empty_list(self, session):
+        """Test an unknown name is an empty result, not an error"""
+        for crud in (MovieCRUD, SerialCRUD):
+            for lookup in (crud.get_by_genre_title, crud.get_by_country_name, crud.get_by_actor_name):
+                result = lookup(session, "Nowhere")
+                assert result.success
+                assert result.data == []
+
+    def test_lookup_is_one_statement(self, engine, session):
+        """Test the entity and the items are fetched in a single query"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        make_movie(session, 1, genres=[drama])
+        session.expire_all()
+
+        statements = count_statements(engine)
+        SerialCRUD.get_by_genre_title(session, "Drama")
+        MovieCRUD.get_by_genre_title(session, "Drama")
+        assert len(statements) == 2
+
+    def test_genres_any_and_all(self, session):
+        """Test genres_any matches either genre, genres_all needs both, without duplicates"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        crime = GenreCRUD.create(session, GenreBase(title="Crime")).data
+        both = make_movie(session, 1, genres=[drama, crime])
+        only_drama = make_movie(session, 2, genres=[drama])
+        make_movie(session, 3)
+
+        any_ids = [m.id for m in MovieCRUD.browse(session, genres_any=["Drama", "Crime"]).data]
+        assert any_ids == [only_drama.id, both.id]
+
+        all_ids = [m.id for m in MovieCRUD.browse(session, genres_all=["Drama", "Crime"]).data]
+        assert all_ids == [both.id]
+
+    def test_serial_genres_all(self, session):
+        """Test the multi-genre filter works for serials"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        serial = SerialCRUD.create(session, SerialBase(
+            title="S", type_="serial", description="Test", year=2020, duration="50",
+            imdb=8.0, is_persian=False, image_url="url", cover_url="url", api_id=1, season_count=1
+        ), enqueue=False).data
+        serial.genres.append(drama)
+        session.commit()
+
+        assert len(SerialCRUD.browse(session, genres_all=["Drama"]).data) == 1
+        assert SerialCRUD.browse(session, genres_all=["Drama", "Crime"]).data == []
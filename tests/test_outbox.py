@@ -0,0 +1,175 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from bot import bot as bot_module
+from bot import bot_utilities
+from database.models import MovieBase, EpisodeBase, PostBase, Movie
+from database.db import MovieCRUD, EpisodeCRUD, OutboxCRUD, PostCRUD, safe_session
+from database.migrations import enable_wal
+
+
+def make_movie(session, api_id, enqueue=True):
+    movie_data = MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=2020, duration="120", imdb=7.0, is_persian=False,
+        image_url="url", cover_url="url", api_id=api_id
+    )
+    return MovieCRUD.create(session, movie_data, enqueue=enqueue).data
+
+
+# ============= OUTBOX TESTS =============
+
+class TestOutboxCRUD:
+    """Test suite for the ingest -> bot outbox"""
+
+    def test_create_enqueues_item(self, session):
+        """Test creating a movie and an episode queues both"""
+        movie = make_movie(session, 1)
+        EpisodeCRUD.create(session, EpisodeBase(
+            title="E1", description="Test", duration="40", api_id=7, image_url="url"
+        ))
+
+        entries = OutboxCRUD.claim(session, limit=10).data
+        assert [(entry.kind, entry.item_id) for entry in entries][0] == ("movie", movie.id)
+        assert {entry.kind for entry in entries} == {"movie", "episode"}
+
+    def test_claim_is_exclusive(self, session):
+        """Test a claimed entry is not handed out twice"""
+        make_movie(session, 1)
+        make_movie(session, 2)
+
+        first = OutboxCRUD.claim(session, limit=1).data
+        second = OutboxCRUD.claim(session, limit=10).data
+        assert len(first) == 1
+        assert len(second) == 1
+        assert first[0].id != second[0].id
+        assert OutboxCRUD.claim(session, limit=10).data == []
+
+    def test_expired_lease_is_claimable(self, session):
+        """Test an entry claimed but never acked is handed out again after its lease"""
+        make_movie(session, 1)
+        OutboxCRUD.claim(session, limit=10)
+        assert OutboxCRUD.claim(session, limit=10, lease_seconds=0).data != []
+
+    def test_ack_marks_item_sent(self, session):
+        """Test acking deletes the entry and marks the movie sent"""
+        movie = make_movie(session, 1)
+        entries = OutboxCRUD.claim(session).data
+        pairs = OutboxCRUD.load_items(session, entries).data
+        assert pairs[0][1].id == movie.id
+
+        assert OutboxCRUD.ack(session, entries).data == 1
+        assert OutboxCRUD.count_pending(session).data == 0
+        assert session.exec(select(Movie.sent).where(Movie.id == movie.id)).one() is True
+
+    def test_release_requeues_until_max_attempts(self, session):
+        """Test released entries are retried a bounded number of times"""
+        make_movie(session, 1)
+        for _ in range(2):
+            entries = OutboxCRUD.claim(session, max_attempts=2).data
+            assert len(entries) == 1
+            OutboxCRUD.release(session, entries)
+        assert OutboxCRUD.claim(session, max_attempts=2).data == []
+
+    def test_enqueue_unsent_backfills_once(self, session):
+        """Test items stored without an outbox row are queued exactly once"""
+        make_movie(session, 1, enqueue=False)
+        make_movie(session, 2)
+
+        assert OutboxCRUD.enqueue_unsent(session).data == 1
+        assert OutboxCRUD.enqueue_unsent(session).data == 0
+        assert OutboxCRUD.count_pending(session).data == 2
+
+    def test_next_due(self, session):
+        """Test the next claimable time: now while unclaimed, the lease end while claimed, None when empty"""
+        assert OutboxCRUD.next_due(session).data is None
+        make_movie(session, 1)
+        assert OutboxCRUD.next_due(session).data <= datetime.now()
+
+        entry = OutboxCRUD.claim(session).data[0]
+        due = OutboxCRUD.next_due(session, lease_seconds=300).data
+        assert due == entry.claimed_at + timedelta(seconds=300)
+
+        OutboxCRUD.ack(session, [entry])
+        assert OutboxCRUD.next_due(session).data is None
+
+
+class WritingBot:
+    """Fake bot; while a message is being sent another connection commits a post"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sent = 0
+
+    async def send_photo(self, chat_id, photo, caption=None, parse_mode=None):
+        with safe_session(self.engine) as other:
+            PostCRUD.create(other, PostBase(title=f"News {self.sent}", type_="news", summary="x", image="url"))
+        self.sent += 1
+        return SimpleNamespace(photo=[SimpleNamespace(file_id="AgAC")])
+
+
+class TestSendOutbox:
+    """Test suite for the bot sending the outbox"""
+
+    @pytest.fixture(name="file_engine")
+    def file_engine_fixture(self, tmp_path, monkeypatch):
+        """File database in WAL mode, as the bot has it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'bot.db'}")
+        enable_wal(engine)
+        SQLModel.metadata.create_all(engine)
+        monkeypatch.setattr(bot_module, "engine", engine)
+        monkeypatch.setattr(bot_utilities, "engine", engine)
+        yield engine
+        engine.dispose()
+
+    def test_commit_during_send_is_acked(self, file_engine):
+        """Test entries are acked even though another connection wrote while Telegram was awaited"""
+        with Session(file_engine) as session:
+            make_movie(session, 1)
+            make_movie(session, 2)
+
+        bot = WritingBot(file_engine)
+        assert asyncio.run(bot_module.send_outbox(bot, 1)) == "OK"
+        assert bot.sent == 2
+        with Session(file_engine) as session:
+            assert OutboxCRUD.count_pending(session).data == 0
+            assert session.exec(select(Movie.sent)).all() == [True, True]
+
+    def test_failed_ack_is_reported(self, file_engine, monkeypatch):
+        """Test a failed ack is returned as an error instead of OK"""
+        with Session(file_engine) as session:
+            make_movie(session, 1)
+        monkeypatch.setattr(OutboxCRUD, "ack", lambda session, entries: SimpleNamespace(success=False, error="locked"))
+
+        assert asyncio.run(bot_module.send_outbox(WritingBot(file_engine), 1)) == "❌ locked"
+
+    def test_lease_expiry_is_retried_without_a_commit(self, file_engine, monkeypatch):
+        """Test an entry left claimed is sent once its lease ends though nothing else was written"""
+        with Session(file_engine) as session:
+            make_movie(session, 1)
+            OutboxCRUD.claim(session)
+        watcher = SimpleNamespace(changed=lambda: True)
+        monkeypatch.setattr(bot_module, "data_watcher", watcher)
+        monkeypatch.setattr(bot_module, "outbox_retry_at", None)
+        calls = []
+
+        async def send_outbox(bot, chat_id, limit):
+            calls.append(limit)
+        monkeypatch.setattr(bot_module, "send_outbox", send_outbox)
+        context = SimpleNamespace(bot=None)
+
+        # a first change (the bot starting) sees the claimed entry and schedules the retry
+        asyncio.run(bot_module.send_data_job(context))
+        assert bot_module.outbox_retry_at > datetime.now() + timedelta(seconds=200)
+
+        watcher.changed = lambda: False
+        asyncio.run(bot_module.send_data_job(context))
+        assert len(calls) == 1
+
+        monkeypatch.setattr(bot_module, "outbox_retry_at", datetime.now())
+        asyncio.run(bot_module.send_data_job(context))
+        assert len(calls) == 2
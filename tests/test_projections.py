@@ -0,0 +1,55 @@
+from database.models import MovieBase, EpisodeBase, SerialBase, Movie, Episode
+from database.db import (
+    MovieCRUD, SerialCRUD, EpisodeCRUD, OutboxCRUD,
+    ItemCard, DispatchItem, projection_statement, project
+)
+
+
+def make_movie(session, api_id):
+    return MovieCRUD.create(session, MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=2020, duration="120", imdb=7.0, is_persian=True,
+        image_url="url", cover_url="cover", api_id=api_id
+    ), enqueue=False).data
+
+
+# ============= PROJECTION TESTS =============
+
+class TestProjections:
+    """Test suite for column projections"""
+
+    def test_plain_tuples(self, session):
+        """Test projection_statement rows are plain tuples in field order"""
+        movie = make_movie(session, 1)
+        rows = session.exec(projection_statement(Movie, ItemCard)).all()
+        assert tuple(rows[0]) == (movie.id, "Movie 1", 2020, 7.0, True, "url")
+
+    def test_missing_columns_are_none(self, session):
+        """Test fields a model has no column for come back as None"""
+        EpisodeCRUD.create(session, EpisodeBase(
+            title="E1", description="Test", duration="40", api_id=7, image_url="url"
+        ), enqueue=False)
+        item = project(session, projection_statement(Episode, DispatchItem), DispatchItem)[0]
+        assert item.title == "E1"
+        assert item.year is None
+        assert item.season_count is None
+
+    def test_slots(self, session):
+        """Test projection rows carry no per-instance dict"""
+        make_movie(session, 1)
+        item = project(session, projection_statement(Movie, ItemCard), ItemCard)[0]
+        assert not hasattr(item, "__dict__")
+
+    def test_dispatch_matches_model_dump(self, session):
+        """Test a dispatch row has the same values as the ORM dump for every field it keeps"""
+        SerialCRUD.create(session, SerialBase(
+            title="S", type_="serial", description="Test", year=2020, duration="50",
+            imdb=8.0, is_persian=False, image_url="url", cover_url="url", api_id=1, season_count=3
+        ))
+        entries = OutboxCRUD.claim(session).data
+        (_, item), = OutboxCRUD.load_dispatch(session, entries).data
+        (_, orm_item), = OutboxCRUD.load_items(session, entries).data
+
+        dump = orm_item.model_dump()
+        assert item.as_dict() == {key: dump[key] for key in item.as_dict()}
+
@@ -0,0 +1,78 @@
+from sqlalchemy import text
+
+from database.models import MovieBase, GenreBase, Movie
+from database.db import MovieCRUD, GenreCRUD, catalog_statement
+
+
+def make_movie(session, api_id, year, imdb, is_persian=False):
+    movie_data = MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=year, duration="120", imdb=imdb, is_persian=is_persian,
+        image_url="url", cover_url="url", api_id=api_id
+    )
+    return MovieCRUD.create(session, movie_data, enqueue=False).data
+
+
+def query_plan(session, statement) -> str:
+    compiled = statement.compile(compile_kwargs={"literal_binds": True})
+    rows = session.exec(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " ".join(row[-1] for row in rows)
+
+
+# ============= RATING / YEAR RANGE TESTS =============
+
+class TestRatingRange:
+    """Test suite for year and rating range queries"""
+
+    def test_get_by_year_exact(self, session):
+        """Test get_by_year matches the year, not digits inside it"""
+        make_movie(session, 1, 1999, 7.0)
+        make_movie(session, 2, 2019, 7.0)
+
+        assert [movie.year for movie in MovieCRUD.get_by_year(session, 1999).data] == [1999]
+        assert MovieCRUD.get_by_year(session, 99).data == []
+
+    def test_get_by_imdb_rating_sorted(self, session):
+        """Test rating threshold results come best rated first"""
+        make_movie(session, 1, 2000, 7.5)
+        make_movie(session, 2, 2000, 9.0)
+        make_movie(session, 3, 2000, 5.0)
+
+        ratings = [movie.imdb for movie in MovieCRUD.get_by_imdb_rating(session, 7.0).data]
+        assert ratings == [9.0, 7.5]
+
+    def test_top_rated_year_between(self, session):
+        """Test top_rated filters an inclusive year range and sorts by rating"""
+        make_movie(session, 1, 1999, 8.0)
+        make_movie(session, 2, 2005, 9.0)
+        make_movie(session, 3, 2010, 8.5)
+        make_movie(session, 4, 2011, 9.5)
+
+        result = MovieCRUD.top_rated(session, year_between=(1999, 2010), min_imdb=8.2)
+        assert result.success
+        assert [movie.api_id for movie in result.data] == [2, 3]
+
+    def test_top_rated_with_genre(self, session):
+        """Test range filters combine with a genre filter in one query"""
+        drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+        first = make_movie(session, 1, 2000, 8.0)
+        make_movie(session, 2, 2000, 9.0)
+        first.genres.append(drama)
+        session.commit()
+
+        result = MovieCRUD.top_rated(session, year_between=(1990, 2020), genre="Drama")
+        assert [movie.api_id for movie in result.data] == [1]
+
+    def test_browse_year_between(self, session):
+        """Test browse accepts a year range"""
+        make_movie(session, 1, 1980, 7.0)
+        make_movie(session, 2, 2020, 7.0)
+        assert [movie.api_id for movie in MovieCRUD.browse(session, year_between=(2000, 2030)).data] == [2]
+
+    def test_range_queries_use_indexes(self, session):
+        """Test SQLite picks the composite indexes for range and persian queries"""
+        statement = catalog_statement(Movie, year_between=(2000, 2010), min_imdb=8.0)
+        assert "ix_movie_year_imdb" in query_plan(session, statement)
+
+        statement = catalog_statement(Movie, is_persian=True).order_by(Movie.imdb.desc())
+        assert "ix_movie_is_persian_imdb" in query_plan(session, statement)
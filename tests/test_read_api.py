@@ -0,0 +1,112 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from database.models import MovieBase, GenreBase
+from database.db import MovieCRUD, GenreCRUD
+from api.app import app
+from api.v1 import routes
+from api.v1.cache import response_cache, ResponseCache
+
+
+HEADERS = {"X-Internal-Proxy": "true"}
+
+
+@pytest.fixture(name="client")
+def client_fixture(engine, monkeypatch):
+    """API client reading from the test database"""
+    monkeypatch.setattr(routes, "engine", engine)
+    response_cache.clear()
+    yield TestClient(app)
+    response_cache.clear()
+
+
+@pytest.fixture(name="catalog")
+def catalog_fixture(session):
+    """Create 5 movies, the odd ones are dramas"""
+    drama = GenreCRUD.create(session, GenreBase(title="Drama")).data
+    for i in range(5):
+        movie = MovieCRUD.create(session, MovieBase(
+            title=f"Movie {i}", type_="movie", description="Test",
+            year=2020 + i, duration="120", imdb=5.0 + i, is_persian=i % 2 == 0,
+            image_url="url", cover_url="url", api_id=100 + i
+        ), enqueue=False).data
+        if i % 2:
+            MovieCRUD.add_genre(session, movie_id=movie.id, genre_id=drama.id)
+
+
+# ============= READ API TESTS =============
+
+class TestReadAPI:
+    """Test suite for the GET catalog routes"""
+
+    def test_list_movies_newest_first(self, client, catalog):
+        """Test listing returns the newest movies and a cursor"""
+        response = client.get("/api/v1/movies?limit=2", headers=HEADERS)
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["id"] for item in body["items"]] == [104, 103]
+        assert body["next_cursor"] is not None
+
+        response = client.get(f"/api/v1/movies?limit=2&cursor={body['next_cursor']}", headers=HEADERS)
+        assert [item["id"] for item in response.json()["items"]] == [102, 101]
+
+    def test_composite_filters(self, client, catalog):
+        """Test genre and rating filters combine"""
+        response = client.get("/api/v1/movies?genre=Drama&min_imdb=7", headers=HEADERS)
+        assert [item["id"] for item in response.json()["items"]] == [103]
+        assert response.json()["items"][0]["genres"] == ["Drama"]
+
+    def test_title_query_uses_search_index(self, client, catalog, session):
+        """Test q matches title words by prefix through the search index"""
+        MovieCRUD.update(session, 5, {"title": "The Matrix"})
+        response = client.get("/api/v1/movies?q=matr", headers=HEADERS)
+        assert [item["id"] for item in response.json()["items"]] == [104]
+        assert client.get("/api/v1/movies?q=atrix", headers=HEADERS).json()["items"] == []
+
+    def test_encoded_filters_do_not_share_cache(self, client, catalog):
+        """Test a value holding & and = is not served the response of the split filters"""
+        response = client.get("/api/v1/movies?genre=Drama&min_imdb=7", headers=HEADERS)
+        assert len(response.json()["items"]) == 1
+        response = client.get("/api/v1/movies", params={"genre": "Drama&min_imdb=7"}, headers=HEADERS)
+        assert response.json()["items"] == []
+
+    def test_etag_not_modified(self, client, catalog):
+        """Test a matching If-None-Match is answered with 304"""
+        response = client.get("/api/v1/movies", headers=HEADERS)
+        etag = response.headers["etag"]
+
+        response = client.get("/api/v1/movies", headers={**HEADERS, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_get_missing_movie(self, client, catalog):
+        """Test an unknown api id is a 404"""
+        response = client.get("/api/v1/movies/999", headers=HEADERS)
+        assert response.status_code == 404
+
+    def test_facets(self, client, catalog):
+        """Test whole-catalog and filtered facet counts"""
+        body = client.get("/api/v1/facets", headers=HEADERS).json()
+        assert body["genre"] == {"Drama": 2}
+        assert body["persian"] == {"true": 3, "false": 2}
+
+        body = client.get("/api/v1/facets?persian=false&year_from=2023", headers=HEADERS).json()
+        assert body["genre"] == {"Drama": 1}
+        assert body["decade"] == {"2020": 1}
+
+
+class TestResponseCache:
+    """Test suite for the TTL response cache"""
+
+    def test_expired_entry_is_dropped(self):
+        """Test entries are not served after their ttl"""
+        cache = ResponseCache(ttl=-1)
+        cache.set("key", b"{}")
+        assert cache.get("key") is None
+
+    def test_oldest_entry_is_evicted(self):
+        """Test the cache stays within max_entries"""
+        cache = ResponseCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, b"{}")
+        assert len(cache) == 2
+        assert cache.get("a") is None
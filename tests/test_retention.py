@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import select
+
+from database.models import Post, PostBase
+from database.db import PostCRUD, SearchIndex
+from database import migrations
+
+
+def make_posts(session, count, sent=True, age_days=30):
+    """Insert count posts created age_days ago"""
+    created_at = datetime.now() - timedelta(days=age_days)
+    for i in range(count):
+        post = PostCRUD.create(session, PostBase(
+            title=f"Matrix {age_days} {sent} {i}", type_="news", summary="Test", image="url"
+        )).data
+        PostCRUD.update(session, post.id, {"sent": sent, "created_at": created_at})
+
+
+def post_count(session):
+    return len(session.exec(select(Post.id)).all())
+
+
+# ============= RETENTION TESTS =============
+
+class TestPostRetention:
+    """Test suite for the set-based post purge"""
+
+    def test_purge_old_sent_posts(self, session):
+        """Test only sent posts past the cutoff are deleted"""
+        make_posts(session, 3, sent=True, age_days=30)
+        make_posts(session, 2, sent=False, age_days=30)
+        make_posts(session, 2, sent=True, age_days=1)
+
+        result = PostCRUD.purge(session, older_than=timedelta(days=7))
+        assert result.success
+        assert result.data == 3
+        assert post_count(session) == 4
+
+    def test_purge_ignoring_sent(self, session):
+        """Test sent=None deletes old posts whether sent or not"""
+        make_posts(session, 3, sent=True, age_days=30)
+        make_posts(session, 2, sent=False, age_days=30)
+
+        assert PostCRUD.purge(session, older_than=timedelta(days=7), sent=None).data == 5
+        assert post_count(session) == 0
+
+    def test_chunked_purge(self, session):
+        """Test chunked mode deletes the same rows over several transactions"""
+        make_posts(session, 7, sent=True, age_days=30)
+        make_posts(session, 1, sent=True, age_days=1)
+
+        result = PostCRUD.purge(session, older_than=timedelta(days=7), chunk_size=3)
+        assert result.data == 7
+        assert post_count(session) == 1
+
+    def test_purge_drops_search_rows(self, session):
+        """Test purged posts leave no rows behind in the search index"""
+        make_posts(session, 2, sent=True, age_days=30)
+        make_posts(session, 1, sent=True, age_days=1)
+
+        PostCRUD.purge(session, older_than=timedelta(days=7))
+        assert len(SearchIndex.search(session, "matrix")) == 1
+        indexed = session.exec(text("SELECT count(*) FROM search_index")).one()[0]
+        assert indexed == 1
+
+    def test_created_at_migration(self, engine, session):
+        """Test migration 3 adds created_at to an old post table and backfills it"""
+        migrations.migrate(engine)
+        make_posts(session, 1)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_post_created_at")
+            connection.exec_driver_sql("ALTER TABLE post DROP COLUMN created_at")
+            connection.exec_driver_sql("DELETE FROM schema_version WHERE version = 3")
+        assert migrations.check(engine)["columns"] == ["post.created_at"]
+
+        migrations.migrate(engine)
+        assert migrations.check(engine) == {"tables": [], "columns": [], "indexes": [], "migrations": []}
+        session.expire_all()
+        assert session.exec(select(Post.created_at)).one() is not None
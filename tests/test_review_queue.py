@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from sqlalchemy import event, text
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from database.models import MovieBase, PostBase, Post, Outbox
+from database.db import MovieCRUD, PostCRUD, QueueCRUD, safe_session
+from database.migrations import enable_wal
+from bot import bot as bot_module
+from bot.templats.callbacks import CallbackCodec, CallbackRouter
+
+
+def make_movies(session, count):
+    return [MovieCRUD.create(session, MovieBase(
+        title=f"Movie {i}", type_="movie", description="Test", year=2020, duration="120",
+        imdb=7.0, is_persian=False, image_url="url", cover_url="url", api_id=i
+    )).data for i in range(count)]
+
+
+# ============= REVIEW QUEUE TESTS =============
+
+class TestReviewQueue:
+    """Test suite for the keyset-paginated review queue"""
+
+    def test_pages_newest_first(self, session):
+        """Test pages walk unsent items newest first until there is no next cursor"""
+        movies = make_movies(session, 5)
+        QueueCRUD.mark_sent(session, "movie", movies[3].id)
+
+        items, cursor = QueueCRUD.page(session, "movie", limit=2).data
+        assert [item.id for item in items] == [movies[4].id, movies[2].id]
+        items, cursor = QueueCRUD.page(session, "movie", cursor=cursor, limit=2).data
+        assert [item.id for item in items] == [movies[1].id, movies[0].id]
+        assert cursor is None
+
+    def test_page_is_one_indexed_query(self, engine, session):
+        """Test a page turn is a single statement using the (sent, id) index"""
+        make_movies(session, 3)
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            QueueCRUD.page(session, "movie", cursor=3, limit=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+
+        plan = session.exec(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM movie WHERE sent = 0 AND id < 3 ORDER BY id DESC LIMIT 3"
+        )).all()
+        assert any("ix_movie_sent_id" in row[-1] for row in plan)
+
+    def test_skip_drops_outbox_entry(self, session):
+        """Test a skipped item leaves the queue and the outbox"""
+        movie = make_movies(session, 1)[0]
+        assert QueueCRUD.mark_sent(session, "movie", movie.id).data
+        assert QueueCRUD.page(session, "movie").data == ([], None)
+        assert session.exec(select(Outbox)).all() == []
+
+    def test_approve(self, session):
+        """Test approving re-queues a movie once and schedules a post"""
+        movie = make_movies(session, 1)[0]
+        assert QueueCRUD.approve(session, "movie", movie.id).data
+        assert len(session.exec(select(Outbox)).all()) == 1
+
+        post = PostCRUD.create(session, PostBase(title="News", type_="news", summary="Test", image="url")).data
+        assert QueueCRUD.approve(session, "post", post.id).data
+        assert session.get(Post, post.id).schedule is not None
+
+    def test_load_dispatch(self, session):
+        """Test send-now loads the dispatch projection with the caption"""
+        movie = make_movies(session, 1)[0]
+        item = QueueCRUD.load_dispatch(session, "movie", movie.id).data
+        assert item.caption == movie.caption
+        assert QueueCRUD.load_dispatch(session, "movie", 999).data is None
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.answers = []
+
+    async def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+    async def edit_message_text(self, text, reply_markup=None):
+        pass
+
+
+class FakeUpdate:
+    def __init__(self, data):
+        self.callback_query = FakeQuery(data)
+
+
+class TestCallbackRouter:
+    """Test suite for routing callback queries to handlers"""
+
+    def test_routes_decoded_arguments(self):
+        """Test the handler of the action gets the decoded arguments"""
+        codec = CallbackCodec()
+        codec.register("browse", kind=str, cursor=int)
+        router = CallbackRouter(codec)
+        calls = []
+
+        @router.route("browse")
+        async def on_browse(update, context, kind, cursor):
+            calls.append((kind, cursor))
+
+        asyncio.run(router.dispatch(FakeUpdate(codec.encode("browse", kind="movie", cursor=40)), None))
+        assert calls == [("movie", 40)]
+
+    def test_guard_and_unknown_data(self):
+        """Test refused and undecodable queries are only answered"""
+        codec = CallbackCodec()
+        codec.register("menu")
+        router = CallbackRouter(codec, guard=lambda update: False)
+        update = FakeUpdate(codec.encode("menu"))
+        asyncio.run(router.dispatch(update, None))
+        assert update.callback_query.answers == ["⛔"]
+
+        router.guard = None
+        update = FakeUpdate("garbage")
+        asyncio.run(router.dispatch(update, None))
+        assert update.callback_query.answers == [None]
+
+
+class TestSendNow:
+    """Test suite for the admin send now action"""
+
+    @pytest.fixture(name="file_engine")
+    def file_engine_fixture(self, tmp_path, monkeypatch):
+        """File database in WAL mode, as the bot has it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'bot.db'}")
+        enable_wal(engine)
+        SQLModel.metadata.create_all(engine)
+        monkeypatch.setattr(bot_module, "engine", engine)
+        yield engine
+        engine.dispose()
+
+    def test_commit_during_send_marks_sent(self, file_engine, monkeypatch):
+        """Test the item leaves the queue though another connection wrote while it was sent"""
+        with Session(file_engine) as session:
+            PostCRUD.create(session, PostBase(title="News", type_="news", summary="Test", image="url"))
+
+        async def send_post(post):
+            with safe_session(file_engine) as other:
+                PostCRUD.create(other, PostBase(title="Other", type_="news", summary="Test", image="url"))
+            return post.title == "News"
+        monkeypatch.setattr(bot_module, "send_post", send_post)
+
+        update = FakeUpdate("send")
+        asyncio.run(bot_module.on_send(update, SimpleNamespace(bot=None), "post", 1, None))
+        assert update.callback_query.answers == ["🚀"]
+        with Session(file_engine) as session:
+            assert session.exec(select(Post.title).where(Post.sent == True)).all() == ["News"]
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from bot import bot as bot_module
+from database.models import PostBase, Post
+from database.db import PostCRUD, QueueCRUD, safe_session
+from database.migrations import enable_wal
+from bot.scheduler import PostScheduler, PublishingWindow, parse_windows, spacing_for
+
+
+TZ = timezone(timedelta(hours=3, minutes=30))
+
+
+def at(hour, minute=0, day=1):
+    return datetime(2026, 1, day, hour, minute, tzinfo=TZ)
+
+
+@pytest.fixture(name="scheduler")
+def scheduler_fixture():
+    """09:00-12:00 and 18:00-21:00, 30 minutes apart"""
+    return PostScheduler(parse_windows("18:00-21:00,09:00-12:00"), timedelta(minutes=30), TZ)
+
+
+# ============= SCHEDULER TESTS =============
+
+class TestPostScheduler:
+    """Test suite for the publishing window scheduler"""
+
+    def test_parse_windows(self):
+        """Test windows are sorted and must end after they start"""
+        windows = parse_windows("18:00-21:00, 09:00-12:00")
+        assert [window.start for window in windows] == [time(9), time(18)]
+        assert spacing_for(windows, 12) == timedelta(minutes=30)
+        with pytest.raises(ValueError):
+            PublishingWindow(time(12), time(9))
+
+    def test_due_post_waits_for_window(self, scheduler):
+        """Test a post due at night is published when the next window opens"""
+        scheduler.load([(1, at(23))])
+        assert scheduler.next_run(at(23)) == at(9, day=2)
+        assert scheduler.pop_due(at(23)) is None
+
+    def test_posts_are_spaced(self, scheduler):
+        """Test due posts go out one at a time, spacing apart, in schedule order"""
+        scheduler.load([(2, at(10, 5)), (1, at(10))])
+        assert scheduler.pop_due(at(10, 10)) == 1
+        scheduler.sent(at(10, 10))
+
+        assert scheduler.pop_due(at(10, 11)) is None
+        assert scheduler.next_run(at(10, 11)) == at(10, 40)
+        assert scheduler.pop_due(at(10, 40)) == 2
+        assert scheduler.next_run(at(10, 41)) is None
+
+    def test_spacing_crosses_into_next_window(self, scheduler):
+        """Test a slot pushed past a window's end moves to the next window"""
+        scheduler.load([(1, at(11))])
+        scheduler.sent(at(11, 50))
+        assert scheduler.next_run(at(11, 50)) == at(18)
+
+    def test_unscheduled_posts_are_due(self, scheduler):
+        """Test a NULL schedule is due at once"""
+        scheduler.load([(1, None)])
+        assert scheduler.pop_due(at(10)) == 1
+
+
+class TestDuePosts:
+    """Test suite for reading the next due posts"""
+
+    def test_due_order_and_index(self, session):
+        """Test due posts come unsent, by schedule, from the (sent, schedule) index"""
+        base = datetime(2026, 1, 1, 10)
+        for i, offset in enumerate((3, 1, 2)):
+            PostCRUD.create(session, PostBase(
+                title=f"News {i}", type_="news", summary="Test", image="url",
+                schedule=base + timedelta(hours=offset)
+            ))
+        QueueCRUD.mark_sent(session, "post", 2)
+
+        rows = PostCRUD.due(session, limit=5).data
+        assert [post_id for post_id, _ in rows] == [3, 1]
+
+        plan = session.exec(text(
+            "EXPLAIN QUERY PLAN SELECT id, schedule FROM post WHERE sent = 0 ORDER BY schedule LIMIT 5"
+        )).all()
+        assert any("ix_post_sent_schedule" in row[-1] for row in plan)
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def get_jobs_by_name(self, name):
+        return []
+
+    def run_once(self, callback, when, name):
+        self.scheduled.append(name)
+
+
+class TestPublishPostJob:
+    """Test suite for the job publishing the due post"""
+
+    @pytest.fixture(name="file_engine")
+    def file_engine_fixture(self, tmp_path, monkeypatch):
+        """File database in WAL mode, as the bot has it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'bot.db'}")
+        enable_wal(engine)
+        SQLModel.metadata.create_all(engine)
+        monkeypatch.setattr(bot_module, "engine", engine)
+        yield engine
+        engine.dispose()
+
+    def test_commit_during_send_marks_sent(self, file_engine, monkeypatch):
+        """Test the post is marked sent though another connection wrote while it was sent"""
+        with Session(file_engine) as session:
+            PostCRUD.create(session, PostBase(title="News", type_="news", summary="Test", image="url"))
+
+        async def send_post(post):
+            with safe_session(file_engine) as other:
+                PostCRUD.create(other, PostBase(title="Other", type_="news", summary="Test", image="url"))
+            return post.title == "News"
+        monkeypatch.setattr(bot_module, "send_post", send_post)
+        scheduler = PostScheduler(parse_windows("09:00-12:00"), timedelta(minutes=30), TZ)
+        # due whatever the time of the run
+        monkeypatch.setattr(scheduler, "pop_due", lambda now: 1)
+        monkeypatch.setattr(bot_module, "post_scheduler", scheduler)
+
+        asyncio.run(bot_module.publish_post_job(SimpleNamespace(job_queue=FakeJobQueue())))
+        with Session(file_engine) as session:
+            assert session.exec(select(Post.title).where(Post.sent == True)).all() == ["News"]
@@ -0,0 +1,77 @@
+import asyncio
+import random
+import threading
+from types import SimpleNamespace
+
+from bot import bot as bot_module
+from scraper.schedule import SourceSchedule, BACKOFF, SPEEDUP, BURST_SIZE, JITTER
+from scraper.scraper import ScraperContianer
+
+
+# ============= SCRAPE SCHEDULE TESTS =============
+
+class TestSourceSchedule:
+    """Test suite for adaptive per-source scrape intervals"""
+
+    def test_backs_off_when_nothing_is_new(self):
+        """Test empty runs stretch the interval up to the maximum"""
+        schedule = SourceSchedule("site", interval=1000, max_interval=2000)
+        assert schedule.observe(0) == 1000 * BACKOFF
+        assert schedule.observe(0) == 2000
+
+    def test_speeds_up_on_bursts(self):
+        """Test bursts shorten the interval down to the minimum"""
+        schedule = SourceSchedule("site", interval=1000, min_interval=300)
+        assert schedule.observe(BURST_SIZE) == 1000 / SPEEDUP
+        assert schedule.observe(BURST_SIZE + 5) == 300
+
+    def test_steady_rate_keeps_interval(self):
+        """Test a run with a few new articles leaves the interval as is"""
+        schedule = SourceSchedule("site", interval=1000)
+        assert schedule.observe(1) == 1000
+
+    def test_jitter_stays_in_bounds(self):
+        """Test delays vary around the interval within the jitter"""
+        schedule = SourceSchedule("site", interval=1000)
+        rng = random.Random(1)
+        delays = {schedule.next_delay(rng) for _ in range(50)}
+        assert len(delays) > 1
+        assert all(1000 * (1 - JITTER) <= delay <= 1000 * (1 + JITTER) for delay in delays)
+
+    def test_container_schedules_every_source(self):
+        """Test every scraper has its own schedule"""
+        contianer = ScraperContianer()
+        assert set(contianer.schedules()) == set(contianer.scraper_map)
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def run_once(self, callback, when, data, name):
+        self.scheduled.append((name, when))
+
+
+class TestScrapeSourceJob:
+    """Test suite for the bot job scraping one source"""
+
+    def test_scrape_does_not_block_the_event_loop(self, monkeypatch):
+        """Test the scrape runs in a worker thread while the loop goes on"""
+        loop_ran = threading.Event()
+
+        def blocking_scrape(name, session):
+            # only returns in time when the loop is free to set the event
+            return 0 if loop_ran.wait(timeout=5) else -1
+        monkeypatch.setattr(bot_module, "scrape_source", blocking_scrape)
+
+        async def main():
+            context = SimpleNamespace(job=SimpleNamespace(data=SourceSchedule("site", interval=1000)), job_queue=FakeJobQueue())
+            job = asyncio.create_task(bot_module.scrape_source_job(context))
+            await asyncio.sleep(0)
+            loop_ran.set()
+            await job
+            return context
+
+        context = asyncio.run(main())
+        assert context.job.data.interval == 1000 * BACKOFF
+        assert [name for name, _ in context.job_queue.scheduled] == ["scrape_site"]
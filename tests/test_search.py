@@ -0,0 +1,118 @@
+from sqlmodel import Session, create_engine, SQLModel
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from database.models import MovieBase, SerialBase, PostBase, ActorBase, SeasonBase, EpisodeBase
+from database.db import MovieCRUD, SerialCRUD, SeasonCRUD, EpisodeCRUD, PostCRUD, ActorCRUD, SearchIndex, Engine
+
+
+def make_movie(session, api_id, title, description="Test"):
+    movie_data = MovieBase(
+        title=title, type_="movie", description=description,
+        year=2020, duration="120", imdb=7.0, is_persian=False,
+        image_url="url", cover_url="url", api_id=api_id
+    )
+    return MovieCRUD.create(session, movie_data, enqueue=False).data
+
+
+# ============= SEARCH TESTS =============
+
+class TestSearchIndex:
+    """Test suite for the FTS5 search index"""
+
+    def test_search_by_title_prefix(self, session):
+        """Test title words match as prefixes, in any order"""
+        matrix = make_movie(session, 1, "The Matrix Reloaded")
+        make_movie(session, 2, "Inception")
+
+        result = MovieCRUD.search_by_title(session, "reload matr")
+        assert result.success
+        assert [movie.id for movie in result.data] == [matrix.id]
+
+    def test_title_ranks_above_description(self, session):
+        """Test a title hit outranks a description hit"""
+        in_body = make_movie(session, 1, "Heist", description="a dream within a dream")
+        in_title = make_movie(session, 2, "Dream Team")
+
+        ids = [movie.id for movie in MovieCRUD.search(session, "dream").data]
+        assert ids == [in_title.id, in_body.id]
+
+    def test_search_by_title_ignores_description(self, session):
+        """Test search_by_title only looks at the title column"""
+        make_movie(session, 1, "Heist", description="dream")
+        assert MovieCRUD.search_by_title(session, "dream").data == []
+
+    def test_persian_normalization(self, session):
+        """Test Arabic letter forms and Persian digits find the normalized title"""
+        movie = make_movie(session, 1, "فیلم ۱۹۹۹")
+        assert [m.id for m in MovieCRUD.search(session, "فيلم 1999").data] == [movie.id]
+
+    def test_kinds_do_not_mix(self, session):
+        """Test a movie id is never returned as a serial with the same id"""
+        make_movie(session, 1, "Dark")
+        SerialCRUD.create(session, SerialBase(
+            title="Light", type_="serial", description="Test", year=2020, duration="50",
+            imdb=8.0, is_persian=False, image_url="url", cover_url="url", api_id=1, season_count=1
+        ), enqueue=False)
+
+        assert SerialCRUD.search(session, "dark").data == []
+        assert [movie.title for movie in MovieCRUD.search(session, "dark").data] == ["Dark"]
+
+    def test_update_and_delete_keep_index_in_sync(self, session):
+        """Test updates re-index and deletes drop the row"""
+        movie = make_movie(session, 1, "Old Name")
+        MovieCRUD.update(session, movie.id, {"title": "New Name"})
+        assert MovieCRUD.search(session, "old").data == []
+        assert len(MovieCRUD.search(session, "new").data) == 1
+
+        MovieCRUD.delete(session, movie.id)
+        assert MovieCRUD.search(session, "new").data == []
+
+    def test_season_delete_keeps_index_in_sync(self, session):
+        """Test deleting a season works and leaves episodes it does not own indexed"""
+        serial = SerialCRUD.create(session, SerialBase(
+            title="Dark", description="Test", year=2017, duration="60",
+            imdb=8.7, is_persian=False, image_url="url", cover_url="url", api_id=1, season_count=1
+        ), enqueue=False).data
+        season = SeasonCRUD.create(session, SeasonBase(title="Season 1", api_id=1, serial_id=serial.id)).data
+        EpisodeCRUD.create(session, EpisodeBase(
+            title="Secrets", description="Test", duration="60", api_id=1, image_url="url"
+        ), enqueue=False)
+
+        assert SeasonCRUD.delete(session, season.id).success
+        assert SeasonCRUD.get_by_id(session, season.id).data is None
+        assert [hit[:2] for hit in SearchIndex.search(session, "secrets")] == [("episode", 1)]
+
+    def test_posts_and_actors(self, session):
+        """Test posts (title + summary) and actors (name) are indexed"""
+        PostCRUD.create(session, PostBase(
+            title="Box office", type_="news", summary="Matrix returns", image="url"
+        ))
+        ActorCRUD.create(session, ActorBase(name="Keanu Reeves", image_url="url"))
+
+        assert [post.title for post in PostCRUD.search(session, "matrix").data] == ["Box office"]
+        assert [actor.name for actor in ActorCRUD.search_by_name(session, "keanu").data] == ["Keanu Reeves"]
+
+    def test_punctuation_only_query(self, session):
+        """Test a query without words returns nothing instead of an FTS syntax error"""
+        make_movie(session, 1, "Matrix")
+        result = MovieCRUD.search(session, '"*:(')
+        assert result.success
+        assert result.data == []
+
+    def test_create_db_backfills_missing_index(self):
+        """Test create_db fills the index for rows stored before it existed"""
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            make_movie(session, 1, "Matrix")
+            session.exec(text("DROP TABLE search_index"))
+            session.commit()
+
+        Engine.create_db(engine)
+        with Session(engine) as session:
+            assert [hit[:2] for hit in SearchIndex.search(session, "matrix")] == [("movie", 1)]
@@ -0,0 +1,196 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from database.models import GenreBase, MovieBase, CountryBase, ActorBase, PostBase, Genre, Movie
+from database.db import (
+    GenreCRUD, MovieCRUD, CountryCRUD, ActorCRUD, PostCRUD, OutboxCRUD, safe_session
+)
+from database.migrations import enable_wal
+from api.app import app
+from api.v1 import routes
+from api.v1.cache import response_cache
+
+
+@pytest.fixture(name="file_engine")
+def file_engine_fixture(tmp_path):
+    """File database, so a second connection sees only committed data"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    # as migrate() leaves it, readers keep a snapshot
+    enable_wal(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def count_commits(engine):
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(1))
+    return commits
+
+
+def genre_titles(engine):
+    with Session(engine) as session:
+        return sorted(genre.title for genre in session.exec(select(Genre)).all())
+
+
+def movie_data(api_id):
+    return MovieBase(
+        title=f"Movie {api_id}", type_="movie", description="Test",
+        year=2020, duration="120", imdb=7.0, is_persian=False,
+        image_url="url", cover_url="url", api_id=api_id
+    )
+
+
+def movie_payload(**changes):
+    payload = {
+        "title": "Matrix", "id": 1, "type": "movie", "description": "Test", "duration": "120",
+        "year": 1999, "imdb": 8.7, "persian": False, "image": "url", "cover": "url",
+        "trailer": {"type": "youtube", "url": "url"},
+        "genres": [{"title": "Action"}, {"title": "Sci-Fi"}],
+        "countries": [{"title": "USA", "image": "url"}],
+        "actors": [{"name": "Keanu Reeves", "image": "url"}],
+        "note": "",
+    }
+    payload.update(changes)
+    return payload
+
+
+# ============= UNIT OF WORK TESTS =============
+
+class TestUnitOfWork:
+    """Test suite for CRUD calls batched into one commit"""
+
+    def test_default_commits_per_call(self, file_engine):
+        """Test without a unit of work every CRUD call commits"""
+        commits = count_commits(file_engine)
+        with safe_session(file_engine) as session:
+            GenreCRUD.create(session, GenreBase(title="Drama"))
+            assert genre_titles(file_engine) == ["Drama"]
+            GenreCRUD.create(session, GenreBase(title="Crime"))
+        assert len(commits) >= 2
+
+    def test_single_commit(self, file_engine):
+        """Test a unit of work commits once, at the end"""
+        commits = count_commits(file_engine)
+        with safe_session(file_engine, unit_of_work=True) as session:
+            movie = MovieCRUD.create(session, movie_data(1)).data
+            for title in ("Drama", "Crime", "Comedy"):
+                genre = GenreCRUD.create(session, GenreBase(title=title)).data
+                assert MovieCRUD.add_genre(session, movie_id=movie.id, genre_id=genre.id).success
+            assert genre_titles(file_engine) == []
+
+        assert len(commits) == 1
+        assert genre_titles(file_engine) == ["Comedy", "Crime", "Drama"]
+
+    def test_failed_call_only_undoes_itself(self, file_engine):
+        """Test a failing call rolls back to its savepoint and the unit still commits"""
+        with safe_session(file_engine, unit_of_work=True) as session:
+            GenreCRUD.create(session, GenreBase(title="Drama"))
+            duplicate = GenreCRUD.create(session, GenreBase(title="Drama"))
+            assert not duplicate.success
+            assert duplicate.error_type == "IntegrityError"
+            GenreCRUD.create(session, GenreBase(title="Crime"))
+
+        assert genre_titles(file_engine) == ["Crime", "Drama"]
+
+    def test_exception_rolls_back_unit(self, file_engine):
+        """Test an exception in the block discards every change of the unit"""
+        with pytest.raises(RuntimeError):
+            with safe_session(file_engine, unit_of_work=True) as session:
+                GenreCRUD.create(session, GenreBase(title="Drama"))
+                raise RuntimeError("abort")
+        assert genre_titles(file_engine) == []
+
+    def test_savepoint_first_in_transaction(self, file_engine):
+        """Test a SAVEPOINT opened first does not commit on release (pysqlite quirk)"""
+        with pytest.raises(RuntimeError):
+            with safe_session(file_engine, unit_of_work=True) as session:
+                with session.begin_nested():
+                    session.add(Genre(title="Drama"))
+                raise RuntimeError("abort")
+        assert genre_titles(file_engine) == []
+
+    def test_plain_session_writes_after_concurrent_commit(self, file_engine):
+        """Test a read, another connection's commit, then a write in the same plain session"""
+        with safe_session(file_engine) as session:
+            MovieCRUD.create(session, movie_data(1))
+        with safe_session(file_engine) as session:
+            claimed = OutboxCRUD.claim(session).data
+            assert OutboxCRUD.load_dispatch(session, claimed).success
+            with safe_session(file_engine) as other:
+                assert PostCRUD.create(other, PostBase(title="News", type_="news", summary="x", image="url")).success
+            assert OutboxCRUD.ack(session, claimed).data == 1
+
+    def test_movie_ingest_route(self, file_engine, monkeypatch):
+        """Test POST /movie stores the movie and its relations in one commit"""
+        monkeypatch.setattr(routes, "engine", file_engine)
+        response_cache.clear()
+        commits = count_commits(file_engine)
+        response = TestClient(app).post("/api/v1/movie", headers={"X-Internal-Proxy": "true"}, json=movie_payload())
+        assert response.status_code == 201
+        assert len(commits) == 1
+        with Session(file_engine) as session:
+            movie = session.exec(select(Movie)).one()
+            assert sorted(genre.title for genre in movie.genres) == ["Action", "Sci-Fi"]
+            assert [actor.name for actor in movie.actors] == ["Keanu Reeves"]
+
+    def test_relinking_keeps_unit(self, file_engine):
+        """Test re-adding an existing genre, country or actor only fails that call"""
+        with safe_session(file_engine, unit_of_work=True) as session:
+            movie = MovieCRUD.create(session, movie_data(1)).data
+            genre = GenreCRUD.create(session, GenreBase(title="Drama")).data
+            country = CountryCRUD.create(session, CountryBase(title="USA", image_url="url")).data
+            actor = ActorCRUD.create(session, ActorBase(name="Keanu Reeves", image_url="url")).data
+            MovieCRUD.add_genre(session, movie_id=movie.id, genre_id=genre.id)
+            MovieCRUD.add_country(session, movie_id=movie.id, country_id=country.id)
+            MovieCRUD.add_actor(session, movie_id=movie.id, actor_id=actor.id)
+            ids = movie.id, genre.id, country.id, actor.id
+
+        movie_id, genre_id, country_id, actor_id = ids
+        with safe_session(file_engine, unit_of_work=True) as session:
+            assert MovieCRUD.update(session, movie_id, {"imdb": 9.1}).success
+            assert not MovieCRUD.add_genre(session, movie_id=movie_id, genre_id=genre_id).success
+            assert not MovieCRUD.add_country(session, movie_id=movie_id, country_id=country_id).success
+            assert not MovieCRUD.add_actor(session, movie_id=movie_id, actor_id=actor_id).success
+            assert GenreCRUD.create(session, GenreBase(title="Crime")).success
+
+        with Session(file_engine) as session:
+            movie = session.get(Movie, movie_id)
+            assert movie.imdb == 9.1
+            assert [genre.title for genre in movie.genres] == ["Drama"]
+            assert len(movie.countries) == 1 and len(movie.actors) == 1
+        assert genre_titles(file_engine) == ["Crime", "Drama"]
+
+    def test_movie_update_route_relinks(self, file_engine, monkeypatch):
+        """Test PATCH /movie re-sending existing relations keeps the other changes"""
+        monkeypatch.setattr(routes, "engine", file_engine)
+        response_cache.clear()
+        client = TestClient(app)
+        headers = {"X-Internal-Proxy": "true"}
+        assert client.post("/api/v1/movie", headers=headers, json=movie_payload()).status_code == 201
+
+        response = client.patch(
+            "/api/v1/movie/1", headers=headers,
+            json=movie_payload(imdb=9.1, genres=[{"title": "Action"}, {"title": "Drama"}]),
+        )
+        assert response.status_code == 200
+        with Session(file_engine) as session:
+            movie = session.exec(select(Movie)).one()
+            assert movie.imdb == 9.1
+            assert sorted(genre.title for genre in movie.genres) == ["Action", "Drama", "Sci-Fi"]
+            assert [actor.name for actor in movie.actors] == ["Keanu Reeves"]
+
+    def test_movie_ingest_route_duplicate_genre(self, file_engine, monkeypatch):
+        """Test POST /movie with a genre listed twice still stores the movie"""
+        monkeypatch.setattr(routes, "engine", file_engine)
+        response_cache.clear()
+        response = TestClient(app).post(
+            "/api/v1/movie", headers={"X-Internal-Proxy": "true"},
+            json=movie_payload(genres=[{"title": "Action"}, {"title": "Action"}]),
+        )
+        assert response.status_code == 201
+        with Session(file_engine) as session:
+            movie = session.exec(select(Movie)).one()
+            assert [genre.title for genre in movie.genres] == ["Action"]